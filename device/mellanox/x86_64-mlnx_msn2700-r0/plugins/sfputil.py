@@ -7,6 +7,7 @@ try:
     import time
     import subprocess
     from sonic_sfp.sfputilbase import *
+    from sonic_daemon_base.module_eeprom import is_module_present, read_module_eeprom_hex
     import syslog
 except ImportError as e:
     raise ImportError("%s - required module not found" % str(e))
@@ -115,19 +116,7 @@ class SfpUtil(SfpUtilBase):
         port_num += SFP_PORT_NAME_OFFSET
         sfpname = SFP_PORT_NAME_CONVENTION.format(port_num)
 
-        ethtool_cmd = "ethtool -m {} 2>/dev/null".format(sfpname)
-        try:
-            proc = subprocess.Popen(ethtool_cmd, stdout=subprocess.PIPE, shell=True, stderr=subprocess.STDOUT)
-            stdout = proc.communicate()[0]
-            proc.wait()
-            result = stdout.rstrip('\n')
-            if result != '':
-                presence = True
-
-        except OSError, e:
-            return presence
-
-        return presence
+        return is_module_present(sfpname)
 
     def get_low_power_mode(self, port_num):
         # Check for invalid port_num
@@ -247,20 +236,7 @@ class SfpUtil(SfpUtilBase):
         port_num += SFP_PORT_NAME_OFFSET
         sfpname = SFP_PORT_NAME_CONVENTION.format(port_num)
 
-        eeprom_raw = []
-        ethtool_cmd = "ethtool -m {} hex on offset {} length {}".format(sfpname, offset, num_bytes)
-        try:
-            output = subprocess.check_output(ethtool_cmd, shell=True)
-            output_lines = output.splitlines()
-            first_line_raw = output_lines[0]
-            if "Offset" in first_line_raw:
-                for line in output_lines[2:]:
-                    line_split = line.split()
-                    eeprom_raw = eeprom_raw + line_split[1:]
-        except subprocess.CalledProcessError as e:
-            return None
-
-        return eeprom_raw
+        return read_module_eeprom_hex(sfpname, offset, num_bytes)
 
     # Read eeprom
     def _read_eeprom_devid(self, port_num, devid, offset, num_bytes = 512):
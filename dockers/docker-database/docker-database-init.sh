@@ -1,5 +1,10 @@
 #!/usr/bin/env bash
 
+. /usr/share/sonic/scripts/boot_trace.sh
+trace_begin "docker-database-init.sh"
+
+DATABASE_CONFIG=/var/run/redis/sonic-db/database_config.json
+
 mkdir -p /var/run/redis/sonic-db
 if [ -f /etc/sonic/database_config.json ]; then
     cp /etc/sonic/database_config.json /var/run/redis/sonic-db
@@ -7,8 +12,17 @@ else
     cp /etc/default/sonic-db/database_config.json /var/run/redis/sonic-db
 fi
 
+# generate the configuration file of each redis instance, with its own port,
+# socket, data directory, persistence and io settings
+for inst in $(sonic-cfggen -j $DATABASE_CONFIG -v "INSTANCES.keys() | sort | join(' ')"); do
+    mkdir -p /var/lib/$inst
+    sonic-cfggen -j $DATABASE_CONFIG -a "{\"INSTANCE_NAME\": \"$inst\"}" -t /usr/share/sonic/templates/redis-instance.conf.j2 > /etc/redis/$inst.conf
+done
+
 mkdir -p /etc/supervisor/conf.d/
 # generate all redis server supervisord configuration file
-sonic-cfggen -j /var/run/redis/sonic-db/database_config.json -t /usr/share/sonic/templates/supervisord.conf.j2 > /etc/supervisor/conf.d/supervisord.conf
+sonic-cfggen -j $DATABASE_CONFIG -t /usr/share/sonic/templates/supervisord.conf.j2 > /etc/supervisor/conf.d/supervisord.conf
+
+trace_end "docker-database-init.sh"
 
 exec /usr/bin/supervisord
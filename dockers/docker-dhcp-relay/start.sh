@@ -1,5 +1,8 @@
 #!/usr/bin/env bash
 
+. /usr/share/sonic/scripts/boot_trace.sh
+trace_script "start.sh"
+
 # Remove stale rsyslog PID file if it exists
 rm -f /var/run/rsyslogd.pid
 
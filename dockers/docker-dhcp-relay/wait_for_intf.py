@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+#
+# wait_for_intf.py
+#
+#  Waits until all given interfaces are ready, i.e. present in the
+#  INTERFACE_TABLE of STATE_DB with state "ok". Interfaces are given as
+#  <name>|<prefix>, the key of their interface address in STATE_DB.
+#
+#  All interfaces are checked at once, then the keyspace notifications of
+#  the table are used to recheck only the interfaces which changed. The
+#  remaining interfaces are also rechecked every few seconds, in case
+#  notifications are missed. Exits as soon as every interface is ready, or
+#  with an error after the timeout.
+#
+
+import argparse
+import sys
+import syslog
+import time
+
+from swsssdk import SonicV2Connector
+
+SYSLOG_IDENTIFIER = 'wait_for_intf'
+
+STATE_INTERFACE_TABLE = 'INTERFACE_TABLE'
+STATE_DB_SEPARATOR = '|'
+
+DEFAULT_TIMEOUT_SECS = 600
+
+# Interval between two checks of all remaining interfaces
+RECHECK_INTERVAL_SECS = 5
+
+
+def log_info(msg):
+    syslog.syslog(syslog.LOG_INFO, msg)
+    print msg
+
+
+def log_error(msg):
+    syslog.syslog(syslog.LOG_ERR, msg)
+    print msg
+
+
+def get_ready_interfaces(client, keys):
+    """
+    Returns:
+        The subset of keys whose interface state is "ok", read in a single
+        round trip
+    """
+    pipe = client.pipeline()
+    for key in keys:
+        pipe.hget(key, 'state')
+    states = pipe.execute()
+
+    return set(key for (key, state) in zip(keys, states) if state == 'ok')
+
+
+def wait_for_interfaces(interfaces, timeout):
+    """
+    Returns:
+        The set of interfaces which are not ready, empty on success
+    """
+    state_db = SonicV2Connector(host='127.0.0.1')
+    state_db.connect(state_db.STATE_DB)
+    client = state_db.get_redis_client(state_db.STATE_DB)
+
+    prefix = STATE_INTERFACE_TABLE + STATE_DB_SEPARATOR
+    pending = set(prefix + intf for intf in interfaces)
+
+    # Subscribe before the first check, so that no change is missed
+    keyspace_prefix = '__keyspace@{}__:'.format(state_db.get_dbid(state_db.STATE_DB))
+    pubsub = client.pubsub()
+    pubsub.psubscribe(keyspace_prefix + prefix + '*')
+
+    start = time.time()
+    deadline = start + timeout if timeout > 0 else None
+    try:
+        changed = set(pending)
+        next_recheck = start + RECHECK_INTERVAL_SECS
+        while True:
+            if changed:
+                for key in get_ready_interfaces(client, list(changed)):
+                    pending.discard(key)
+                    log_info('Interface {} is ready after {:.1f}s'.format(key[len(prefix):], time.time() - start))
+                changed = set()
+
+            if not pending:
+                break
+
+            now = time.time()
+            if deadline is not None and now >= deadline:
+                break
+            if now >= next_recheck:
+                changed = set(pending)
+                next_recheck = now + RECHECK_INTERVAL_SECS
+                continue
+
+            wait = next_recheck - now
+            if deadline is not None:
+                wait = min(wait, deadline - now)
+
+            # Wait for a notification, then drain all those available, so
+            # that a burst of changes is checked at once
+            item = pubsub.get_message(timeout=wait)
+            while item is not None:
+                if item['type'] == 'pmessage':
+                    key = item['channel'][len(keyspace_prefix):]
+                    if key in pending:
+                        changed.add(key)
+                item = pubsub.get_message()
+    finally:
+        pubsub.close()
+
+    return set(key[len(prefix):] for key in pending)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Wait until interfaces are ready in STATE_DB')
+    parser.add_argument('interfaces', nargs='*', metavar='NAME|PREFIX',
+                        help='Interface address, as the interface name and prefix separated by "|"')
+    parser.add_argument('-t', '--timeout', type=int, default=DEFAULT_TIMEOUT_SECS,
+                        help='Seconds to wait at most, 0 to wait forever (default: %(default)s)')
+    args = parser.parse_args()
+
+    syslog.openlog(SYSLOG_IDENTIFIER)
+
+    if not args.interfaces:
+        return
+
+    log_info('Waiting until interface(s) {} are ready...'.format(', '.join(args.interfaces)))
+    not_ready = wait_for_interfaces(args.interfaces, args.timeout)
+    if not_ready:
+        log_error('Interface(s) {} not ready after {}s'.format(', '.join(sorted(not_ready)), args.timeout))
+        sys.exit(1)
+
+    log_info('All interfaces are ready!')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,8 @@
 #!/usr/bin/env bash
 
+. /usr/share/sonic/scripts/boot_trace.sh
+trace_script "start.sh"
+
 mkdir -p /etc/frr
 
 CONFIG_TYPE=`sonic-cfggen -d -v 'DEVICE_METADATA["localhost"]["docker_routing_config_mode"]'`
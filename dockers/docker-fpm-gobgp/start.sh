@@ -1,5 +1,8 @@
 #!/usr/bin/env bash
 
+. /usr/share/sonic/scripts/boot_trace.sh
+trace_script "start.sh"
+
 mkdir -p /etc/quagga
 sonic-cfggen -d -t /usr/share/sonic/templates/gobgpd.conf.j2 > /etc/gobgp/gobgpd.conf
 sonic-cfggen -d -t /usr/share/sonic/templates/zebra.conf.j2 > /etc/quagga/zebra.conf
@@ -1,5 +1,8 @@
 #!/usr/bin/env bash
 
+. /usr/share/sonic/scripts/boot_trace.sh
+trace_script "start.sh"
+
 mkdir -p /etc/quagga
 sonic-cfggen -d -y /etc/sonic/deployment_id_asn_map.yml -t /usr/share/sonic/templates/bgpd.conf.j2 > /etc/quagga/bgpd.conf
 
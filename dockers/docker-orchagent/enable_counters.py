@@ -1,36 +1,238 @@
 #!/usr/bin/env python
 
+import argparse
 import swsssdk
+import syslog
 import time
+from sonic_daemon_base.daemon_base import get_db_instance, get_pubsub_message
+
+SYSLOG_IDENTIFIER = 'enable_counters'
+
+# Set in APPL_DB by portsyncd once it has pushed the list of ports, which
+# orchagent and syncd may not have created yet
+PORT_INIT_DONE_KEY = 'PORT_TABLE:PortInitDone'
+
+# Port states in STATE_DB, set to "ok" once a port has been created
+STATE_PORT_TABLE = 'PORT_TABLE'
+STATE_DB_SEPARATOR = '|'
+
+# Interval between two checks of all ports not ready yet, in case
+# notifications are missed
+RECHECK_INTERVAL_SECS = 5
+
+# Counter groups are enabled in stages of (delay, groups), each stage delay
+# seconds after the previous one, so that syncd does not start polling all
+# of them at once
+DEFAULT_STAGES = [
+    (0, ['PORT']),
+    (10, ['QUEUE', 'PFCWD']),
+    (10, ['PG_WATERMARK', 'QUEUE_WATERMARK']),
+]
+
+# Counters are enabled anyway if the ports are not ready in time
+DEFAULT_READY_TIMEOUT = 300
+
+# The stages after the first are not enabled before the system has been up
+# for this long, whatever the readiness of the ports
+DEFAULT_MIN_UPTIME = 180
+
+# Enablement times of the counter groups, in STATE_DB
+STATE_TABLE = 'COUNTERS_ENABLE_TABLE'
+
+def log_info(msg):
+    syslog.syslog(syslog.LOG_INFO, msg)
+
+def log_warning(msg):
+    syslog.syslog(syslog.LOG_WARNING, msg)
 
 def enable_counter_group(db, name):
     info = {}
     info['FLEX_COUNTER_STATUS'] = 'enable'
     db.mod_entry("FLEX_COUNTER_TABLE", name, info)
 
-def enable_counters():
+def record_time(state_db, name, fields):
+    fields = dict(fields)
+    fields['timestamp'] = '%.3f' % time.time()
+    fields['uptime'] = '%.3f' % get_uptime()
+    client = state_db.get_redis_client(state_db.STATE_DB)
+    client.hmset(STATE_TABLE + '|' + name, fields)
+
+def connect_db(db_name):
+    (hostname, port) = get_db_instance(db_name)
+    db = swsssdk.SonicV2Connector(host=hostname, port=port)
+    db.connect(db_name)
+    return db
+
+def wait_for_port_init_done(deadline):
+    """
+    Waits until PortInitDone is set in APPL_DB, or until deadline
+
+    Returns:
+        True if PortInitDone is set
+    """
+    appl_db = connect_db('APPL_DB')
+    client = appl_db.get_redis_client(appl_db.APPL_DB)
+
+    # Subscribe before checking the key, so that it can't be set unnoticed
+    pubsub = client.pubsub()
+    pubsub.psubscribe('__keyspace@{}__:{}'.format(appl_db.get_dbid(appl_db.APPL_DB), PORT_INIT_DONE_KEY))
+
+    try:
+        while not client.exists(PORT_INIT_DONE_KEY):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            # Any notification of the key means it was set; the existence
+            # check is repeated anyway, for robustness
+            get_pubsub_message(pubsub, min(remaining, 1.0))
+    finally:
+        pubsub.close()
+
+    return True
+
+def get_ready_ports(client, keys):
+    """
+    Returns:
+        The subset of keys whose port state is "ok", read in a single round
+        trip
+    """
+    pipe = client.pipeline()
+    for key in keys:
+        pipe.hget(key, 'state')
+    states = pipe.execute()
+
+    return set(key for (key, state) in zip(keys, states) if state == 'ok')
+
+def wait_for_port_states(ports, deadline):
+    """
+    Waits until all ports are created, i.e. their state is "ok" in STATE_DB,
+    or until deadline. All ports are checked at once, then only those
+    notified as changed.
+
+    Returns:
+        The set of ports which are not ready, empty on success
+    """
+    state_db = connect_db('STATE_DB')
+    client = state_db.get_redis_client(state_db.STATE_DB)
+
+    prefix = STATE_PORT_TABLE + STATE_DB_SEPARATOR
+    pending = set(prefix + port for port in ports)
+
+    # Subscribe before the first check, so that no change is missed
+    keyspace_prefix = '__keyspace@{}__:'.format(state_db.get_dbid(state_db.STATE_DB))
+    pubsub = client.pubsub()
+    pubsub.psubscribe(keyspace_prefix + prefix + '*')
+
+    try:
+        changed = set(pending)
+        next_recheck = time.time() + RECHECK_INTERVAL_SECS
+        while True:
+            if changed:
+                pending -= get_ready_ports(client, list(changed))
+                changed = set()
+
+            if not pending:
+                break
+
+            now = time.time()
+            if now >= deadline:
+                break
+            if now >= next_recheck:
+                changed = set(pending)
+                next_recheck = now + RECHECK_INTERVAL_SECS
+                continue
+
+            # Wait for a notification, then drain all those available, so
+            # that a burst of changes is checked at once
+            item = get_pubsub_message(pubsub, min(next_recheck, deadline) - now)
+            while item is not None:
+                if item['type'] == 'pmessage':
+                    key = item['channel'][len(keyspace_prefix):]
+                    if key in pending:
+                        changed.add(key)
+                item = pubsub.get_message()
+    finally:
+        pubsub.close()
+
+    return set(key[len(prefix):] for key in pending)
+
+def wait_for_ports(ports, timeout):
+    """
+    Waits until PortInitDone is set in APPL_DB and all ports are created, or
+    at most timeout seconds
+
+    Returns:
+        True if the ports are ready
+    """
+    deadline = time.time() + timeout
+    if not wait_for_port_init_done(deadline):
+        return False
+
+    not_ready = wait_for_port_states(ports, deadline)
+    if not_ready:
+        log_warning('Port(s) {} not created'.format(', '.join(sorted(not_ready))))
+        return False
+
+    return True
+
+def enable_counters(stages, ready_timeout, min_uptime):
     db = swsssdk.ConfigDBConnector()
     db.connect()
-    enable_counter_group(db, 'PORT')
-    enable_counter_group(db, 'QUEUE')
-    enable_counter_group(db, 'PFCWD')
-    enable_counter_group(db, 'PG_WATERMARK')
-    enable_counter_group(db, 'QUEUE_WATERMARK')
+    state_db = connect_db('STATE_DB')
+
+    start = time.time()
+    if wait_for_ports(db.get_keys('PORT'), ready_timeout):
+        log_info('Ports ready after {:.1f}s'.format(time.time() - start))
+        record_time(state_db, 'PORTS_READY', {'wait': '%.3f' % (time.time() - start)})
+    else:
+        log_warning('Ports not ready after {}s, enabling counters anyway'.format(ready_timeout))
+
+    for (index, (delay, groups)) in enumerate(stages):
+        if delay > 0:
+            time.sleep(delay)
+        if index > 0:
+            # Queue and priority group counters are only set up for the
+            # ports created by then, leave some slack after a boot
+            uptime = get_uptime()
+            if uptime < min_uptime:
+                time.sleep(min_uptime - uptime)
+        for group in groups:
+            enable_counter_group(db, group)
+            record_time(state_db, group, {'stage': str(index)})
+        log_info('Enabled counter group(s) {} (stage {})'.format(', '.join(groups), index))
 
 def get_uptime():
     with open('/proc/uptime') as fp:
         return float(fp.read().split(' ')[0])
 
+def parse_stage(value):
+    """
+    Parses a stage given as DELAY:GROUP[,GROUP...]
+    """
+    try:
+        (delay, groups) = value.split(':', 1)
+        return (float(delay), [group for group in groups.split(',') if group])
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid stage '{}', expected DELAY:GROUP[,GROUP...]".format(value))
+
 def main():
-    # If the switch was just started (uptime less than 5 minutes),
-    # wait for 3 minutes and enable counters
-    # otherwise wait for 60 seconds and enable counters
-    uptime = get_uptime()
-    if uptime < 300:
-        time.sleep(180)
-    else:
-        time.sleep(60)
-    enable_counters()
+    parser = argparse.ArgumentParser(description='Enable flex counter groups once the ports are ready')
+    parser.add_argument('--stage', type=parse_stage, action='append', dest='stages',
+                        help='Counter groups enabled DELAY seconds after the previous stage, '
+                             'as DELAY:GROUP[,GROUP...]. May be repeated. (default: {})'.format(
+                             ' '.join('{}:{}'.format(delay, ','.join(groups)) for (delay, groups) in DEFAULT_STAGES)))
+    parser.add_argument('--ready-timeout', type=int, default=DEFAULT_READY_TIMEOUT,
+                        help='Seconds to wait for the ports before enabling counters anyway (default: %(default)s)')
+    parser.add_argument('--min-uptime', type=int, default=DEFAULT_MIN_UPTIME,
+                        help='Seconds of uptime before enabling the stages after the first (default: %(default)s)')
+    args = parser.parse_args()
+
+    syslog.openlog(SYSLOG_IDENTIFIER)
+
+    # Instead of sleeping for a fixed time after boot, wait until the ports
+    # are created and enable the counter groups in stages, no earlier than
+    # the minimum uptime but for the first stage
+    enable_counters(args.stages or DEFAULT_STAGES, args.ready_timeout, args.min_uptime)
 
 if __name__ == '__main__':
     main()
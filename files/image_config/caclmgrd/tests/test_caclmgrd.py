@@ -0,0 +1,146 @@
+import imp
+import os
+import re
+import sys
+import types
+from unittest import TestCase
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(test_dir, '..', '..', '..', '..', 'src', 'sonic-daemon-base'))
+
+# The SwSS SDK is not available at build time; the tests below don't
+# connect to Config DB
+if 'swsssdk' not in sys.modules:
+    swsssdk = types.ModuleType('swsssdk')
+    swsssdk.ConfigDBConnector = object
+    sys.modules['swsssdk'] = swsssdk
+
+caclmgrd = imp.load_source('caclmgrd', os.path.join(test_dir, '..', 'caclmgrd'))
+
+# Rule specification matching the source prefixes of an ipset
+MATCH_SET_RE = re.compile(r'(--tcp-flags \S+ \S+ )?-m set --match-set (\S+) src -j (\S+)')
+
+
+class FakeResult(object):
+    def __init__(self, ok):
+        self.ok = ok
+        self.stdout = ''
+
+    def error(self):
+        return 'failed'
+
+
+class FakeExecutor(object):
+    """
+    Records the ipset and iptables-restore invocations, failing
+    iptables-restore on demand
+    """
+    def __init__(self):
+        self.calls = []
+        self.fail_restore = False
+
+    def run(self, argv, input=None):
+        self.calls.append((argv[0], input))
+        return FakeResult(not (argv[0].endswith('tables-restore') and self.fail_restore))
+
+    def run_batch(self, argv, commands):
+        self.calls.append((argv[0], commands))
+        return FakeResult(True)
+
+
+class TestIpsetNaming(TestCase):
+
+    def setUp(self):
+        self.manager = caclmgrd.ControlPlaneAclManager.__new__(caclmgrd.ControlPlaneAclManager)
+        self.manager.acl_tables = {'SSH_ONLY': {'type': 'CTRLPLANE', 'services': ['SSH']}}
+        self.manager.acl_rules = {}
+        self.manager.translated_tables = {}
+        self.manager.ipsets = {}
+        self.manager.applied_ruleset_hashes = {4: None, 6: None}
+        self.manager.executor = FakeExecutor()
+
+    def set_rules(self, rules):
+        # rules: list of (priority, source prefix, packet action, TCP flags)
+        self.manager.acl_rules['SSH_ONLY'] = {}
+        for (priority, src_ip, packet_action, tcp_flags) in rules:
+            rule = {'PRIORITY': str(priority), 'SRC_IP': src_ip, 'PACKET_ACTION': packet_action}
+            if tcp_flags:
+                rule['TCP_FLAGS'] = tcp_flags
+            self.manager.acl_rules['SSH_ONLY']['RULE_{}'.format(priority)] = rule
+
+    def translate(self, rules):
+        """
+        Returns:
+            A dict of the ipsets of the table to a tuple of the TCP flags and
+            packet action of the rule which matches the set, and its members
+        """
+        self.set_rules(rules)
+        (_, iptables_rules, ipsets) = self.manager.translate_acl_table('SSH_ONLY')
+        matched = {}
+        for rule in iptables_rules:
+            match = MATCH_SET_RE.search(rule)
+            if match:
+                matched[match.group(2)] = ((match.group(1), match.group(3)), ipsets[match.group(2)])
+        self.assertEqual(set(matched.keys()), set(ipsets.keys()))
+        return matched
+
+    def assert_same_match_for_same_name(self, before, after):
+        # A set kept across a change must be matched the same way, only its
+        # members may change
+        for ipset_name in set(before.keys()) & set(after.keys()):
+            self.assertEqual(before[ipset_name][0], after[ipset_name][0])
+
+    def test_membership_change_keeps_set(self):
+        before = self.translate([(30, '10.0.0.0/8', 'ACCEPT', None),
+                                 (20, '10.1.0.0/16', 'ACCEPT', None),
+                                 (10, '0.0.0.0/0', 'DROP', None)])
+        after = self.translate([(30, '10.0.0.0/8', 'ACCEPT', None),
+                                (25, '20.0.0.0/8', 'ACCEPT', None),
+                                (10, '0.0.0.0/0', 'DROP', None)])
+        self.assertEqual(before.keys(), after.keys())
+        self.assertEqual(after.values()[0][1], set(['10.0.0.0/8', '20.0.0.0/8']))
+
+    def test_group_inserted_before(self):
+        before = self.translate([(30, '10.0.0.0/8', 'ACCEPT', None),
+                                 (20, '20.0.0.0/8', 'DROP', None)])
+        after = self.translate([(40, '10.1.0.0/16', 'DROP', None),
+                                (30, '10.0.0.0/8', 'ACCEPT', None),
+                                (20, '20.0.0.0/8', 'DROP', None)])
+        self.assert_same_match_for_same_name(before, after)
+        # The new DROP group doesn't take over the set of the ACCEPT group
+        for (match, src_prefixes) in after.values():
+            if '10.1.0.0/16' in src_prefixes:
+                self.assertEqual(match[1], 'DROP')
+                self.assertNotIn(src_prefixes, [prefixes for (_, prefixes) in before.values()])
+
+    def test_packet_action_change(self):
+        before = self.translate([(30, '10.0.0.0/8', 'ACCEPT', None)])
+        after = self.translate([(30, '10.0.0.0/8', 'DROP', None)])
+        self.assertFalse(set(before.keys()) & set(after.keys()))
+
+    def test_tcp_flags_change(self):
+        before = self.translate([(30, '10.0.0.0/8', 'ACCEPT', '0x02/0x02')])
+        after = self.translate([(30, '10.0.0.0/8', 'ACCEPT', '0x12/0x12')])
+        self.assertFalse(set(before.keys()) & set(after.keys()))
+        self.assert_same_match_for_same_name(before, after)
+
+    def test_stale_sets_kept_if_restore_fails(self):
+        executor = self.manager.executor
+        self.set_rules([(30, '10.0.0.0/8', 'ACCEPT', None)])
+        self.manager.update_control_plane_acls()
+        old_ipsets = set(self.manager.ipsets.keys())
+
+        executor.fail_restore = True
+        del executor.calls[:]
+        self.set_rules([(30, '10.0.0.0/8', 'DROP', None)])
+        self.manager.update_control_plane_acls(set(['SSH_ONLY']))
+        commands = [command for (tool, batch) in executor.calls if tool == 'ipset' for command in batch]
+        self.assertFalse([command for command in commands if command.startswith('destroy')])
+        self.assertTrue(old_ipsets <= set(self.manager.ipsets.keys()))
+
+        # Destroyed once the new ruleset is applied
+        executor.fail_restore = False
+        del executor.calls[:]
+        self.manager.update_control_plane_acls(set(['SSH_ONLY']))
+        commands = [command for (tool, batch) in executor.calls if tool == 'ipset' for command in batch]
+        self.assertEqual(sorted(commands), sorted('destroy {}'.format(name) for name in old_ipsets))
@@ -0,0 +1,246 @@
+import gzip
+import imp
+import os
+import shutil
+import sys
+import tempfile
+import time
+from unittest import TestCase
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(test_dir, '..', '..', '..', '..', 'src', 'sonic-daemon-base'))
+
+corefilemgrd = imp.load_source('corefilemgrd', os.path.join(test_dir, '..', 'corefilemgrd'))
+
+# Compresses well, but not entirely at the lowest level
+CORE_CONTENTS = ''.join('{:08x} {}\n'.format(i * 7919 % 65536, 'x' * (i % 13)) for i in range(20000))
+
+
+class TestCoreFileManager(TestCase):
+
+    def setUp(self):
+        self.core_dir = tempfile.mkdtemp()
+        self.index_dir = tempfile.mkdtemp()
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.inotify.close()
+        shutil.rmtree(self.core_dir)
+        shutil.rmtree(self.index_dir)
+
+    def add_core_file(self, name, size=100, age=3600):
+        path = os.path.join(self.core_dir, name)
+        with open(path, 'wb') as f:
+            f.write('\0' * size)
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+
+    def new_manager(self, max_per_process=2, max_total_bytes=10000):
+        manager = corefilemgrd.CoreFileManager(self.core_dir, self.index_dir, max_per_process, max_total_bytes)
+        manager.watch()
+        manager.load_index()
+        self.managers.append(manager)
+        return manager
+
+    def handle_events(self, manager):
+        return manager.handle_events(manager.inotify.read_events())
+
+    def core_files(self):
+        return sorted(name for name in os.listdir(self.core_dir) if not name.startswith('.'))
+
+    def test_parse_core_file_name(self):
+        parse = corefilemgrd.parse_core_file_name
+        self.assertEqual(parse('orchagent.1570000000.123.core.gz'), ('orchagent', 1570000000))
+        self.assertEqual(parse('python2.7.1570000000.123.core'), ('python2.7', 1570000000))
+        self.assertEqual(parse('core.gz.core'), ('core.gz', None))
+        self.assertIsNone(parse('.orchagent.1.100.core.gz'))
+        self.assertIsNone(parse('notes.txt'))
+
+    def test_max_per_process(self):
+        for timestamp in [3, 1, 4, 2]:
+            self.add_core_file('orchagent.{}.100.core.gz'.format(timestamp))
+        self.add_core_file('syncd.1.100.core.gz')
+        self.add_core_file('README')
+
+        manager = self.new_manager()
+        self.handle_events(manager)
+        manager.enforce_limits(list(manager.index))
+        self.assertEqual(self.core_files(), ['README', 'orchagent.3.100.core.gz', 'orchagent.4.100.core.gz',
+                                             'syncd.1.100.core.gz'])
+        self.assertEqual(sorted(manager.index), ['orchagent.3.100.core.gz', 'orchagent.4.100.core.gz',
+                                                 'syncd.1.100.core.gz'])
+        self.assertEqual(manager.total_bytes, 300)
+
+        # Only the processes of new core files are checked
+        self.add_core_file('orchagent.5.100.core.gz')
+        self.add_core_file('syncd.2.100.core.gz')
+        manager.enforce_limits(self.handle_events(manager))
+        self.assertEqual(self.core_files(), ['README', 'orchagent.4.100.core.gz', 'orchagent.5.100.core.gz',
+                                             'syncd.1.100.core.gz', 'syncd.2.100.core.gz'])
+
+    def test_max_total_bytes(self):
+        self.add_core_file('orchagent.1.100.core.gz', size=400)
+        self.add_core_file('syncd.2.100.core.gz', size=400)
+        self.add_core_file('bgpd.3.100.core.gz', size=400)
+        manager = self.new_manager(max_total_bytes=1000)
+        manager.enforce_limits([])
+        # The oldest core files are deleted first
+        self.assertEqual(self.core_files(), ['bgpd.3.100.core.gz', 'syncd.2.100.core.gz'])
+        self.assertEqual(manager.total_bytes, 800)
+
+        # The newest core file is always kept
+        self.add_core_file('zebra.4.100.core.gz', size=2000)
+        manager.enforce_limits(self.handle_events(manager))
+        self.assertEqual(self.core_files(), ['zebra.4.100.core.gz'])
+        self.assertEqual(manager.total_bytes, 2000)
+
+    def test_index_persistence(self):
+        self.add_core_file('orchagent.1.100.core.gz')
+        self.add_core_file('syncd.2.100.core.gz')
+        manager = self.new_manager()
+        self.assertEqual(manager.unsettled, set(['orchagent.1.100.core.gz', 'syncd.2.100.core.gz']))
+        manager.index['orchagent.1.100.core.gz']['recompressed'] = True
+        manager.dirty = True
+        manager.save_index()
+        self.assertFalse(manager.dirty)
+        self.assertEqual(os.listdir(self.index_dir), [corefilemgrd.CORE_INDEX_FILE])
+        # Saving the index does not change the core file directory
+        self.assertEqual(os.listdir(self.core_dir), ['orchagent.1.100.core.gz', 'syncd.2.100.core.gz'])
+        self.assertEqual(manager.inotify.read_events(), [])
+
+        # Changes made while the daemon was not running are picked up
+        os.remove(os.path.join(self.core_dir, 'syncd.2.100.core.gz'))
+        self.add_core_file('bgpd.3.100.core', size=50)
+        manager = self.new_manager()
+        self.assertEqual(sorted(manager.index), ['bgpd.3.100.core', 'orchagent.1.100.core.gz'])
+        self.assertTrue(manager.index['orchagent.1.100.core.gz']['recompressed'])
+        # Recompressed core files are not recompressed again
+        self.assertEqual(manager.unsettled, set(['bgpd.3.100.core']))
+        self.assertEqual(manager.total_bytes, 150)
+
+    def test_corrupt_index(self):
+        self.add_core_file('orchagent.1.100.core.gz')
+        with open(os.path.join(self.index_dir, corefilemgrd.CORE_INDEX_FILE), 'w') as f:
+            f.write('{')
+        manager = self.new_manager()
+        self.assertEqual(sorted(manager.index), ['orchagent.1.100.core.gz'])
+
+    def test_handle_events(self):
+        self.add_core_file('orchagent.1.100.core.gz')
+        manager = self.new_manager()
+        self.assertEqual(manager.unsettled, set(['orchagent.1.100.core.gz']))
+
+        # Written core files are complete, and queued for recompression
+        self.add_core_file('syncd.2.100.core.gz', size=200)
+        self.add_core_file('README')
+        os.mkdir(os.path.join(self.core_dir, 'bgpd.3.100.core'))
+        self.assertEqual(self.handle_events(manager), ['syncd.2.100.core.gz'])
+        self.assertEqual(manager.recompress_queue.get_nowait(), 'syncd.2.100.core.gz')
+        self.assertEqual(manager.total_bytes, 300)
+
+        # So are core files found at startup, once written again
+        with open(os.path.join(self.core_dir, 'orchagent.1.100.core.gz'), 'ab') as f:
+            f.write('\0' * 50)
+        self.assertEqual(self.handle_events(manager), [])
+        self.assertEqual(manager.recompress_queue.get_nowait(), 'orchagent.1.100.core.gz')
+        self.assertEqual(manager.unsettled, set())
+        self.assertEqual(manager.total_bytes, 350)
+
+        # Renamed and deleted core files
+        os.rename(os.path.join(self.core_dir, 'syncd.2.100.core.gz'),
+                  os.path.join(self.core_dir, 'syncd.2.101.core.gz'))
+        os.remove(os.path.join(self.core_dir, 'orchagent.1.100.core.gz'))
+        self.assertEqual(self.handle_events(manager), ['syncd.2.101.core.gz'])
+        self.assertEqual(sorted(manager.index), ['syncd.2.101.core.gz'])
+        self.assertEqual(manager.total_bytes, 200)
+        self.assertEqual(manager.recompress_queue.get_nowait(), 'syncd.2.101.core.gz')
+        self.assertTrue(manager.recompress_queue.empty())
+
+    def test_lost_events(self):
+        manager = self.new_manager()
+        self.add_core_file('orchagent.1.100.core.gz')
+        manager.inotify.read_events()
+        self.assertEqual(manager.handle_events([(corefilemgrd.IN_Q_OVERFLOW, '')]), ['orchagent.1.100.core.gz'])
+        self.assertEqual(manager.unsettled, set(['orchagent.1.100.core.gz']))
+
+    def test_core_dir_removed(self):
+        manager = self.new_manager()
+        shutil.rmtree(self.core_dir)
+        self.assertEqual(self.handle_events(manager), [])
+        self.assertTrue(os.path.isdir(self.core_dir))
+
+        # The new directory is watched
+        self.add_core_file('orchagent.1.100.core.gz')
+        self.assertEqual(self.handle_events(manager), ['orchagent.1.100.core.gz'])
+
+    def test_check_unsettled(self):
+        self.add_core_file('orchagent.1.100.core', age=3600)
+        self.add_core_file('syncd.2.100.core', age=0)
+        manager = self.new_manager()
+
+        # A core file still being written is not recompressed, its size is
+        # updated
+        with open(os.path.join(self.core_dir, 'syncd.2.100.core'), 'ab') as f:
+            f.write('\0' * 50)
+        manager.check_unsettled()
+        self.assertEqual(manager.recompress_queue.get_nowait(), 'orchagent.1.100.core')
+        self.assertTrue(manager.recompress_queue.empty())
+        self.assertEqual(manager.unsettled, set(['syncd.2.100.core']))
+        self.assertEqual(manager.index['syncd.2.100.core']['size'], 150)
+        self.assertEqual(manager.total_bytes, 250)
+
+    def test_recompress_uncompressed(self):
+        with open(os.path.join(self.core_dir, 'orchagent.1.100.core'), 'wb') as f:
+            f.write(CORE_CONTENTS)
+        manager = self.new_manager(max_total_bytes=10 ** 9)
+
+        manager.recompress('orchagent.1.100.core')
+        self.assertEqual(self.core_files(), ['orchagent.1.100.core.gz'])
+        self.assertEqual(os.listdir(self.core_dir), ['orchagent.1.100.core.gz'])
+        with gzip.open(os.path.join(self.core_dir, 'orchagent.1.100.core.gz')) as f:
+            self.assertEqual(f.read(), CORE_CONTENTS)
+
+        entry = manager.index['orchagent.1.100.core.gz']
+        self.assertTrue(entry['recompressed'])
+        size = os.path.getsize(os.path.join(self.core_dir, 'orchagent.1.100.core.gz'))
+        self.assertEqual(entry['size'], size)
+        self.assertEqual(manager.total_bytes, size)
+        self.assertEqual(manager.cores_by_process['orchagent'], [(1, 'orchagent.1.100.core.gz')])
+
+        # The events of the recompression leave the index as is
+        self.handle_events(manager)
+        self.assertEqual(sorted(manager.index), ['orchagent.1.100.core.gz'])
+        self.assertEqual(manager.total_bytes, size)
+        self.assertTrue(manager.recompress_queue.empty())
+
+    def test_recompress_compressed(self):
+        path = os.path.join(self.core_dir, 'orchagent.1.100.core.gz')
+        f = gzip.open(path, 'wb', compresslevel=1)
+        f.write(CORE_CONTENTS)
+        f.close()
+        old_size = os.path.getsize(path)
+        manager = self.new_manager(max_total_bytes=10 ** 9)
+
+        manager.recompress('orchagent.1.100.core.gz')
+        size = os.path.getsize(path)
+        self.assertLess(size, old_size)
+        with gzip.open(path) as f:
+            self.assertEqual(f.read(), CORE_CONTENTS)
+        self.assertEqual(manager.index['orchagent.1.100.core.gz']['size'], size)
+        self.assertTrue(manager.index['orchagent.1.100.core.gz']['recompressed'])
+
+        # Already at the highest level, the core file is kept as is
+        manager.index['orchagent.1.100.core.gz']['recompressed'] = False
+        manager.recompress('orchagent.1.100.core.gz')
+        self.assertEqual(os.path.getsize(path), size)
+        self.assertTrue(manager.index['orchagent.1.100.core.gz']['recompressed'])
+        self.assertEqual(os.listdir(self.core_dir), ['orchagent.1.100.core.gz'])
+
+    def test_recompress_deleted(self):
+        self.add_core_file('orchagent.1.100.core')
+        manager = self.new_manager()
+        manager.forget_core('orchagent.1.100.core')
+        manager.recompress('orchagent.1.100.core')
+        self.assertEqual(os.listdir(self.core_dir), ['orchagent.1.100.core'])
+        self.assertEqual(manager.index, {})
@@ -6,6 +6,8 @@ DEPENDENT="teamd radv"
 DEBUGLOG="/tmp/swss-syncd-debug.log"
 LOCKFILE="/tmp/swss-syncd-lock"
 
+. /usr/share/sonic/scripts/boot_trace.sh
+
 function debug()
 {
     /usr/bin/logger $1
@@ -53,6 +55,8 @@ function validate_restore_count()
 
 function wait_for_database_service()
 {
+    trace_begin "${SERVICE}: wait_for_database_service"
+
     # Wait for redis server start before database clean
     until [[ $(/usr/bin/docker exec database redis-cli ping | grep -c PONG) -gt 0 ]];
         do sleep 1;
@@ -62,6 +66,8 @@ function wait_for_database_service()
     until [[ $(/usr/bin/docker exec database redis-cli -n 4 GET "CONFIG_DB_INITIALIZED") ]];
         do sleep 1;
     done
+
+    trace_end "${SERVICE}: wait_for_database_service"
 }
 
 # This function cleans up the tables with specific prefixes from the database
@@ -101,6 +107,7 @@ stop_peer_and_dependent_services() {
 }
 
 start() {
+    trace_begin "${SERVICE} service start"
     debug "Starting ${SERVICE} service..."
 
     lock_service_state_change
@@ -114,11 +121,13 @@ start() {
     # Don't flush DB during warm boot
     if [[ x"$WARM_BOOT" != x"true" ]]; then
         debug "Flushing APP, ASIC, COUNTER, CONFIG, and partial STATE databases ..."
+        trace_begin "${SERVICE}: flush databases"
         /usr/bin/docker exec database redis-cli -n 0 FLUSHDB
         /usr/bin/docker exec database redis-cli -n 1 FLUSHDB
         /usr/bin/docker exec database redis-cli -n 2 FLUSHDB
         /usr/bin/docker exec database redis-cli -n 5 FLUSHDB
         clean_up_tables 6 "'PORT_TABLE*', 'MGMT_PORT_TABLE*', 'VLAN_TABLE*', 'VLAN_MEMBER_TABLE*', 'LAG_TABLE*', 'LAG_MEMBER_TABLE*', 'INTERFACE_TABLE*', 'MIRROR_SESSION*', 'VRF_TABLE*', 'FDB_TABLE*'"
+        trace_end "${SERVICE}: flush databases"
     fi
 
     # start service docker
@@ -127,6 +136,7 @@ start() {
 
     # Unlock has to happen before reaching out to peer service
     unlock_service_state_change
+    trace_end "${SERVICE} service start"
 }
 
 wait() {
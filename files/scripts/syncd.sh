@@ -5,6 +5,8 @@ PEER="swss"
 DEBUGLOG="/tmp/swss-syncd-debug.log"
 LOCKFILE="/tmp/swss-syncd-lock"
 
+. /usr/share/sonic/scripts/boot_trace.sh
+
 function debug()
 {
     /usr/bin/logger $1
@@ -42,6 +44,8 @@ function check_warm_boot()
 
 function wait_for_database_service()
 {
+    trace_begin "${SERVICE}: wait_for_database_service"
+
     # Wait for redis server start before database clean
     until [[ $(/usr/bin/docker exec database redis-cli ping | grep -c PONG) -gt 0 ]];
         do sleep 1;
@@ -51,6 +55,8 @@ function wait_for_database_service()
     until [[ $(/usr/bin/docker exec database redis-cli -n 4 GET "CONFIG_DB_INITIALIZED") ]];
         do sleep 1;
     done
+
+    trace_end "${SERVICE}: wait_for_database_service"
 }
 
 function getBootType()
@@ -73,6 +79,7 @@ function getBootType()
 }
 
 start() {
+    trace_begin "${SERVICE} service start"
     debug "Starting ${SERVICE} service..."
 
     lock_service_state_change
@@ -113,9 +120,11 @@ start() {
             /usr/bin/hw-management.sh chipupdis
         fi
 
+        trace_begin "${SERVICE}: mellanox drivers"
         /usr/bin/mst start
         /usr/bin/mlnx-fw-upgrade.sh
         /etc/init.d/sxdkernel start
+        trace_end "${SERVICE}: mellanox drivers"
     fi
 
     if [[ x"$WARM_BOOT" != x"true" ]]; then
@@ -129,6 +138,7 @@ start() {
     debug "Started ${SERVICE} service..."
 
     unlock_service_state_change
+    trace_end "${SERVICE} service start"
 }
 
 wait() {
@@ -0,0 +1,282 @@
+import imp
+import os
+import socket
+import struct
+import sys
+import types
+from unittest import TestCase
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+
+# The SwSS SDK is not available at build time; the tests below use a fake
+# Config DB
+if 'swsssdk' not in sys.modules:
+    swsssdk = types.ModuleType('swsssdk')
+    swsssdk.ConfigDBConnector = object
+    sys.modules['swsssdk'] = swsssdk
+
+arp_update = imp.load_source('arp_update', os.path.join(test_dir, '..', 'arp_update'))
+
+IPV4_NEIGHBORS = """\
+192.168.0.2 dev Vlan1000 lladdr 00:11:22:33:44:55 REACHABLE
+192.168.0.3 dev Vlan1000  FAILED
+10.0.0.1 dev PortChannel0001 lladdr 00:aa:bb:cc:dd:ee STALE
+incomplete line
+"""
+
+
+class Done(Exception):
+    pass
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, secs):
+        self.sleeps.append(secs)
+        self.now += secs
+
+
+class FakeProcess(object):
+    def __init__(self, stdout):
+        self.stdout = stdout
+
+    def communicate(self):
+        return (self.stdout, None)
+
+
+class FakeSubprocess(object):
+    PIPE = -1
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self.commands = []
+
+    def Popen(self, command, stdout=None):
+        self.commands.append(command)
+        return FakeProcess(self.stdout)
+
+
+class FakeSocket(object):
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data)
+
+    def sendto(self, data, address):
+        self.sent.append(data)
+
+
+class FakePubSub(object):
+    """
+    Returns the notifications of Config DB keys at the given times, advancing
+    the clock while waiting
+    """
+    def __init__(self, clock, keyspace_prefix, notifications, end):
+        self.clock = clock
+        self.keyspace_prefix = keyspace_prefix
+        self.notifications = list(notifications)
+        self.end = end
+
+    def psubscribe(self, pattern):
+        pass
+
+    def get_message(self, timeout=0):
+        if self.notifications and self.notifications[0][0] <= self.clock.now + timeout:
+            (at, key) = self.notifications.pop(0)
+            self.clock.now = max(self.clock.now, at)
+            return {'type': 'pmessage', 'channel': self.keyspace_prefix + key, 'data': 'hset'}
+        self.clock.now += timeout
+        if self.clock.now >= self.end:
+            raise Done()
+        return None
+
+
+class FakeConfigDBConnector(object):
+    CONFIG_DB = 'CONFIG_DB'
+    TABLE_NAME_SEPARATOR = '|'
+
+    def __init__(self):
+        self.tables = {}
+        self.subscriber = None
+
+    def connect(self):
+        pass
+
+    def get_keys(self, table):
+        return list(self.tables.get(table, []))
+
+    def get_redis_client(self, db):
+        return self
+
+    def get_dbid(self, db):
+        return 4
+
+    def pubsub(self):
+        return self.subscriber
+
+
+class TestHelpers(TestCase):
+
+    def setUp(self):
+        self.saved_subprocess = arp_update.subprocess
+
+    def tearDown(self):
+        arp_update.subprocess = self.saved_subprocess
+
+    def test_get_neighbors(self):
+        arp_update.subprocess = FakeSubprocess(IPV4_NEIGHBORS)
+        self.assertEqual(arp_update.get_neighbors(4), {
+            'Vlan1000': [('192.168.0.2', '00:11:22:33:44:55'), ('192.168.0.3', None)],
+            'PortChannel0001': [('10.0.0.1', '00:aa:bb:cc:dd:ee')],
+        })
+        self.assertEqual(arp_update.subprocess.commands, [['ip', '-4', 'neigh', 'show']])
+
+    def test_build_arp_request(self):
+        frame = arp_update.build_arp_request('00:11:22:33:44:55', '192.168.0.1', 'ff:ff:ff:ff:ff:ff', '192.168.0.2')
+        self.assertEqual(len(frame), 42)
+        self.assertEqual(frame[:14], '\xff' * 6 + '\x00\x11\x22\x33\x44\x55' + '\x08\x06')
+        (hrd, pro, hln, pln, op) = struct.unpack('!HHBBH', frame[14:22])
+        self.assertEqual((hrd, pro, hln, pln, op), (1, 0x0800, 6, 4, 1))
+        self.assertEqual(frame[22:28], '\x00\x11\x22\x33\x44\x55')
+        self.assertEqual(socket.inet_ntoa(frame[28:32]), '192.168.0.1')
+        self.assertEqual(frame[32:38], '\x00' * 6)
+        self.assertEqual(socket.inet_ntoa(frame[38:42]), '192.168.0.2')
+
+    def test_build_neighbor_solicitation(self):
+        message = arp_update.build_neighbor_solicitation('00:11:22:33:44:55', 'fc00::2')
+        self.assertEqual(len(message), 32)
+        # Type, code, checksum filled in by the kernel, reserved
+        self.assertEqual(struct.unpack('!BBHI', message[:8]), (135, 0, 0, 0))
+        self.assertEqual(socket.inet_ntop(socket.AF_INET6, message[8:24]), 'fc00::2')
+        # Source link-layer address option
+        self.assertEqual(message[24:], '\x01\x01\x00\x11\x22\x33\x44\x55')
+
+    def test_get_solicited_node_address(self):
+        self.assertEqual(arp_update.get_solicited_node_address('2001:db8::1:2345:6789'), 'ff02::1:ff45:6789')
+        self.assertEqual(arp_update.get_solicited_node_address('fc00::2'), 'ff02::1:ff00:2')
+
+
+class TestPacketPacer(TestCase):
+
+    def setUp(self):
+        self.saved_time = arp_update.time
+        self.clock = FakeClock()
+        arp_update.time = self.clock
+
+    def tearDown(self):
+        arp_update.time = self.saved_time
+
+    def test_pacing(self):
+        pacer = arp_update.PacketPacer(max_packets_per_sec=100, batch_size=10)
+        sock = FakeSocket()
+        for index in range(25):
+            pacer.send(sock, str(index))
+        self.assertEqual(len(sock.sent), 25)
+        self.assertEqual(pacer.sent, 25)
+
+        # Each batch after the first waits until the previous one has
+        # lasted batch_size / max_packets_per_sec
+        self.assertEqual(len(self.clock.sleeps), 2)
+        for secs in self.clock.sleeps:
+            self.assertAlmostEqual(secs, 0.1)
+
+    def test_no_wait_when_slow(self):
+        pacer = arp_update.PacketPacer(max_packets_per_sec=100, batch_size=10)
+        sock = FakeSocket()
+        for index in range(20):
+            pacer.send(sock, str(index))
+            self.clock.now += 0.02
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_send_error(self):
+        class FailingSocket(object):
+            def send(self, data):
+                raise socket.error(105, 'No buffer space available')
+
+        pacer = arp_update.PacketPacer(max_packets_per_sec=100)
+        pacer.send(FailingSocket(), 'data')
+        self.assertEqual((pacer.sent, pacer.errors), (0, 1))
+
+
+class TestArpUpdater(TestCase):
+
+    def setUp(self):
+        self.saved = (arp_update.time, arp_update.ConfigDBConnector)
+        self.clock = FakeClock()
+        arp_update.time = self.clock
+        arp_update.ConfigDBConnector = FakeConfigDBConnector
+
+        self.updater = arp_update.ArpUpdater(refresh_interval=300, max_packets_per_sec=1000)
+        self.config_db = self.updater.config_db
+        self.config_db.tables = {
+            'INTERFACE': [('Ethernet0', '10.0.0.0/31')],
+            'PORTCHANNEL_INTERFACE': ['PortChannel0001', ('PortChannel0001', '10.0.0.2/31')],
+            'VLAN': ['Vlan1000'],
+            'VLAN_INTERFACE': [('Vlan1000', '192.168.0.1/21'), ('Vlan1000', 'fc02:1000::1/64')],
+        }
+
+        # Records the refreshes instead of sending packets
+        self.refreshes = []
+        self.updater.refresh = self.record_refresh
+
+    def tearDown(self):
+        (arp_update.time, arp_update.ConfigDBConnector) = self.saved
+
+    def record_refresh(self, l3_intfs=None, vlans=None):
+        self.refreshes.append((self.clock.now, l3_intfs, vlans))
+
+    def test_load_config(self):
+        self.updater.load_config()
+        self.assertEqual(self.updater.l3_intfs, ['Ethernet0', 'PortChannel0001'])
+        self.assertEqual(self.updater.vlans, ['Vlan1000'])
+        self.assertEqual(self.updater.get_source_ip('Vlan1000', '192.168.3.4'), '192.168.0.1')
+        self.assertIsNone(self.updater.get_source_ip('Vlan2000', '192.168.3.4'))
+
+    def test_reload_config(self):
+        self.updater.load_config()
+        self.config_db.tables['VLAN'].append('Vlan2000')
+        self.config_db.tables['VLAN_INTERFACE'].append(('Vlan2000', '192.168.8.1/21'))
+        self.updater.reload_config(set([('VLAN', 'Vlan2000'), ('VLAN_INTERFACE', 'Vlan2000'),
+                                        ('INTERFACE', 'Ethernet8')]))
+        # Only the changed interfaces still configured are refreshed
+        self.assertEqual(self.updater.vlans, ['Vlan1000', 'Vlan2000'])
+        self.assertEqual(self.refreshes, [(self.clock.now, [], ['Vlan2000'])])
+
+        self.updater.reload_config(set([('INTERFACE', 'Ethernet8')]))
+        self.assertEqual(len(self.refreshes), 1)
+
+    def test_run_reloads_after_burst(self):
+        start = self.clock.now
+        self.config_db.tables['VLAN'].append('Vlan2000')
+        self.config_db.subscriber = FakePubSub(self.clock, '__keyspace@4__:', [
+            (start + 10, 'VLAN|Vlan2000'),
+            (start + 10.6, 'VLAN_INTERFACE|Vlan2000|192.168.8.1/21'),
+            (start + 10.8, 'INTERFACE|Ethernet0|10.0.0.0/31'),
+        ], end=start + 30)
+
+        self.assertRaises(Done, self.updater.run)
+        self.assertEqual(len(self.refreshes), 2)
+        # Full refresh at startup
+        self.assertEqual(self.refreshes[0], (start, None, None))
+        # Once the burst settled, well before the next full refresh
+        (at, l3_intfs, vlans) = self.refreshes[1]
+        self.assertAlmostEqual(at, start + 10.8 + arp_update.CONFIG_SETTLE_SECS)
+        self.assertEqual((l3_intfs, vlans), (['Ethernet0'], ['Vlan2000']))
+
+    def test_run_reloads_during_long_burst(self):
+        start = self.clock.now
+        notifications = [(start + 10 + index * 0.5, 'VLAN|Vlan1000') for index in range(40)]
+        self.config_db.subscriber = FakePubSub(self.clock, '__keyspace@4__:', notifications, end=start + 40)
+
+        self.assertRaises(Done, self.updater.run)
+        # Changes notified continuously are handled at most
+        # CONFIG_MAX_DELAY_SECS after the first one
+        self.assertAlmostEqual(self.refreshes[1][0], start + 10 + arp_update.CONFIG_MAX_DELAY_SECS)
+        self.assertEqual(self.refreshes[1][2], ['Vlan1000'])
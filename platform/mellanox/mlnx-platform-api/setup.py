@@ -1,4 +1,10 @@
 from setuptools import setup
+import unittest
+
+def get_test_suite():
+    test_loader = unittest.TestLoader()
+    test_suite = test_loader.discover('tests', pattern='test_*.py')
+    return test_suite
 
 setup(
     name='mlnx-platform-api',
@@ -13,6 +19,7 @@ setup(
     packages=[
         'sonic_platform',
     ],
+    test_suite='setup.get_test_suite',
     classifiers=[
         'Development Status :: 3 - Alpha',
         'Environment :: Plugins',
@@ -19,6 +19,8 @@ try:
     import re
     import subprocess
     import syslog
+    import threading
+    import Queue
 except ImportError as e:
     raise ImportError (str(e) + "- required module not found")
 
@@ -26,6 +28,9 @@ MAX_SELECT_DELAY = 3600
 
 MLNX_NUM_PSU = 2
 
+# Maximum number of sfps whose DOM capabilities are detected in parallel
+SFP_WARM_UP_MAX_WORKERS = 4
+
 GET_HWSKU_CMD = "sonic-cfggen -d -v DEVICE_METADATA.localhost.hwsku"
 
 EEPROM_CACHE_ROOT = '/var/cache/sonic/decode-syseeprom'
@@ -192,6 +197,91 @@ class Chassis(ChassisBase):
         return sfp
 
 
+    def get_all_sfp_status(self):
+        """
+        Retrieves the presence and module status of all sfps in one shot.
+        The snapshot is reused for a short time and discarded on sfp
+        change events.
+
+        Returns:
+            A dict of sfp index (0-based) to a dict with keys 'present', a
+            Boolean, and 'oper_status', the PMAOS operational status of the
+            module or None if unknown
+        """
+        if not self.sfp_module_initialized:
+            self.initialize_sfp()
+
+        from sonic_platform.sfp import sfp_status_snapshot
+        return sfp_status_snapshot.get_all()
+
+
+    def get_all_sfp_presence(self):
+        """
+        Retrieves the presence of all sfps in one shot
+
+        Returns:
+            A dict of sfp index (0-based) to True if present, False if not
+        """
+        return dict((index, status['present']) for (index, status) in self.get_all_sfp_status().items())
+
+
+    def warm_up_sfps(self, max_workers=SFP_WARM_UP_MAX_WORKERS):
+        """
+        Detects the DOM capabilities of all present sfps ahead of their
+        first DOM access, in parallel by at most max_workers threads.
+        Optional, the capabilities of an sfp are otherwise detected on its
+        first DOM access.
+        """
+        if not self.sfp_module_initialized:
+            self.initialize_sfp()
+
+        presence = self.get_all_sfp_presence()
+        pending = Queue.Queue()
+        for sfp in self._sfp_list:
+            if presence.get(sfp.sdk_index):
+                pending.put(sfp)
+
+        def worker():
+            while True:
+                try:
+                    sfp = pending.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    sfp.get_dom_capability()
+                except Exception as e:
+                    logger.log_warning("Fail to detect capabilities of sfp {} due to {}".format(sfp.index, repr(e)))
+
+        workers = []
+        for index in range(min(max_workers, pending.qsize())):
+            thread = threading.Thread(target=worker, name='sfp-warm-up-{}'.format(index))
+            thread.daemon = True
+            thread.start()
+            workers.append(thread)
+        for thread in workers:
+            thread.join()
+
+
+    def get_all_sfp_lpmode(self):
+        """
+        Retrieves the low power mode of all QSFPs through a single SDK
+        session, rather than one per SFP
+
+        Returns:
+            A dict of sfp index (0-based) to True if lpmode is enabled,
+            False if disabled, None if it could not be retrieved
+        """
+        if not self.sfp_module_initialized:
+            self.initialize_sfp()
+
+        from sonic_platform.sdk_session import get_sdk_session
+        qsfp_indexes = [sfp.sdk_index for sfp in self._sfp_list if sfp.sfp_type == 'QSFP']
+        lpmodes = {}
+        for (index, mcion) in get_sdk_session().get_mcion(qsfp_indexes).items():
+            lpmodes[index] = None if mcion is None else (mcion.module_status_bits & (1 << 8)) != 0
+        return lpmodes
+
+
     def _extract_num_of_fans_and_fan_drawers(self):
         num_of_fan = 0
         num_of_drawer = 0
@@ -432,6 +522,15 @@ class Chassis(ChassisBase):
                 if not status:
                     break
                 i = i + 1
+
+            if port_dict:
+                # Presence changed, the status snapshot and what was read
+                # from the modules are outdated
+                from sonic_platform.sfp import sfp_status_snapshot
+                for port in port_dict:
+                    sfp_status_snapshot.module_changed(port)
+                sfp_status_snapshot.invalidate()
+
             return True, {'sfp':port_dict}
         else:
             return True, {'sfp':{}}
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+'''
+Process-wide session with the SDK, shared by all SFP objects.
+
+The sx_api handle and the register access context are opened on first
+use and kept for the lifetime of the process, instead of being set up
+and torn down around every register access. If an access fails because
+the session is broken, e.g. the SDK restarted, the session is reopened;
+a get is then retried once, a set is not, as it may have been applied.
+Bulk variants access a register of many modules in a single session.
+
+While the SDK is not running, e.g. before syncd starts, opening the
+session is not attempted again for a while after a failure, and the
+failure is logged once until the session opens.
+'''
+
+import os
+import threading
+import time
+from python_sdk_api.sxd_api import *
+from python_sdk_api.sx_api import *
+from sonic_daemon_base.daemon_base import Logger
+
+SYSLOG_IDENTIFIER = "sdk-session"
+
+REGISTER_NUM = 1
+DEVICE_ID = 1
+SWITCH_ID = 0
+
+# Returned instead of an SDK status when the session can't be opened
+RC_SESSION_FAILED = -1
+
+# Time after a failure to open the session before trying again
+OPEN_RETRY_INTERVAL_SECS = 30
+
+# Statuses of a register access which mean that the session is broken,
+# rather than that the access failed, e.g. for an absent module. Only the
+# ones defined by the SDK are used.
+SESSION_FAILURE_STATUS_NAMES = [
+    'SXD_STATUS_NOT_INITIALIZED',
+    'SXD_STATUS_DEVICE_OPEN_ERROR',
+    'SXD_STATUS_HANDLE_ERROR'
+]
+SESSION_FAILURE_STATUSES = set([RC_SESSION_FAILED] +
+                               [globals()[name] for name in SESSION_FAILURE_STATUS_NAMES if name in globals()])
+
+logger = Logger(SYSLOG_IDENTIFIER)
+
+class SdkSession(object):
+    ''' sx_api handle and register access context of the process '''
+
+    def __init__(self):
+        self.handle = None
+        # Process which initialized register access, None if not initialized
+        self.reg_access_pid = None
+        # Time before which opening the session is not tried again, and
+        # whether the failure to open it was logged
+        self.open_retry_time = 0
+        self.open_failure_logged = False
+        self.lock = threading.RLock()
+
+    def open(self):
+        '''
+        Opens the session, if not opened yet by this process
+
+        Returns:
+            True if the session is open, False if it failed to open or was
+            not tried again yet after a failure
+        '''
+        with self.lock:
+            pid = os.getpid()
+            if self.reg_access_pid not in (None, pid):
+                # Inherited from the parent process, which owns it
+                self.handle = None
+                self.reg_access_pid = None
+
+            if self.handle is not None and self.reg_access_pid is not None:
+                return True
+
+            if time.time() < self.open_retry_time:
+                return False
+
+            if self.handle is None:
+                rc, handle = sx_api_open(None)
+                if rc != SX_STATUS_SUCCESS:
+                    self._open_failed("Failed to open api handle, please check whether SDK is running.")
+                    return False
+                self.handle = handle
+
+            if self.reg_access_pid is None:
+                rc = sxd_access_reg_init(pid, None, 0)
+                if rc != 0:
+                    self._open_failed("Failed to initializing register access, please check that SDK is running.")
+                    return False
+                self.reg_access_pid = pid
+
+            if self.open_failure_logged:
+                logger.log_info("SDK session opened")
+                self.open_failure_logged = False
+            self.open_retry_time = 0
+            return True
+
+    def _open_failed(self, msg):
+        # Called with the lock held
+        if not self.open_failure_logged:
+            logger.log_warning("{} Retrying every {} seconds.".format(msg, OPEN_RETRY_INTERVAL_SECS))
+            self.open_failure_logged = True
+        self.open_retry_time = time.time() + OPEN_RETRY_INTERVAL_SECS
+
+    def close(self):
+        with self.lock:
+            if self.reg_access_pid == os.getpid():
+                rc = sxd_access_reg_deinit()
+                if rc != 0:
+                    logger.log_warning("Failed to deinitializing register access.")
+                if self.handle is not None:
+                    rc = sx_api_close(self.handle)
+                    if rc != SX_STATUS_SUCCESS:
+                        logger.log_warning("sx_api_close exited with error, rc {}".format(rc))
+            self.handle = None
+            self.reg_access_pid = None
+
+    def _init_sx_meta_data(self, access_cmd):
+        meta = sxd_reg_meta_t()
+        meta.dev_id = DEVICE_ID
+        meta.swid = SWITCH_ID
+        meta.access_cmd = access_cmd
+        return meta
+
+    def _access_reg_once(self, access_func, reg, access_cmd):
+        if not self.open():
+            return RC_SESSION_FAILED
+        return access_func(reg, self._init_sx_meta_data(access_cmd), REGISTER_NUM, None, None)
+
+    def access_reg(self, access_func, reg, access_cmd):
+        '''
+        Gets or sets a register, e.g.
+            access_reg(sxd_access_reg_pmaos, pmaos, SXD_ACCESS_CMD_GET)
+
+        If the session is broken, it is reopened, and a get is retried
+        once. A set is not retried, as it may have been applied, e.g. a
+        module reset.
+
+        Returns:
+            The status of the access, SXD_STATUS_SUCCESS on success
+        '''
+        with self.lock:
+            rc = self._access_reg_once(access_func, reg, access_cmd)
+            if rc not in SESSION_FAILURE_STATUSES:
+                return rc
+
+            logger.log_info("Register access failed with rc {}, reopening the SDK session".format(rc))
+            self.close()
+            if access_cmd == SXD_ACCESS_CMD_GET:
+                rc = self._access_reg_once(access_func, reg, access_cmd)
+            return rc
+
+    def get_module_regs(self, reg_class, access_func, modules):
+        '''
+        Gets a module register of many modules
+
+        Returns:
+            A dict of module to register, None for the modules whose
+            register could not be read
+        '''
+        regs = {}
+        with self.lock:
+            for module in modules:
+                reg = reg_class()
+                reg.module = module
+                rc = self.access_reg(access_func, reg, SXD_ACCESS_CMD_GET)
+                if rc != SXD_STATUS_SUCCESS:
+                    logger.log_warning("{} getting failed for module {}, rc = {}".format(access_func.__name__, module, rc))
+                    reg = None
+                regs[module] = reg
+        return regs
+
+    def get_mcion(self, modules):
+        ''' MCION of modules: module status bits, e.g. low power mode '''
+        return self.get_module_regs(ku_mcion_reg, sxd_access_reg_mcion, modules)
+
+    def get_pmaos(self, modules):
+        ''' PMAOS of modules: module admin and operational status '''
+        return self.get_module_regs(ku_pmaos_reg, sxd_access_reg_pmaos, modules)
+
+    def get_pmmp(self, modules):
+        ''' PMMP of modules: module EEPROM overrides, e.g. low power mode '''
+        return self.get_module_regs(ku_pmmp_reg, sxd_access_reg_pmmp, modules)
+
+    def reset_modules(self, modules):
+        '''
+        Resets modules
+
+        Returns:
+            A dict of module to True if it was reset, False if not
+        '''
+        results = {}
+        with self.lock:
+            for (module, pmaos) in self.get_pmaos(modules).items():
+                if pmaos is None:
+                    results[module] = False
+                    continue
+                pmaos.rst = 1
+                rc = self.access_reg(sxd_access_reg_pmaos, pmaos, SXD_ACCESS_CMD_SET)
+                if rc != SXD_STATUS_SUCCESS:
+                    logger.log_warning("sxd_access_reg_pmaos setting failed, rc = %d" % rc)
+                results[module] = rc == SXD_STATUS_SUCCESS
+        return results
+
+
+_sdk_session = None
+
+def get_sdk_session():
+    ''' Returns the SDK session of the process '''
+    global _sdk_session
+    if _sdk_session is None:
+        _sdk_session = SdkSession()
+    return _sdk_session
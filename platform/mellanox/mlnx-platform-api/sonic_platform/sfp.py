@@ -10,7 +10,7 @@
 
 try:
     import os
-    import subprocess
+    import threading
     import time
     from sonic_platform_base.sfp_base import SfpBase
     from sonic_platform_base.sonic_eeprom import eeprom_dts
@@ -20,6 +20,8 @@ try:
     from sonic_platform_base.sonic_sfp.sff8436 import sff8436Dom
     from sonic_platform_base.sonic_sfp.inf8628 import inf8628InterfaceId
     from sonic_daemon_base.daemon_base import Logger
+    from sonic_daemon_base.module_eeprom import is_module_present, read_module_eeprom_hex
+    from sonic_platform.sdk_session import get_sdk_session
     from python_sdk_api.sxd_api import *
     from python_sdk_api.sx_api import *
 
@@ -152,7 +154,6 @@ QSFP_TYPE = "QSFP"
 OSFP_TYPE = "OSFP"
 
 #variables for sdk
-REGISTER_NUM = 1
 DEVICE_ID = 1
 SWITCH_ID = 0
 SX_PORT_ATTR_ARR_SIZE = 64
@@ -164,6 +165,10 @@ PMAOS_RST = 0
 PMAOS_ENABLE = 1
 PMAOS_DISABLE = 2
 
+# PMAOS operational status of a plugged module: enabled, with error or
+# disabled
+PMAOS_OPER_STATUS_PLUGGED = (1, 3, 4)
+
 PMMP_LPMODE_BIT = 8
 MCION_TX_DISABLE_BIT = 1
 
@@ -187,57 +192,184 @@ PORT_TYPE_OFFSET = 28
 PORT_TYPE_MASK = 0xF0000000
 NVE_MASK = PORT_TYPE_MASK & (PORT_TYPE_NVE << PORT_TYPE_OFFSET)
 
+# hw-management module presence file content of a plugged module
+SFP_STATUS_INSERTED = '1'
+
+# Time for which a status snapshot of all modules is used
+SFP_STATUS_SNAPSHOT_TTL_SECS = 1
+
+# DOM capabilities of a module, detected from its EEPROM on first use
+# after it is plugged in, and their values until detected
+DOM_CAPABILITY_DEFAULTS = {
+    'dom_supported': False,
+    'dom_temp_supported': False,
+    'dom_volt_supported': False,
+    'dom_rx_power_supported': False,
+    'dom_tx_power_supported': False,
+    'dom_tx_disable_supported': False,
+    'calibration': 0
+}
+
 # Global logger class instance
 SYSLOG_IDENTIFIER = "mlnx-sfp"
 logger = Logger(SYSLOG_IDENTIFIER)
 
-class SFP(SfpBase):
-    """Platform-specific SFP class"""
+class SfpStatusSnapshot(object):
+    """
+    Presence and operational status of all modules, read in one shot and
+    reused for a short time, rather than probing the modules one by one
+
+    The status of a module is its PMAOS operational status, read for all
+    modules through a single SDK session. If it can't be read, presence
+    is taken from the hw-management module presence file, else from the
+    module EEPROM.
+
+    The generation of a module changes whenever it is seen plugged in or
+    out, so that what was read from a module is known to be outdated.
+    """
+    def __init__(self, ttl=SFP_STATUS_SNAPSHOT_TTL_SECS):
+        self.ttl = ttl
+        self.modules = set()
+        self.status = {}
+        self.timestamp = 0
+        # Last known presence and generation of each module, kept across
+        # snapshots
+        self.presence = {}
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def add_module(self, module):
+        with self.lock:
+            self.modules.add(module)
+
+    def invalidate(self):
+        """
+        Discards the snapshot, e.g. on a module plug in or out event
+        """
+        with self.lock:
+            self.status = {}
+            self.timestamp = 0
 
-    def __init__(self, sfp_index, sfp_type):
-        self.index = sfp_index + 1
-        self.sfp_eeprom_path = "qsfp{}".format(self.index)
-        self.sfp_status_path = "qsfp{}_status".format(self.index)
-        self.sfp_type = sfp_type
-        self.dom_tx_disable_supported = False
-        self._dom_capability_detect()
-        self.sdk_handle = None
-        self.sdk_index = sfp_index
+    def module_changed(self, module):
+        """
+        Marks a module as plugged in or out, e.g. on its change event
+        """
+        with self.lock:
+            self.generations[module] = self.generations.get(module, 0) + 1
+
+    def _read_presence_file(self, module):
+        try:
+            with open(os.path.join(SFP_PATH, "qsfp{}_status".format(module + 1))) as f:
+                return f.read().strip() == SFP_STATUS_INSERTED
+        except IOError:
+            return None
+
+    def _read(self, modules):
+        sdk_session = get_sdk_session()
+        regs = sdk_session.get_pmaos(modules) if sdk_session.open() else {}
+
+        status = {}
+        for module in modules:
+            pmaos = regs.get(module)
+            if pmaos is not None:
+                status[module] = {'present': pmaos.oper_status in PMAOS_OPER_STATUS_PLUGGED,
+                                  'oper_status': pmaos.oper_status}
+                continue
+
+            present = self._read_presence_file(module)
+            if present is None:
+                present = is_module_present("sfp{}".format(module + 1))
+            status[module] = {'present': present, 'oper_status': None}
+        return status
+
+    def _update(self, status):
+        # Called with the lock held
+        for (module, module_status) in status.items():
+            if self.presence.get(module) != module_status['present']:
+                self.presence[module] = module_status['present']
+                self.generations[module] = self.generations.get(module, 0) + 1
+        self.status.update(status)
+
+    def _refresh(self):
+        # Called with the lock held
+        if time.time() - self.timestamp >= self.ttl:
+            self.status = {}
+            self._update(self._read(sorted(self.modules)))
+            self.timestamp = time.time()
+
+    def get_all(self):
+        """
+        Returns:
+            A dict of module (0-based) to a dict of its presence 'present'
+            and PMAOS operational status 'oper_status', None if unknown
+        """
+        with self.lock:
+            self._refresh()
+            return dict(self.status)
 
-    #SDK initializing stuff
-    def _initialize_sdk_handle(self):
+    def get_status(self, module):
+        """
+        Returns:
+            The status of a module, as in get_all()
         """
-        reference: device\mellanox\<sku>\pulgins\sfpreset.py
+        self.add_module(module)
+        with self.lock:
+            self._refresh()
+            if module not in self.status:
+                # Module added since the snapshot was taken
+                self._update(self._read([module]))
+            return self.status[module]
+
+    def get_generation(self, module):
         """
-        rc, self.sdk_handle = sx_api_open(None)
-        if (rc != SX_STATUS_SUCCESS):
-            logger.log_warning("Failed to open api handle, please check whether SDK is running.")
-            self.sdk_handle = None
+        Returns:
+            The generation of a module, which changes whenever it is
+            plugged in or out
+        """
+        self.get_status(module)
+        with self.lock:
+            return self.generations.get(module, 0)
 
-        self.mypid = os.getpid()
 
-    def _open_sdk(self):
-        if self.sdk_handle is None:
-            self._initialize_sdk_handle()
+# Status snapshot shared by all SFP objects
+sfp_status_snapshot = SfpStatusSnapshot()
 
-        rc = sxd_access_reg_init(self.mypid, None, 0)
-        if rc != 0:
-            logger.log_warning("Failed to initializing register access, please check that SDK is running.")
-            return False
+def _dom_capability_property(name):
+    # Attribute of the DOM capabilities, detected when first read
+    def getter(self):
+        return self.get_dom_capability()[name]
 
-        return True
+    return property(getter)
+
+class SFP(SfpBase):
+    """Platform-specific SFP class"""
 
-    def _close_sdk(self):
-        rc = sxd_access_reg_deinit()
-        if rc != 0:
-            logger.log_warning("Failed to deinitializing register access.")
-            #no further actions here
+    dom_supported = _dom_capability_property('dom_supported')
+    dom_temp_supported = _dom_capability_property('dom_temp_supported')
+    dom_volt_supported = _dom_capability_property('dom_volt_supported')
+    dom_rx_power_supported = _dom_capability_property('dom_rx_power_supported')
+    dom_tx_power_supported = _dom_capability_property('dom_tx_power_supported')
+    dom_tx_disable_supported = _dom_capability_property('dom_tx_disable_supported')
+    calibration = _dom_capability_property('calibration')
 
-    def _init_sx_meta_data(self):
-        meta = sxd_reg_meta_t()
-        meta.dev_id = DEVICE_ID
-        meta.swid = SWITCH_ID
-        return meta
+    def __init__(self, sfp_index, sfp_type):
+        self.index = sfp_index + 1
+        self.sfp_eeprom_path = "qsfp{}".format(self.index)
+        self.sfp_status_path = "qsfp{}_status".format(self.index)
+        self.sfp_type = sfp_type
+        self.sdk_session = get_sdk_session()
+        self.sdk_index = sfp_index
+        sfp_status_snapshot.add_module(sfp_index)
+        # DOM capabilities are detected on first use, rather than reading
+        # the EEPROM of every module when the SFPs are created
+        self._dom_capability = dict(DOM_CAPABILITY_DEFAULTS)
+        self._dom_capability_generation = None
+        self._dom_capability_lock = threading.Lock()
+
+    @property
+    def sdk_handle(self):
+        # sx_api handle of the SDK session shared by all SFPs
+        return self.sdk_session.handle
 
     def get_presence(self):
         """
@@ -246,53 +378,50 @@ class SFP(SfpBase):
         Returns:
             bool: True if device is present, False if not
         """
-        presence = False
-        ethtool_cmd = "ethtool -m sfp{} hex on offset 0 length 4 2>/dev/null".format(self.index)
-        try:
-            proc = subprocess.Popen(ethtool_cmd, stdout=subprocess.PIPE, shell=True, stderr=subprocess.STDOUT)
-            stdout = proc.communicate()[0]
-            proc.wait()
-            result = stdout.rstrip('\n')
-            if result != '':
-                presence = True
-
-        except OSError, e:
-            raise OSError("Cannot detect sfp")
-
-        return presence
+        return sfp_status_snapshot.get_status(self.sdk_index)['present']
 
     # Read out any bytes from any offset
     def _read_eeprom_specific_bytes(self, offset, num_bytes):
-        eeprom_raw = []
-        ethtool_cmd = "ethtool -m sfp{} hex on offset {} length {}".format(self.index, offset, num_bytes)
-        try:
-            output = subprocess.check_output(ethtool_cmd, shell=True)
-            output_lines = output.splitlines()
-            first_line_raw = output_lines[0]
-            if "Offset" in first_line_raw:
-                for line in output_lines[2:]:
-                    line_split = line.split()
-                    eeprom_raw = eeprom_raw + line_split[1:]
-        except subprocess.CalledProcessError as e:
-            return None
+        return read_module_eeprom_hex("sfp{}".format(self.index), offset, num_bytes)
 
-        return eeprom_raw
+    def get_dom_capability(self):
+        """
+        Retrieves the DOM capabilities of the module, detected from its
+        EEPROM once per insertion of the module
+
+        Returns:
+            A dict of the capability attributes, e.g. 'dom_supported', to
+            their values
+        """
+        generation = sfp_status_snapshot.get_generation(self.sdk_index)
+        with self._dom_capability_lock:
+            if self._dom_capability_generation != generation:
+                self._dom_capability = self._dom_capability_detect()
+                self._dom_capability_generation = generation
+            return self._dom_capability
 
     def _dom_capability_detect(self):
+        """
+        Detects the DOM capabilities of the module from its EEPROM
+
+        Returns:
+            A dict of the capability attributes to their values
+        """
+        capability = dict(DOM_CAPABILITY_DEFAULTS)
         if not self.get_presence():
-            self.dom_supported = False
-            self.dom_temp_supported = False
-            self.dom_volt_supported = False
-            self.dom_rx_power_supported = False
-            self.dom_tx_power_supported = False
-            self.calibration = 0
-            return
+            capability['dom_supported'] = False
+            capability['dom_temp_supported'] = False
+            capability['dom_volt_supported'] = False
+            capability['dom_rx_power_supported'] = False
+            capability['dom_tx_power_supported'] = False
+            capability['calibration'] = 0
+            return capability
 
         if self.sfp_type == "QSFP":
-            self.calibration = 1
+            capability['calibration'] = 1
             sfpi_obj = sff8436InterfaceId()
             if sfpi_obj is None:
-                self.dom_supported = False
+                capability['dom_supported'] = False
             offset = 128
 
             # QSFP capability byte parse, through this byte can know whether it support tx_power or not.
@@ -305,63 +434,65 @@ class SFP(SfpBase):
                 qsfp_version_compliance = int(qsfp_version_compliance_raw[0], 16)
                 qspf_dom_capability = int(qsfp_dom_capability_raw[0], 16)
                 if qsfp_version_compliance >= 0x08:
-                    self.dom_temp_supported = (qspf_dom_capability & 0x20 != 0)
-                    self.dom_volt_supported = (qspf_dom_capability & 0x10 != 0)
-                    self.dom_rx_power_supported = (qspf_dom_capability & 0x08 != 0)
-                    self.dom_tx_power_supported = (qspf_dom_capability & 0x04 != 0)
+                    capability['dom_temp_supported'] = (qspf_dom_capability & 0x20 != 0)
+                    capability['dom_volt_supported'] = (qspf_dom_capability & 0x10 != 0)
+                    capability['dom_rx_power_supported'] = (qspf_dom_capability & 0x08 != 0)
+                    capability['dom_tx_power_supported'] = (qspf_dom_capability & 0x04 != 0)
                 else:
-                    self.dom_temp_supported = True
-                    self.dom_volt_supported = True
-                    self.dom_rx_power_supported = (qspf_dom_capability & 0x08 != 0)
-                    self.dom_tx_power_supported = True
-                self.dom_supported = True
-                self.calibration = 1
+                    capability['dom_temp_supported'] = True
+                    capability['dom_volt_supported'] = True
+                    capability['dom_rx_power_supported'] = (qspf_dom_capability & 0x08 != 0)
+                    capability['dom_tx_power_supported'] = True
+                capability['dom_supported'] = True
+                capability['calibration'] = 1
                 qsfp_option_value_raw = self._read_eeprom_specific_bytes(QSFP_OPTION_VALUE_OFFSET, QSFP_OPTION_VALUE_WIDTH)
                 if qsfp_option_value_raw is not None:
                     sfpd_obj = sff8436Dom()
                     if sfpd_obj is None:
-                        return None
+                        return capability
                     self.optional_capability = sfpd_obj.parse_option_params(qsfp_option_value_raw, 0)
-                    self.dom_tx_disable_supported = self.optional_capability['data']['TxDisable']['value'] == 'On'
+                    capability['dom_tx_disable_supported'] = self.optional_capability['data']['TxDisable']['value'] == 'On'
             else:
-                self.dom_supported = False
-                self.dom_temp_supported = False
-                self.dom_volt_supported = False
-                self.dom_rx_power_supported = False
-                self.dom_tx_power_supported = False
-                self.calibration = 0
+                capability['dom_supported'] = False
+                capability['dom_temp_supported'] = False
+                capability['dom_volt_supported'] = False
+                capability['dom_rx_power_supported'] = False
+                capability['dom_tx_power_supported'] = False
+                capability['calibration'] = 0
         elif self.sfp_type == "SFP":
             sfpi_obj = sff8472InterfaceId()
             if sfpi_obj is None:
-                return None
+                return capability
             sfp_dom_capability_raw = self._read_eeprom_specific_bytes(XCVR_DOM_CAPABILITY_OFFSET, XCVR_DOM_CAPABILITY_WIDTH)
             if sfp_dom_capability_raw is not None:
                 sfp_dom_capability = int(sfp_dom_capability_raw[0], 16)
-                self.dom_supported = (sfp_dom_capability & 0x40 != 0)
-                if self.dom_supported:
-                    self.dom_temp_supported = True
-                    self.dom_volt_supported = True
-                    self.dom_rx_power_supported = True
-                    self.dom_tx_power_supported = True
+                capability['dom_supported'] = (sfp_dom_capability & 0x40 != 0)
+                if capability['dom_supported']:
+                    capability['dom_temp_supported'] = True
+                    capability['dom_volt_supported'] = True
+                    capability['dom_rx_power_supported'] = True
+                    capability['dom_tx_power_supported'] = True
                     if sfp_dom_capability & 0x20 != 0:
-                        self.calibration = 1
+                        capability['calibration'] = 1
                     elif sfp_dom_capability & 0x10 != 0:
-                        self.calibration = 2
+                        capability['calibration'] = 2
                     else:
-                        self.calibration = 0
+                        capability['calibration'] = 0
                 else:
-                    self.dom_temp_supported = False
-                    self.dom_volt_supported = False
-                    self.dom_rx_power_supported = False
-                    self.dom_tx_power_supported = False
-                    self.calibration = 0
-                self.dom_tx_disable_supported = (int(sfp_dom_capability_raw[1], 16) & 0x40 != 0)
+                    capability['dom_temp_supported'] = False
+                    capability['dom_volt_supported'] = False
+                    capability['dom_rx_power_supported'] = False
+                    capability['dom_tx_power_supported'] = False
+                    capability['calibration'] = 0
+                capability['dom_tx_disable_supported'] = (int(sfp_dom_capability_raw[1], 16) & 0x40 != 0)
         else:
-            self.dom_supported = False
-            self.dom_temp_supported = False
-            self.dom_volt_supported = False
-            self.dom_rx_power_supported = False
-            self.dom_tx_power_supported = False
+            capability['dom_supported'] = False
+            capability['dom_temp_supported'] = False
+            capability['dom_volt_supported'] = False
+            capability['dom_rx_power_supported'] = False
+            capability['dom_tx_power_supported'] = False
+
+        return capability
 
     def _convert_string_to_num(self, value_str):
         if "-inf" in value_str:
@@ -861,25 +992,16 @@ class SFP(SfpBase):
             A Boolean, True if lpmode is enabled, False if disabled
         """
         if self.sfp_type == QSFP_TYPE:
-            if self._open_sdk():
-                # Get MCION
-                mcion = ku_mcion_reg()
-                mcion.module = self.sdk_index
-                meta = self._init_sx_meta_data()
-                meta.access_cmd = SXD_ACCESS_CMD_GET
-
-                rc = sxd_access_reg_mcion(mcion, meta, REGISTER_NUM, None, None)
-                self._close_sdk()
-
-                if rc != SXD_STATUS_SUCCESS:
-                    logger.log_warning("sxd_access_reg_mcion getting failed, rc = %d" % rc)
-                    return None
+            # Get MCION
+            mcion = self.sdk_session.get_mcion([self.sdk_index])[self.sdk_index]
+            if mcion is None:
+                return None
 
-                # Get low power mode status
-                lpm_mask = 1 << 8
-                lpm_status = (lpm_mask & mcion.module_status_bits) != 0
+            # Get low power mode status
+            lpm_mask = 1 << 8
+            lpm_status = (lpm_mask & mcion.module_status_bits) != 0
 
-                return lpm_status
+            return lpm_status
         else:
             return NotImplementedError
 
@@ -1149,64 +1271,32 @@ class SFP(SfpBase):
 
         refer plugins/sfpreset.py
         """
-        handle = self._open_sdk()
-        if handle is None:
-            return False
-
-        # Get PMAOS
-        pmaos = ku_pmaos_reg()
-        pmaos.module = self.sdk_index
-        meta = self._init_sx_meta_data()
-        meta.access_cmd = SXD_ACCESS_CMD_GET
-
-        rc = sxd_access_reg_pmaos(pmaos, meta, REGISTER_NUM, None, None)
-        if rc != SXD_STATUS_SUCCESS:
-            logger.log_warning("sxd_access_reg_pmaos getting failed, rc = %d" % rc)
-            self._close_sdk()
-            return None
-
-        # Reset SFP
-        pmaos.rst = 1
-        meta.access_cmd = SXD_ACCESS_CMD_SET
-        rc = sxd_access_reg_pmaos(pmaos, meta, REGISTER_NUM, None, None)
-        if rc != SXD_STATUS_SUCCESS:
-            logger.log_warning("sxd_access_reg_pmaos setting failed, rc = %d" % rc)
-
-        self._close_sdk()
-        return rc == SXD_STATUS_SUCCESS
+        return self.sdk_session.reset_modules([self.sdk_index])[self.sdk_index]
 
     def _write_i2c_via_mcia(self, page, i2caddr, address, data, mask):
-        handle = self._open_sdk()
-        if handle is None:
-            return False
-
         mcia = ku_mcia_reg()
-
-        meta = self._init_sx_meta_data()
-        meta.access_cmd = SXD_ACCESS_CMD_GET
-
         mcia.module = self.sdk_index
         mcia.page_number = page
         mcia.i2c_device_address = i2caddr
         mcia.device_address = address
         mcia.size = 1
-        rc = sxd_access_reg_mcia(mcia, meta, REGISTER_NUM, None, None)
-        if rc != SXD_STATUS_SUCCESS:
-            logger.log_warning("sxd_access_reg_mcia getting failed, rc = %d" % rc)
-            self._close_sdk()
-            return False
 
-        original_data = (mcia.dword_0 >> 24) & 0x000000FF
-        updated_data = original_data & (~mask)
-        updated_data |= (data & mask)
+        # Read, modify and write without another access in between
+        with self.sdk_session.lock:
+            rc = self.sdk_session.access_reg(sxd_access_reg_mcia, mcia, SXD_ACCESS_CMD_GET)
+            if rc != SXD_STATUS_SUCCESS:
+                logger.log_warning("sxd_access_reg_mcia getting failed, rc = %d" % rc)
+                return False
+
+            original_data = (mcia.dword_0 >> 24) & 0x000000FF
+            updated_data = original_data & (~mask)
+            updated_data |= (data & mask)
 
-        mcia.dword_0 = (updated_data << 24) & 0xFF000000
-        meta.access_cmd = SXD_ACCESS_CMD_SET
-        rc = sxd_access_reg_mcia(mcia, meta, REGISTER_NUM, None, None)
-        if rc != SXD_STATUS_SUCCESS:
-            logger.log_warning("sxd_access_reg_mcia setting failed, rc = %d" % rc)
+            mcia.dword_0 = (updated_data << 24) & 0xFF000000
+            rc = self.sdk_session.access_reg(sxd_access_reg_mcia, mcia, SXD_ACCESS_CMD_SET)
+            if rc != SXD_STATUS_SUCCESS:
+                logger.log_warning("sxd_access_reg_mcia setting failed, rc = %d" % rc)
 
-        self._close_sdk()
         return rc == SXD_STATUS_SUCCESS
 
     def tx_disable(self, tx_disable):
@@ -1225,10 +1315,6 @@ class SFP(SfpBase):
         """
         if self.sfp_type == SFP_TYPE:
             if self.dom_tx_disable_supported:
-                handle = self._open_sdk()
-                if handle is None:
-                    return False
-
                 tx_disable_mask = 1 << MCIA_ADDR_TX_DISABLE_BIT
                 if tx_disable:
                     tx_disable_bit = tx_disable_mask
@@ -1325,9 +1411,7 @@ class SFP(SfpBase):
         # Get PMAOS
         pmaos = ku_pmaos_reg()
         pmaos.module = self.sdk_index
-        meta = self._init_sx_meta_data()
-        meta.access_cmd = SXD_ACCESS_CMD_GET
-        rc = sxd_access_reg_pmaos(pmaos, meta, REGISTER_NUM, None, None)
+        rc = self.sdk_session.access_reg(sxd_access_reg_pmaos, pmaos, SXD_ACCESS_CMD_GET)
         assert rc == SXD_STATUS_SUCCESS, "sxd_access_reg_pmaos failed, rc = %d" % rc
 
         # Set admin status to PMAOS
@@ -1340,17 +1424,14 @@ class SFP(SfpBase):
         else:
             pmaos.admin_status = PMAOS_ENABLE
 
-        meta.access_cmd = SXD_ACCESS_CMD_SET
-        rc = sxd_access_reg_pmaos(pmaos, meta, REGISTER_NUM, None, None)
+        rc = self.sdk_session.access_reg(sxd_access_reg_pmaos, pmaos, SXD_ACCESS_CMD_SET)
         assert rc == SXD_STATUS_SUCCESS, "sxd_access_reg_pmaos failed, rc = %d" % rc
 
     def _set_lpmode_raw(self, lpmode):
         # Get PMMP
         pmmp = ku_pmmp_reg()
         pmmp.module = self.sdk_index
-        meta = self._init_sx_meta_data()
-        meta.access_cmd = SXD_ACCESS_CMD_GET
-        rc = sxd_access_reg_pmmp(pmmp, meta, REGISTER_NUM, None, None)
+        rc = self.sdk_session.access_reg(sxd_access_reg_pmmp, pmmp, SXD_ACCESS_CMD_GET)
         assert rc == SXD_STATUS_SUCCESS, "sxd_access_reg_pmmp failed, rc = %d" % rc
 
         # Set low power mode status
@@ -1360,8 +1441,7 @@ class SFP(SfpBase):
         else:
             pmmp.eeprom_override = pmmp.eeprom_override & (~lpm_mask)
 
-        meta.access_cmd = SXD_ACCESS_CMD_SET
-        rc = sxd_access_reg_pmmp(pmmp, meta, REGISTER_NUM, None, None)
+        rc = self.sdk_session.access_reg(sxd_access_reg_pmmp, pmmp, SXD_ACCESS_CMD_SET)
 
         return rc
 
@@ -1376,26 +1456,28 @@ class SFP(SfpBase):
         Returns:
             A boolean, True if lpmode is set successfully, False if not
         """
-        handle = self._open_sdk()
-        if handle is None:
-            return False
-        try:
-            log_port_list = self.get_log_ports()
-            for log_port in log_port_list:
-                self.set_port_admin_status_by_log_port(log_port, SX_PORT_ADMIN_STATUS_DOWN)
-            self._set_sfp_admin_status_raw(SX_PORT_ADMIN_STATUS_DOWN)
-
-            result = self._set_lpmode_raw(lpmode)
-
-            self._set_sfp_admin_status_raw(SX_PORT_ADMIN_STATUS_UP)
-            for log_port in log_port_list:
-                self.set_port_admin_status_by_log_port(log_port, SX_PORT_ADMIN_STATUS_DOWN)
-
-            return result == SXD_STATUS_SUCCESS
-        except:
-            logger.log_warning("set_lpmode failed due to some SDK failure")
-            self._close_sdk()
-            return False
+        # The whole sequence runs without another access in between
+        with self.sdk_session.lock:
+            if not self.sdk_session.open():
+                return False
+            try:
+                log_port_list = self.get_log_ports()
+                for log_port in log_port_list:
+                    self.set_port_admin_status_by_log_port(log_port, SX_PORT_ADMIN_STATUS_DOWN)
+                self._set_sfp_admin_status_raw(SX_PORT_ADMIN_STATUS_DOWN)
+
+                result = self._set_lpmode_raw(lpmode)
+
+                self._set_sfp_admin_status_raw(SX_PORT_ADMIN_STATUS_UP)
+                for log_port in log_port_list:
+                    self.set_port_admin_status_by_log_port(log_port, SX_PORT_ADMIN_STATUS_DOWN)
+
+                return result == SXD_STATUS_SUCCESS
+            except:
+                logger.log_warning("set_lpmode failed due to some SDK failure")
+                # Reopen the session on next access, in case it is broken
+                self.sdk_session.close()
+                return False
 
     def set_power_override(self, power_override, power_set):
         """
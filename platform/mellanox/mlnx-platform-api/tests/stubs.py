@@ -0,0 +1,66 @@
+import os
+import sys
+import types
+
+# The SDK and the platform base packages are not available at build time,
+# install stubs of the names the modules under test import
+
+def _stub_module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    parent, _, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
+
+class _Stub(object):
+    def __init__(self, *args, **kwargs):
+        pass
+
+class _ChassisBase(object):
+    def __init__(self):
+        self._sfp_list = []
+
+class _Logger(object):
+    def __init__(self, *args, **kwargs):
+        self.messages = []
+
+    def log_info(self, msg, *args):
+        self.messages.append(msg)
+
+    log_warning = log_error = log_notice = log_debug = log_info
+
+def install():
+    if 'python_sdk_api' in sys.modules:
+        return
+
+    _stub_module('python_sdk_api')
+    _stub_module('python_sdk_api.sx_api',
+                 SX_STATUS_SUCCESS=0)
+    _stub_module('python_sdk_api.sxd_api',
+                 SXD_STATUS_SUCCESS=0,
+                 SXD_STATUS_ERROR=1,
+                 SXD_STATUS_HANDLE_ERROR=7,
+                 SXD_ACCESS_CMD_GET=1,
+                 SXD_ACCESS_CMD_SET=2,
+                 sxd_reg_meta_t=_Stub)
+    _stub_module('sonic_platform_base')
+    _stub_module('sonic_platform_base.platform_base', PlatformBase=_Stub)
+    _stub_module('sonic_platform_base.chassis_base', ChassisBase=_ChassisBase)
+    _stub_module('sonic_platform_base.component_base', ComponentBase=_Stub)
+    _stub_module('sonic_platform_base.sfp_base', SfpBase=_Stub)
+    _stub_module('sonic_platform_base.sonic_eeprom')
+    _stub_module('sonic_platform_base.sonic_eeprom.eeprom_dts')
+    _stub_module('sonic_platform_base.sonic_sfp')
+    _stub_module('sonic_platform_base.sonic_sfp.sff8472', sff8472InterfaceId=_Stub, sff8472Dom=_Stub)
+    _stub_module('sonic_platform_base.sonic_sfp.sff8436', sff8436InterfaceId=_Stub, sff8436Dom=_Stub)
+    _stub_module('sonic_platform_base.sonic_sfp.inf8628', inf8628InterfaceId=_Stub)
+    _stub_module('sonic_daemon_base')
+    _stub_module('sonic_daemon_base.daemon_base', Logger=_Logger)
+    _stub_module('sonic_daemon_base.module_eeprom',
+                 is_module_present=lambda ifname: False,
+                 read_module_eeprom_hex=lambda ifname, offset, num_bytes: None)
+
+    test_dir = os.path.dirname(os.path.realpath(__file__))
+    sys.path.insert(0, os.path.join(test_dir, '..'))
@@ -0,0 +1,146 @@
+from unittest import TestCase
+
+import stubs
+stubs.install()
+
+from sonic_platform import sdk_session
+from sonic_platform.sdk_session import SdkSession, RC_SESSION_FAILED, OPEN_RETRY_INTERVAL_SECS
+
+SXD_STATUS_SUCCESS = 0
+SXD_STATUS_ERROR = 1
+SXD_STATUS_HANDLE_ERROR = 7
+SXD_ACCESS_CMD_GET = 1
+SXD_ACCESS_CMD_SET = 2
+
+
+class FakeSdk(object):
+    """
+    Stands for the SDK functions used by the session, recording the
+    sessions opened and the register accesses
+    """
+    FUNCS = ['sx_api_open', 'sx_api_close', 'sxd_access_reg_init', 'sxd_access_reg_deinit']
+
+    def __init__(self):
+        self.opens = 0
+        self.closes = 0
+        self.open_ok = True
+        # Statuses returned by the next accesses, then success
+        self.statuses = []
+        self.accesses = []
+
+    def sx_api_open(self, log_cb):
+        if not self.open_ok:
+            return (SXD_STATUS_ERROR, None)
+        self.opens += 1
+        return (0, 'handle{}'.format(self.opens))
+
+    def sx_api_close(self, handle):
+        self.closes += 1
+        return 0
+
+    def sxd_access_reg_init(self, pid, log_cb, verbosity):
+        return 0
+
+    def sxd_access_reg_deinit(self):
+        return 0
+
+    def access(self, reg, meta, reg_num, handler, context):
+        self.accesses.append(meta.access_cmd)
+        return self.statuses.pop(0) if self.statuses else SXD_STATUS_SUCCESS
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class TestSdkSession(TestCase):
+
+    def setUp(self):
+        self.sdk = FakeSdk()
+        self.saved = dict((name, getattr(sdk_session, name, None)) for name in FakeSdk.FUNCS + ['time'])
+        for name in FakeSdk.FUNCS:
+            setattr(sdk_session, name, getattr(self.sdk, name))
+        self.clock = FakeClock()
+        sdk_session.time = self.clock
+        sdk_session.logger.messages = []
+        self.session = SdkSession()
+
+    def tearDown(self):
+        for (name, func) in self.saved.items():
+            setattr(sdk_session, name, func)
+
+    def access(self, access_cmd):
+        return self.session.access_reg(self.sdk.access, object(), access_cmd)
+
+    def test_session_kept_across_accesses(self):
+        for _ in range(3):
+            self.assertEqual(self.access(SXD_ACCESS_CMD_GET), SXD_STATUS_SUCCESS)
+        self.assertEqual(self.sdk.opens, 1)
+        self.assertEqual(self.sdk.closes, 0)
+
+    def test_access_error_keeps_session(self):
+        # e.g. reading the EEPROM of an absent module
+        self.sdk.statuses = [SXD_STATUS_ERROR]
+        self.assertEqual(self.access(SXD_ACCESS_CMD_GET), SXD_STATUS_ERROR)
+        self.assertEqual(self.sdk.accesses, [SXD_ACCESS_CMD_GET])
+        self.assertEqual((self.sdk.opens, self.sdk.closes), (1, 0))
+
+    def test_get_retried_on_session_failure(self):
+        self.sdk.statuses = [SXD_STATUS_HANDLE_ERROR]
+        self.assertEqual(self.access(SXD_ACCESS_CMD_GET), SXD_STATUS_SUCCESS)
+        self.assertEqual(self.sdk.accesses, [SXD_ACCESS_CMD_GET, SXD_ACCESS_CMD_GET])
+        self.assertEqual((self.sdk.opens, self.sdk.closes), (2, 1))
+
+    def test_set_not_retried(self):
+        self.sdk.statuses = [SXD_STATUS_HANDLE_ERROR]
+        self.assertEqual(self.access(SXD_ACCESS_CMD_SET), SXD_STATUS_HANDLE_ERROR)
+        self.assertEqual(self.sdk.accesses, [SXD_ACCESS_CMD_SET])
+
+        # The session is reopened for the next access
+        self.assertEqual(self.access(SXD_ACCESS_CMD_SET), SXD_STATUS_SUCCESS)
+        self.assertEqual((self.sdk.opens, self.sdk.closes), (2, 1))
+
+    def test_session_open_failure(self):
+        self.sdk.open_ok = False
+        self.assertEqual(self.access(SXD_ACCESS_CMD_GET), RC_SESSION_FAILED)
+        self.assertEqual(self.access(SXD_ACCESS_CMD_SET), RC_SESSION_FAILED)
+        self.assertEqual(self.sdk.accesses, [])
+
+        self.sdk.open_ok = True
+        self.clock.now += OPEN_RETRY_INTERVAL_SECS
+        self.assertEqual(self.access(SXD_ACCESS_CMD_GET), SXD_STATUS_SUCCESS)
+
+    def test_session_open_backoff(self):
+        self.sdk.open_ok = False
+        self.assertFalse(self.session.open())
+        self.sdk.open_ok = True
+
+        # Not tried again until the retry interval elapsed
+        self.clock.now += OPEN_RETRY_INTERVAL_SECS - 1
+        self.assertFalse(self.session.open())
+        self.assertEqual(self.sdk.opens, 0)
+
+        self.clock.now += 1
+        self.assertTrue(self.session.open())
+        self.assertEqual(self.sdk.opens, 1)
+
+    def test_session_open_failure_logged_once(self):
+        self.sdk.open_ok = False
+        for _ in range(3):
+            self.assertFalse(self.session.open())
+            self.clock.now += OPEN_RETRY_INTERVAL_SECS
+        self.assertEqual(len(sdk_session.logger.messages), 1)
+
+        self.sdk.open_ok = True
+        self.assertTrue(self.session.open())
+        self.assertEqual(sdk_session.logger.messages[1:], ['SDK session opened'])
+
+        # A new outage is logged again
+        self.session.close()
+        self.sdk.open_ok = False
+        self.assertFalse(self.session.open())
+        self.assertEqual(len(sdk_session.logger.messages), 3)
@@ -0,0 +1,144 @@
+import threading
+from unittest import TestCase
+
+import stubs
+stubs.install()
+
+from sonic_platform import sfp
+from sonic_platform.chassis import Chassis
+
+# Time after which a capability read is deemed to be stuck
+READ_TIMEOUT_SECS = 5
+
+# EEPROM contents by (offset, width): SFF-8472 and SFF-8436 modules with
+# full DOM support
+SFP_EEPROM = {
+    (92, 2): ['68', 'f0']
+}
+QSFP_EEPROM = {
+    (220, 2): ['0c', '00'],
+    (1, 1): ['08']
+}
+
+CAPABILITIES = sorted(sfp.DOM_CAPABILITY_DEFAULTS.keys())
+
+
+class TestSfpDomCapability(TestCase):
+
+    def setUp(self):
+        self.present = set()
+        self.eeprom_reads = []
+        self.snapshot = sfp.SfpStatusSnapshot()
+        self.snapshot._read = self.read_status
+        self.orig_snapshot = sfp.sfp_status_snapshot
+        sfp.sfp_status_snapshot = self.snapshot
+
+    def tearDown(self):
+        sfp.sfp_status_snapshot = self.orig_snapshot
+
+    def read_status(self, modules):
+        return dict((module, {'present': module in self.present, 'oper_status': None}) for module in modules)
+
+    def make_sfp(self, index, sfp_type, eeprom):
+        module = sfp.SFP(index, sfp_type)
+
+        def read_eeprom(offset, num_bytes):
+            self.eeprom_reads.append((index, offset))
+            return eeprom.get((offset, num_bytes))
+        module._read_eeprom_specific_bytes = read_eeprom
+        return module
+
+    def read_capabilities(self, module):
+        # Read from another thread, so that a deadlock fails the test
+        # rather than hanging it
+        values = {}
+
+        def read():
+            for name in CAPABILITIES:
+                values[name] = getattr(module, name)
+        thread = threading.Thread(target=read)
+        thread.daemon = True
+        thread.start()
+        thread.join(READ_TIMEOUT_SECS)
+        self.assertFalse(thread.is_alive(), "Reading the capabilities of sfp {} is stuck".format(module.index))
+        return values
+
+    def test_no_eeprom_read_on_creation(self):
+        self.present.update([0, 1])
+        self.make_sfp(0, 'SFP', SFP_EEPROM)
+        self.make_sfp(1, 'QSFP', QSFP_EEPROM)
+        self.assertEqual(self.eeprom_reads, [])
+
+    def test_present_sfp(self):
+        self.present.add(0)
+        values = self.read_capabilities(self.make_sfp(0, 'SFP', SFP_EEPROM))
+        self.assertEqual(values, {
+            'dom_supported': True,
+            'dom_temp_supported': True,
+            'dom_volt_supported': True,
+            'dom_rx_power_supported': True,
+            'dom_tx_power_supported': True,
+            'dom_tx_disable_supported': True,
+            'calibration': 1
+        })
+
+    def test_present_qsfp(self):
+        self.present.add(0)
+        values = self.read_capabilities(self.make_sfp(0, 'QSFP', QSFP_EEPROM))
+        self.assertEqual(values, {
+            'dom_supported': True,
+            'dom_temp_supported': False,
+            'dom_volt_supported': False,
+            'dom_rx_power_supported': True,
+            'dom_tx_power_supported': True,
+            'dom_tx_disable_supported': False,
+            'calibration': 1
+        })
+
+    def test_absent(self):
+        for (index, sfp_type, eeprom) in [(0, 'SFP', SFP_EEPROM), (1, 'QSFP', QSFP_EEPROM)]:
+            values = self.read_capabilities(self.make_sfp(index, sfp_type, eeprom))
+            self.assertEqual(values, sfp.DOM_CAPABILITY_DEFAULTS)
+        self.assertEqual(self.eeprom_reads, [])
+
+    def test_detected_once_per_insertion(self):
+        self.present.add(0)
+        module = self.make_sfp(0, 'SFP', SFP_EEPROM)
+        self.read_capabilities(module)
+        reads = len(self.eeprom_reads)
+        self.read_capabilities(module)
+        self.assertEqual(len(self.eeprom_reads), reads)
+
+        # Removed
+        self.present.remove(0)
+        self.snapshot.invalidate()
+        self.assertEqual(self.read_capabilities(module), sfp.DOM_CAPABILITY_DEFAULTS)
+
+        # Plugged back
+        self.present.add(0)
+        self.snapshot.invalidate()
+        self.assertTrue(self.read_capabilities(module)['dom_supported'])
+        self.assertEqual(len(self.eeprom_reads), 2 * reads)
+
+        # Swapped between two snapshots, as reported by a change event
+        self.snapshot.module_changed(0)
+        self.read_capabilities(module)
+        self.assertEqual(len(self.eeprom_reads), 3 * reads)
+
+    def test_warm_up(self):
+        self.present.update([0, 1, 3])
+        chassis = Chassis.__new__(Chassis)
+        chassis._sfp_list = [self.make_sfp(0, 'SFP', SFP_EEPROM),
+                             self.make_sfp(1, 'QSFP', QSFP_EEPROM),
+                             self.make_sfp(2, 'SFP', SFP_EEPROM),
+                             self.make_sfp(3, 'SFP', SFP_EEPROM)]
+        chassis.sfp_module_initialized = True
+        chassis.sfp_event_initialized = False
+
+        chassis.warm_up_sfps(max_workers=2)
+
+        self.assertEqual(sorted(set(index for (index, _) in self.eeprom_reads)), [0, 1, 3])
+        reads = len(self.eeprom_reads)
+        for module in chassis._sfp_list:
+            self.read_capabilities(module)
+        self.assertEqual(len(self.eeprom_reads), reads)
@@ -1,5 +1,8 @@
 #!/usr/bin/env bash
 
+. /usr/share/sonic/scripts/boot_trace.sh
+trace_script "start.sh"
+
 rm -f /var/run/rsyslogd.pid
 
 supervisorctl start rsyslogd
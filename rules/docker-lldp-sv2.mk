@@ -14,6 +14,7 @@ $(DOCKER_LLDP_SV2)_DBG_DEPENDS += $(LLDPD_DBG) $(LIBSWSSCOMMON_DBG)
 $(DOCKER_LLDP_SV2)_DBG_IMAGE_PACKAGES = $($(DOCKER_CONFIG_ENGINE_STRETCH)_DBG_IMAGE_PACKAGES)
 
 $(DOCKER_LLDP_SV2)_PYTHON_WHEELS += $(DBSYNCD_PY2)
+$(DOCKER_LLDP_SV2)_PYTHON_WHEELS += $(SONIC_DAEMON_BASE_PY2)
 $(DOCKER_LLDP_SV2)_LOAD_DOCKERS += $(DOCKER_CONFIG_ENGINE_STRETCH)
 
 SONIC_DOCKER_IMAGES += $(DOCKER_LLDP_SV2)
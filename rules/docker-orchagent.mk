@@ -5,6 +5,7 @@ DOCKER_ORCHAGENT = $(DOCKER_ORCHAGENT_STEM).gz
 DOCKER_ORCHAGENT_DBG = $(DOCKER_ORCHAGENT_STEM)-$(DBG_IMAGE_MARK).gz
 
 $(DOCKER_ORCHAGENT)_DEPENDS += $(SWSS) $(REDIS_TOOLS)
+$(DOCKER_ORCHAGENT)_PYTHON_WHEELS += $(SONIC_DAEMON_BASE_PY2)
 
 $(DOCKER_ORCHAGENT)_DBG_DEPENDS = $($(DOCKER_CONFIG_ENGINE_STRETCH)_DBG_DEPENDS)
 $(DOCKER_ORCHAGENT)_DBG_DEPENDS +=   $(SWSS_DBG) \
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""boot_trace
+
+Records begin/end spans of boot and container start steps, to find out
+where boot time goes. Each event is appended as a line to a log on tmpfs:
+
+    <uptime> <B|E> <container> <pid> <name>
+
+where uptime is the number of seconds since boot from /proc/uptime, a
+clock shared by the host and all containers. Events are only recorded if
+the log directory exists, i.e. on a running switch, where it is created at
+boot and mounted in every container.
+
+The same format is written by the shell helper boot_trace.sh, and read by
+boot-trace-report.
+"""
+
+import os
+from contextlib import contextmanager
+
+BOOT_TRACE_DIR = '/var/run/boot-trace'
+BOOT_TRACE_LOG = os.path.join(BOOT_TRACE_DIR, 'trace.log')
+
+EVENT_BEGIN = 'B'
+EVENT_END = 'E'
+
+# Lines are written with a single append, which is atomic up to PIPE_BUF
+MAX_NAME_LEN = 256
+
+
+def get_uptime():
+    with open('/proc/uptime') as f:
+        return float(f.read().split()[0])
+
+
+def get_process_start_uptime(pid='self'):
+    """
+    Returns the uptime at which a process started, from its start time in
+    clock ticks since boot
+    """
+    with open('/proc/{}/stat'.format(pid)) as f:
+        stat = f.read()
+    # The command name may contain spaces, fields are counted after it
+    fields = stat[stat.rindex(')') + 2:].split()
+    return float(fields[19]) / os.sysconf('SC_CLK_TCK')
+
+
+def get_container():
+    return os.environ.get('BOOT_TRACE_CONTAINER', 'host')
+
+
+def format_event(uptime, event, name, container=None, pid=None):
+    name = ' '.join(name.split())[:MAX_NAME_LEN]
+    return '{:.2f} {} {} {} {}\n'.format(uptime, event, container or get_container(), pid or os.getpid(), name)
+
+
+def record(event, name, uptime=None):
+    """
+    Appends an event to the log; errors are ignored, tracing must never
+    break the traced step
+    """
+    if not os.path.isdir(BOOT_TRACE_DIR):
+        return
+    try:
+        if uptime is None:
+            uptime = get_uptime()
+        line = format_event(uptime, event, name)
+        fd = os.open(BOOT_TRACE_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except (IOError, OSError, ValueError):
+        pass
+
+
+def trace_begin(name):
+    record(EVENT_BEGIN, name)
+
+
+def trace_end(name):
+    record(EVENT_END, name)
+
+
+@contextmanager
+def trace_span(name, from_process_start=False):
+    """
+    Records a span around a block. With from_process_start, the span
+    begins when the process started, so that it includes the interpreter
+    startup and imports.
+    """
+    uptime = None
+    if from_process_start:
+        try:
+            uptime = get_process_start_uptime()
+        except (IOError, OSError, ValueError, IndexError):
+            pass
+    record(EVENT_BEGIN, name, uptime)
+    try:
+        yield
+    finally:
+        record(EVENT_END, name)
+
+
+class Span(object):
+    """
+    A completed or still open span, read from the log
+    """
+    def __init__(self, name, container, pid, begin, end=None):
+        self.name = name
+        self.container = container
+        self.pid = pid
+        self.begin = begin
+        self.end = end
+
+    @property
+    def duration(self):
+        return self.end - self.begin
+
+    def contains(self, other):
+        # Spans of the same interval do not contain each other
+        return (self.begin <= other.begin and other.end <= self.end and
+                (self.begin, self.end) != (other.begin, other.end))
+
+
+def read_spans(path=BOOT_TRACE_LOG):
+    """
+    Pairs the begin and end events of the log by container, pid and name
+
+    Returns:
+        (spans, open_spans): the completed spans, and those which have no
+        end event, e.g. because the step is still running or was killed
+    """
+    spans = []
+    open_spans = {}
+
+    with open(path) as f:
+        for line in f:
+            try:
+                (uptime, event, container, pid, name) = line.rstrip('\n').split(' ', 4)
+                uptime = float(uptime)
+            except ValueError:
+                continue
+
+            key = (container, pid, name)
+            if event == EVENT_BEGIN:
+                open_spans.setdefault(key, []).append(Span(name, container, pid, uptime))
+            elif event == EVENT_END and open_spans.get(key):
+                span = open_spans[key].pop()
+                span.end = uptime
+                spans.append(span)
+
+    return (spans, [open_span for stack in open_spans.values() for open_span in stack])
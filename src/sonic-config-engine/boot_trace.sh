@@ -0,0 +1,45 @@
+# Shell helper of boot_trace.py, to be sourced:
+#
+#     . /usr/share/sonic/scripts/boot_trace.sh
+#
+#     trace_script "start.sh"           # span until the script exits
+#     trace_begin "flush databases"     # explicit span
+#     ...
+#     trace_end "flush databases"
+#
+# Events are appended in the same format as boot_trace.py, only if the
+# log directory exists. Reading /proc/uptime with the read builtin does
+# not fork, so tracing costs no more than an echo per event.
+
+BOOT_TRACE_DIR=/var/run/boot-trace
+BOOT_TRACE_LOG=${BOOT_TRACE_DIR}/trace.log
+BOOT_TRACE_CONTAINER=${BOOT_TRACE_CONTAINER:-host}
+
+function trace_event()
+{
+    local uptime idle
+
+    [[ -d ${BOOT_TRACE_DIR} ]] || return 0
+    read uptime idle < /proc/uptime
+    echo "${uptime} $1 ${BOOT_TRACE_CONTAINER} $$ $2" >> ${BOOT_TRACE_LOG} 2> /dev/null
+    return 0
+}
+
+function trace_begin()
+{
+    trace_event B "$1"
+}
+
+function trace_end()
+{
+    trace_event E "$1"
+}
+
+# Records a span from now until the script exits. Sets the EXIT trap, so
+# it must not be used by scripts which set their own.
+function trace_script()
+{
+    BOOT_TRACE_SCRIPT="$1"
+    trace_begin "${BOOT_TRACE_SCRIPT}"
+    trap 'trace_end "${BOOT_TRACE_SCRIPT}"' EXIT
+}
@@ -16,11 +16,12 @@ setup(name='sonic-config-engine',
       author='Taoyu Li',
       author_email='taoyl@microsoft.com',
       url='https://github.com/Azure/sonic-buildimage',
-      py_modules=['portconfig', 'minigraph', 'openconfig_acl', 'sonic_device_util', 'config_samples'],
-      scripts=['sonic-cfggen'],
+      py_modules=['portconfig', 'minigraph', 'openconfig_acl', 'sonic_device_util', 'config_samples', 'boot_trace'],
+      scripts=['sonic-cfggen', 'boot-trace-report'],
       install_requires=['lxml', 'jinja2>=2.10', 'netaddr', 'ipaddr', 'pyyaml', 'pyangbind==0.6.0'],
       test_suite='setup.get_test_suite',
       data_files=[
         ('/usr/share/sonic/templates', glob.glob('data/*')),
+        ('/usr/share/sonic/scripts', ['boot_trace.sh']),
       ],
      )
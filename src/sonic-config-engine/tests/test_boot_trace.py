@@ -0,0 +1,61 @@
+from unittest import TestCase
+import imp
+import os
+import sys
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(test_dir, '..'))
+
+from boot_trace import read_spans
+
+boot_trace_report = imp.load_source('boot_trace_report', os.path.join(test_dir, '..', 'boot-trace-report'))
+
+
+def names(spans):
+    return [(span.name, span.begin, span.end) for span in spans]
+
+
+class TestBootTrace(TestCase):
+
+    def setUp(self):
+        self.trace_file = os.path.join(test_dir, 'sample-boot-trace.log')
+        (self.spans, self.open_spans) = read_spans(self.trace_file)
+
+    def get_span(self, name, begin):
+        return [span for span in self.spans if (span.name, span.begin) == (name, begin)][0]
+
+    def test_read_spans(self):
+        # Begin and end events are paired by container, pid and name; spans
+        # of the same step nest
+        self.assertEqual(sorted(names(self.spans)), [
+            ('database start', 8.5, 12.0),
+            ('early', 1.0, 2.5),
+            ('orchagent', 10.0, 14.0),
+            ('orchagent', 11.0, 11.5),
+            ('rc.local', 3.0, 8.0),
+            ('sonic-cfggen', 5.0, 6.5),
+            ('swss start', 9.0, 20.0),
+            ('syncd start', 12.5, 13.0)])
+        self.assertEqual(self.get_span('database start', 8.5).container, 'database')
+        self.assertEqual(self.get_span('database start', 8.5).pid, '40')
+
+        self.assertEqual(sorted(names(self.open_spans)), [('bgpd', 15.0, None), ('hostcfgd', 21.0, None)])
+
+    def test_get_critical_path(self):
+        # swss start ends last, and began after rc.local ended but before
+        # database start ended
+        self.assertEqual(names(boot_trace_report.get_critical_path(self.spans)), [
+            ('early', 1.0, 2.5),
+            ('rc.local', 3.0, 8.0),
+            ('swss start', 9.0, 20.0)])
+        self.assertEqual(boot_trace_report.get_critical_path([]), [])
+
+    def test_get_children(self):
+        swss_start = self.get_span('swss start', 9.0)
+        self.assertEqual(names(boot_trace_report.get_children(swss_start, self.spans)), [('orchagent', 10.0, 14.0)])
+        # Spans nest by time, whatever their container
+        orchagent = self.get_span('orchagent', 10.0)
+        self.assertEqual(names(boot_trace_report.get_children(orchagent, self.spans)), [
+            ('orchagent', 11.0, 11.5),
+            ('syncd start', 12.5, 13.0)])
+        self.assertEqual(boot_trace_report.get_children(self.get_span('early', 1.0), self.spans), [])
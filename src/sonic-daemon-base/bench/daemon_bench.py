@@ -0,0 +1,388 @@
+#!/usr/bin/env python2
+
+"""
+    Throughput benchmark of the config daemons
+
+    Runs a daemon of this tree (bgpcfgd, caclmgrd, hostcfgd or lldpmgrd)
+    against a scratch redis-server, replays an event log recorded on a
+    switch with sonic_daemon_base.db_events into it, and reports how fast
+    the daemon kept up:
+
+      - the events per second replayed, and processed, i.e. until the
+        daemon ran its last command
+      - the end-to-end lag of each event: the time from its write to the
+        first command run by the daemon afterwards
+      - the number of commands run per tool
+
+    The external tools of the daemon (vtysh, lldpcli, iptables, ipset,
+    docker, ...) are replaced by stubs found first in PATH, which only log
+    their invocation and the size of their input.
+
+    The daemons connect to the default redis instance, i.e. 127.0.0.1:6379
+    and /var/run/redis/redis.sock, and some of them must run as root, so
+    the benchmark is meant to run in a disposable container with
+    swsscommon, swsssdk and redis-server installed, e.g. the build
+    container. It refuses to run if a redis is already listening.
+
+    Usage:
+        daemon_bench.py caclmgrd reload.events
+        daemon_bench.py lldpmgrd reload.events --speed 0 --json result.json
+"""
+
+try:
+    import argparse
+    import json
+    import os
+    import shutil
+    import socket
+    import subprocess
+    import sys
+    import tempfile
+    import time
+    import redis
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    from sonic_daemon_base.db_events import EventLog, Replayer, get_db_id
+except ImportError, e:
+    raise ImportError (str(e) + " - required module not found")
+
+#
+# Constants ====================================================================
+#
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')
+
+REDIS_HOST = '127.0.0.1'
+REDIS_PORT = 6379
+REDIS_UNIX_SOCKET = '/var/run/redis/redis.sock'
+REDIS_START_TIMEOUT_SECS = 10
+
+# Time given to the daemon to start and complete its initial work
+DEFAULT_WARMUP_SECS = 5
+
+# The daemon is done with the events once it ran no command for this time
+DEFAULT_SETTLE_SECS = 3
+
+# Maximum time waited for the daemon to settle after the replay
+DEFAULT_SETTLE_TIMEOUT_SECS = 600
+
+# Output of the stubs of the tools whose output the daemons parse
+STUB_OUTPUTS = {
+    'iptables-save': '*mangle\nCOMMIT\n',
+    'ip6tables-save': '*mangle\nCOMMIT\n',
+}
+
+STUB_TEMPLATE = """#!/bin/sh
+# Stub of {tool} generated by daemon_bench.py: logs the invocation time,
+# the tool and the size of its input
+ts=$(date +%s.%N)
+bytes=$(wc -c)
+printf '{output}'
+echo "$ts {tool} $bytes" >> {log}
+"""
+
+STATS_KEY_TEMPLATE = 'PROCESS_STATS|{}'
+
+#
+# Daemon adapters ==============================================================
+#
+
+class DaemonAdapter(object):
+    def __init__(self, path, tools):
+        """
+        Args:
+            path: Path of the daemon in the tree
+            tools: External tools the daemon runs, replaced by stubs
+        """
+        self.path = path
+        self.tools = tools
+
+
+DAEMONS = {
+    'bgpcfgd': DaemonAdapter('dockers/docker-fpm-frr/bgpcfgd', ['vtysh']),
+    'caclmgrd': DaemonAdapter('files/image_config/caclmgrd/caclmgrd',
+                              ['iptables-restore', 'ip6tables-restore', 'ipset']),
+    'hostcfgd': DaemonAdapter('files/image_config/hostcfgd/hostcfgd',
+                              ['iptables-save', 'ip6tables-save', 'iptables-restore', 'ip6tables-restore', 'docker']),
+    'lldpmgrd': DaemonAdapter('dockers/docker-lldp-sv2/lldpmgrd', ['lldpcli']),
+}
+
+#
+# Helper functions =============================================================
+#
+
+def write_stubs(stub_dir, tools, log):
+    for tool in tools:
+        path = os.path.join(stub_dir, tool)
+        output = STUB_OUTPUTS.get(tool, '').replace('\n', '\\n')
+        with open(path, 'w') as f:
+            f.write(STUB_TEMPLATE.format(tool=tool, output=output, log=log))
+        os.chmod(path, 0755)
+
+
+def read_execs(log):
+    """
+    Returns:
+        The list of (time, tool, input bytes) of the stub invocations, by time
+    """
+    execs = []
+    if not os.path.exists(log):
+        return execs
+    with open(log) as f:
+        for line in f:
+            try:
+                (t, tool, size) = line.split()
+                execs.append((float(t), tool, int(size)))
+            except ValueError:
+                continue
+    return sorted(execs)
+
+
+def wait_for_settle(log, settle, timeout, since=0):
+    """
+    Waits until no stub ran for settle seconds, counted from since at the
+    earliest
+
+    Returns:
+        True if the daemon settled before the timeout
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        execs = read_execs(log)
+        last = max(since, execs[-1][0] if execs else 0)
+        if time.time() - last >= settle:
+            return True
+        time.sleep(min(settle, 0.5))
+    return False
+
+
+def is_listening(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        return sock.connect_ex((host, port)) == 0
+    finally:
+        sock.close()
+
+
+def start_redis(work_dir):
+    if is_listening(REDIS_HOST, REDIS_PORT) or os.path.exists(REDIS_UNIX_SOCKET):
+        raise RuntimeError("A redis is already running on {}:{} or {}, the benchmark must run in a scratch environment"
+                           .format(REDIS_HOST, REDIS_PORT, REDIS_UNIX_SOCKET))
+
+    if not os.path.isdir(os.path.dirname(REDIS_UNIX_SOCKET)):
+        os.makedirs(os.path.dirname(REDIS_UNIX_SOCKET))
+
+    log = open(os.path.join(work_dir, 'redis.log'), 'w')
+    proc = subprocess.Popen(['redis-server',
+                             '--bind', REDIS_HOST,
+                             '--port', str(REDIS_PORT),
+                             '--unixsocket', REDIS_UNIX_SOCKET,
+                             '--unixsocketperm', '777',
+                             '--dir', work_dir,
+                             '--save', '',
+                             '--appendonly', 'no',
+                             '--notify-keyspace-events', 'AKE'],
+                            stdout=log, stderr=subprocess.STDOUT)
+
+    client = redis.StrictRedis(unix_socket_path=REDIS_UNIX_SOCKET)
+    deadline = time.time() + REDIS_START_TIMEOUT_SECS
+    while True:
+        try:
+            client.ping()
+            return proc
+        except redis.ConnectionError:
+            if proc.poll() is not None or time.time() > deadline:
+                raise RuntimeError("redis-server failed to start, see {}".format(log.name))
+            time.sleep(0.1)
+
+
+def stop_process(proc):
+    if proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait()
+        except OSError:
+            pass
+
+
+def percentile(values, p):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100.0))]
+
+
+def get_lags(write_times, execs):
+    """
+    Matches each event to the first command run after it was written
+
+    Returns:
+        (lags, unanswered): the lag of each event followed by a command, in
+        seconds, and the number of events followed by none
+    """
+    exec_times = [t for (t, _, _) in execs]
+    lags = []
+    i = 0
+    for t in write_times:
+        while i < len(exec_times) and exec_times[i] < t:
+            i += 1
+        if i == len(exec_times):
+            break
+        lags.append(exec_times[i] - t)
+    return (lags, len(write_times) - len(lags))
+
+
+def summarize_execs(execs):
+    tools = {}
+    for (_, tool, size) in execs:
+        (count, total) = tools.get(tool, (0, 0))
+        tools[tool] = (count + 1, total + size)
+    return dict((tool, {'count': count, 'input_bytes': total}) for (tool, (count, total)) in tools.items())
+
+#
+# Benchmark ====================================================================
+#
+
+def run_benchmark(args):
+    adapter = DAEMONS[args.daemon]
+    log = EventLog.load(args.events)
+
+    work_dir = tempfile.mkdtemp(prefix='daemon_bench.')
+    stub_dir = os.path.join(work_dir, 'bin')
+    os.mkdir(stub_dir)
+    exec_log = os.path.join(work_dir, 'exec.log')
+    write_stubs(stub_dir, adapter.tools, exec_log)
+
+    redis_proc = start_redis(work_dir)
+    daemon = None
+    try:
+        clients = {}
+        for db in log.databases:
+            clients[db] = redis.StrictRedis(unix_socket_path=REDIS_UNIX_SOCKET, db=log.databases[db])
+        replayer = Replayer(clients)
+        replayer.load_init(log.init)
+
+        env = dict(os.environ)
+        env['PATH'] = stub_dir + os.pathsep + env.get('PATH', '')
+        env['PYTHONPATH'] = os.pathsep.join([os.path.join(REPO_ROOT, 'src', 'sonic-daemon-base'),
+                                             env.get('PYTHONPATH', '')])
+        with open(os.devnull) as devnull:
+            daemon = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, adapter.path)],
+                                      stdin=devnull,
+                                      stdout=open(os.path.join(work_dir, 'daemon.log'), 'w'),
+                                      stderr=subprocess.STDOUT,
+                                      env=env)
+
+        print "Started {}, warming up for {}s...".format(args.daemon, args.warmup)
+        time.sleep(args.warmup)
+        wait_for_settle(exec_log, args.settle, args.settle_timeout)
+        if daemon.poll() is not None:
+            raise RuntimeError("{} exited with {}, see {}".format(args.daemon, daemon.returncode,
+                                                                  os.path.join(work_dir, 'daemon.log')))
+
+        print "Replaying {} event(s) at speed {}...".format(len(log.events), args.speed or 'max')
+        write_times = replayer.replay(log.events, args.speed)
+        settled = wait_for_settle(exec_log, args.settle, args.settle_timeout, since=write_times[-1] if write_times else 0)
+
+        stats = redis.StrictRedis(unix_socket_path=REDIS_UNIX_SOCKET, db=get_db_id('STATE_DB')).hgetall(
+            STATS_KEY_TEMPLATE.format(args.daemon))
+    finally:
+        if daemon is not None:
+            stop_process(daemon)
+        stop_process(redis_proc)
+
+    if not write_times:
+        return {'daemon': args.daemon, 'events': 0}
+
+    execs = [entry for entry in read_execs(exec_log) if entry[0] >= write_times[0]]
+    (lags, unanswered) = get_lags(write_times, execs)
+    replay_secs = write_times[-1] - write_times[0]
+    end = max(write_times[-1], execs[-1][0] if execs else 0)
+    processing_secs = end - write_times[0]
+
+    result = {
+        'daemon': args.daemon,
+        'events': len(write_times),
+        'replay_secs': replay_secs,
+        'replay_events_per_sec': len(write_times) / replay_secs if replay_secs else None,
+        'processing_secs': processing_secs,
+        'processing_events_per_sec': len(write_times) / processing_secs if processing_secs else None,
+        'settled': settled,
+        'lag_ms': dict(('p{}'.format(p), percentile(lags, p) * 1000) for p in (50, 90, 99, 100)),
+        'unanswered_events': unanswered,
+        'execs': summarize_execs(execs),
+        'process_stats': stats,
+        'work_dir': work_dir,
+    }
+    if not args.keep:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        del result['work_dir']
+    return result
+
+
+def format_rate(rate):
+    return '{:.1f}/s'.format(rate) if rate is not None else '-'
+
+
+def print_report(result):
+    print
+    print "Daemon:      {}".format(result['daemon'])
+    print "Events:      {}".format(result['events'])
+    if not result['events']:
+        return
+    print "Replay:      {:.2f}s, {} events".format(result['replay_secs'], format_rate(result['replay_events_per_sec']))
+    print "Processing:  {:.2f}s, {} events{}".format(result['processing_secs'],
+                                                     format_rate(result['processing_events_per_sec']),
+                                                     '' if result['settled'] else ' (did not settle)')
+    lag = result['lag_ms']
+    print "Lag (ms):    p50 {:.1f}  p90 {:.1f}  p99 {:.1f}  max {:.1f}".format(lag['p50'], lag['p90'], lag['p99'], lag['p100'])
+    if result['unanswered_events']:
+        print "             {} event(s) followed by no command".format(result['unanswered_events'])
+
+    print
+    print "{:<24} {:>8} {:>12}".format('COMMAND', 'EXECS', 'INPUT BYTES')
+    for (tool, execs) in sorted(result['execs'].items()):
+        print "{:<24} {:>8} {:>12}".format(tool, execs['count'], execs['input_bytes'])
+
+    exec_stats = sorted((name, value) for (name, value) in result['process_stats'].items() if name.startswith('exec_'))
+    if exec_stats:
+        print
+        print "Process statistics, as last flushed by the daemon:"
+        for (name, value) in exec_stats:
+            print "  {} = {}".format(name, value)
+
+    if 'work_dir' in result:
+        print
+        print "Logs kept in {}".format(result['work_dir'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark a config daemon against a replayed event log')
+    parser.add_argument('daemon', choices=sorted(DAEMONS), help='daemon to benchmark')
+    parser.add_argument('events', help='event log recorded with sonic_daemon_base.db_events')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='speed up factor of the replay, 0 to replay as fast as possible (default: %(default)s)')
+    parser.add_argument('--warmup', type=float, default=DEFAULT_WARMUP_SECS,
+                        help='seconds given to the daemon to start (default: %(default)s)')
+    parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE_SECS,
+                        help='seconds without command after which the daemon is done (default: %(default)s)')
+    parser.add_argument('--settle-timeout', type=float, default=DEFAULT_SETTLE_TIMEOUT_SECS,
+                        help='seconds waited at most for the daemon to be done (default: %(default)s)')
+    parser.add_argument('--json', help='also write the result to this file')
+    parser.add_argument('--keep', action='store_true', help='keep the logs of redis, the daemon and the stubs')
+    args = parser.parse_args()
+
+    try:
+        result = run_benchmark(args)
+    except (RuntimeError, ValueError, IOError), e:
+        print >> sys.stderr, str(e)
+        sys.exit(1)
+
+    print_report(result)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=4, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
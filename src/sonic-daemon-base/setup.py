@@ -1,4 +1,10 @@
 from setuptools import setup
+import unittest
+
+def get_test_suite():
+    test_loader = unittest.TestLoader()
+    test_suite = test_loader.discover('tests', pattern='test_*.py')
+    return test_suite
 
 setup(
     name='sonic-daemon-base',
@@ -13,6 +19,7 @@ setup(
     packages=[
         'sonic_daemon_base',
     ],
+    test_suite='setup.get_test_suite',
     classifiers=[
         'Development Status :: 4 - Beta',
         'Environment :: No Input/Output (Daemon)',
@@ -1,12 +1,22 @@
 #!/usr/bin/env python2
 
 try:
+    import errno
+    import hashlib
     import imp
+    import json
+    import marshal
+    import select
     import signal
+    import socket
+    import struct
     import subprocess
     import os
     import sys
     import syslog
+    import tempfile
+    import time
+    from sonic_daemon_base.logger import SyslogLogger
 except ImportError, e:
     raise ImportError (str(e) + " - required module not found")
 
@@ -19,6 +29,10 @@ REDIS_HOSTNAME = 'localhost'
 REDIS_PORT = 6379
 REDIS_TIMEOUT_MSECS = 0
 
+# Redis instances and placement of the databases on them, written by the
+# database docker
+DATABASE_CONFIG_FILE = '/var/run/redis/sonic-db/database_config.json'
+
 # Platform root directory inside docker
 PLATFORM_ROOT_DOCKER = '/usr/share/sonic/platform'
 SONIC_CFGGEN_PATH = '/usr/local/bin/sonic-cfggen'
@@ -32,17 +46,166 @@ PORTMAP = 'portmap.ini'
 EEPROM_MODULE_NAME = 'eeprom'
 EEPROM_CLASS_NAME = 'board'
 
+# Writable directory where compiled platform plugins are cached
+PLUGIN_CACHE_DIR = '/var/cache/sonic/plugins'
+
+# Machine configuration, used to look up the platform
+MACHINE_CONF = '/host/machine.conf'
+
+#
+# Per-process caches ===========================================================
+#
+
+# Redis instances and database placement, once loaded
+_database_config = None
+
+# Platform and hwsku, once resolved
+_platform_and_hwsku = None
+
+# Loaded platform plugin modules, keyed by module file
+_plugin_modules = {}
+
 #
 # Helper functions =============================================================
 #
 
+def get_database_config():
+    global _database_config
+
+    if _database_config is None:
+        try:
+            with open(DATABASE_CONFIG_FILE, 'r') as f:
+                _database_config = json.load(f)
+        except (IOError, ValueError), e:
+            syslog.syslog(syslog.LOG_WARNING,
+                          "Failed to load {}, using the default redis instance: {}".format(DATABASE_CONFIG_FILE, str(e)))
+            _database_config = {}
+
+    return _database_config
+
+# Returns the (hostname, port) of the redis instance holding a database,
+# given by id or by name (e.g. 'CONFIG_DB')
+def get_db_instance(db):
+    config = get_database_config()
+    instances = config.get('INSTANCES', {})
+
+    for (name, database) in config.get('DATABASES', {}).items():
+        if db != name and db != database.get('id'):
+            continue
+        inst = instances.get(database.get('instance'))
+        if inst is not None:
+            return (str(inst.get('hostname', REDIS_HOSTNAME)), int(inst.get('port', REDIS_PORT)))
+
+    return (REDIS_HOSTNAME, REDIS_PORT)
+
 def db_connect(db):
     from swsscommon import swsscommon
+    (hostname, port) = get_db_instance(db)
     return swsscommon.DBConnector(db,
-                                  REDIS_HOSTNAME,
-                                  REDIS_PORT,
+                                  hostname,
+                                  port,
                                   REDIS_TIMEOUT_MSECS)
 
+# Returns the next message of a redis pubsub, or None if none arrived within
+# timeout seconds. A wait interrupted by a signal, e.g. the profiling signal,
+# is resumed: Python 2 raises EINTR from select() as select.error, which
+# redis-py does not retry.
+def get_pubsub_message(pubsub, timeout):
+    deadline = time.time() + timeout
+    while True:
+        try:
+            return pubsub.get_message(timeout=timeout)
+        except (select.error, socket.error), e:
+            if not e.args or e.args[0] != errno.EINTR:
+                raise
+        timeout = max(0, deadline - time.time())
+
+# Returns platform from the machine configuration, or None if not found
+def get_platform_from_machine_conf():
+    if not os.path.isfile(MACHINE_CONF):
+        return None
+
+    machine_vars = {}
+    with open(MACHINE_CONF) as machine_file:
+        for line in machine_file:
+            tokens = line.split('=')
+            if len(tokens) < 2:
+                continue
+            machine_vars[tokens[0]] = tokens[1].strip()
+
+    return machine_vars.get('onie_platform', machine_vars.get('aboot_platform'))
+
+# Returns hwsku from DEVICE_METADATA in Config DB
+def get_hwsku_from_config_db():
+    from swsscommon import swsscommon
+    config_db = db_connect(swsscommon.CONFIG_DB)
+    (status, fvp) = swsscommon.Table(config_db, 'DEVICE_METADATA').get('localhost')
+    if not status:
+        return None
+
+    return dict(fvp).get('hwsku')
+
+# Returns value of key by running sonic-cfggen with the given source option
+def get_value_from_sonic_cfggen(source_opt, key):
+    try:
+        proc = subprocess.Popen([SONIC_CFGGEN_PATH, source_opt, '-v', key],
+                                stdout=subprocess.PIPE,
+                                shell=False,
+                                stderr=subprocess.STDOUT)
+        stdout = proc.communicate()[0]
+        proc.wait()
+    except OSError, e:
+        raise OSError("Failed to detect platform: %s" % (str(e)))
+
+    return stdout.rstrip('\n')
+
+# Loads a module from its compiled code if possible. The code is cached in
+# PLUGIN_CACHE_DIR, keyed on the module file path and modification time,
+# so that it is only compiled by the first process loading the module.
+def load_module_from_cache(module_name, module_file):
+    st = os.stat(module_file)
+    header = imp.get_magic() + struct.pack('<I', int(st.st_mtime) & 0xFFFFFFFF)
+    cache_file = os.path.join(PLUGIN_CACHE_DIR, "%s-%s.pyc" % (module_name, hashlib.sha1(module_file).hexdigest()[:16]))
+
+    code = None
+    try:
+        with open(cache_file, 'rb') as f:
+            data = f.read()
+        if data[:len(header)] == header:
+            code = marshal.loads(data[len(header):])
+    except (IOError, EOFError, ValueError, TypeError):
+        pass
+
+    if code is None:
+        with open(module_file, 'rU') as f:
+            source = f.read()
+        code = compile(source, module_file, 'exec')
+
+        # Write the cache file atomically, as other daemons may be loading
+        # the same module concurrently. Failing to cache is not fatal.
+        try:
+            if not os.path.isdir(PLUGIN_CACHE_DIR):
+                os.makedirs(PLUGIN_CACHE_DIR)
+            (fd, tmp_file) = tempfile.mkstemp(dir=PLUGIN_CACHE_DIR)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(header + marshal.dumps(code))
+            os.rename(tmp_file, cache_file)
+        except (IOError, OSError):
+            pass
+
+    # Same module setup as imp.load_source(), so that plugins relying on
+    # __file__ being the path of their source keep working
+    module = imp.new_module(module_name)
+    module.__file__ = module_file
+    sys.modules[module_name] = module
+    try:
+        exec code in module.__dict__
+    except:
+        del sys.modules[module_name]
+        raise
+
+    return module
+
 #
 # Helper classes ===============================================================
 #
@@ -50,40 +213,25 @@ def db_connect(db):
 class Logger(object):
     def __init__(self, syslog_identifier):
         self.syslog = syslog
-        self.syslog.openlog(ident=syslog_identifier, logoption=self.syslog.LOG_NDELAY, facility=self.syslog.LOG_DAEMON)
+        self.logger = SyslogLogger(syslog_identifier, facility=self.syslog.LOG_DAEMON)
 
     def __del__(self):
         self.syslog.closelog()
 
     def log_error(self, msg, also_print_to_console=False):
-        self.syslog.syslog(self.syslog.LOG_ERR, msg)
-
-        if also_print_to_console:
-            print msg
+        self.logger.log_error(msg, also_print_to_console=also_print_to_console)
 
     def log_warning(self, msg, also_print_to_console=False):
-        self.syslog.syslog(self.syslog.LOG_WARNING, msg)
-
-        if also_print_to_console:
-            print msg
+        self.logger.log_warning(msg, also_print_to_console=also_print_to_console)
 
     def log_notice(self, msg, also_print_to_console=False):
-        self.syslog.syslog(self.syslog.LOG_NOTICE, msg)
-
-        if also_print_to_console:
-            print msg
+        self.logger.log_notice(msg, also_print_to_console=also_print_to_console)
 
     def log_info(self, msg, also_print_to_console=False):
-        self.syslog.syslog(self.syslog.LOG_INFO, msg)
-
-        if also_print_to_console:
-            print msg
+        self.logger.log_info(msg, also_print_to_console=also_print_to_console)
 
     def log_debug(self, msg, also_print_to_console=False):
-        self.syslog.syslog(self.syslog.LOG_DEBUG, msg)
-
-        if also_print_to_console:
-            print msg
+        self.logger.log_debug(msg, also_print_to_console=also_print_to_console)
 
 #
 # Daemon =======================================================================
@@ -109,28 +257,31 @@ class DaemonBase(object):
         else:
             self.syslog.syslog(self.syslog.LOG_WARNING, "Caught unhandled signal '" + sig + "'")
 
+    # Opt-in: toggle profiling of the daemon on SIGUSR2, see profiler.py
+    def enable_profiling(self, daemon_name):
+        from sonic_daemon_base.profiler import enable_signal_profiling
+        return enable_signal_profiling(daemon_name)
+
     # Returns platform and hwsku
     def get_platform_and_hwsku(self):
-        try:
-            proc = subprocess.Popen([SONIC_CFGGEN_PATH, '-H', '-v', PLATFORM_KEY],
-                                    stdout=subprocess.PIPE,
-                                    shell=False,
-                                    stderr=subprocess.STDOUT)
-            stdout = proc.communicate()[0]
-            proc.wait()
-            platform = stdout.rstrip('\n')
-
-            proc = subprocess.Popen([SONIC_CFGGEN_PATH, '-d', '-v', HWSKU_KEY],
-                                    stdout=subprocess.PIPE,
-                                    shell=False,
-                                    stderr=subprocess.STDOUT)
-            stdout = proc.communicate()[0]
-            proc.wait()
-            hwsku = stdout.rstrip('\n')
-        except OSError, e:
-            raise OSError("Failed to detect platform: %s" % (str(e)))
-
-        return (platform, hwsku)
+        global _platform_and_hwsku
+
+        if _platform_and_hwsku is None:
+            # Same lookups as 'sonic-cfggen -H' and 'sonic-cfggen -d' do,
+            # without forking sonic-cfggen unless they can't be done here
+            try:
+                platform = get_platform_from_machine_conf() or ''
+            except IOError:
+                platform = get_value_from_sonic_cfggen('-H', PLATFORM_KEY)
+
+            try:
+                hwsku = get_hwsku_from_config_db() or ''
+            except (ImportError, RuntimeError):
+                hwsku = get_value_from_sonic_cfggen('-d', HWSKU_KEY)
+
+            _platform_and_hwsku = (platform, hwsku)
+
+        return _platform_and_hwsku
 
     # Returns path to platform and hwsku
     def get_path_to_platform_and_hwsku(self):
@@ -165,11 +316,14 @@ class DaemonBase(object):
         # Get path to platform and hwsku
         (platform_path, hwsku_path) = self.get_path_to_platform_and_hwsku()
 
-        try:
-            module_file = "/".join([platform_path, "plugins", module_name + ".py"])
-            module = imp.load_source(module_name, module_file)
-        except IOError, e:
-            raise IOError("Failed to load platform module '%s': %s" % (module_name, str(e)))
+        module_file = "/".join([platform_path, "plugins", module_name + ".py"])
+        module = _plugin_modules.get(module_file)
+        if module is None:
+            try:
+                module = load_module_from_cache(module_name, module_file)
+            except (IOError, OSError), e:
+                raise IOError("Failed to load platform module '%s': %s" % (module_name, str(e)))
+            _plugin_modules[module_file] = module
 
         try:
             platform_util_class = getattr(module, class_name)
@@ -0,0 +1,480 @@
+#!/usr/bin/env python2
+
+"""
+    Record and replay of Redis database events
+
+    The recorder subscribes to the keyspace notifications of the Config DB
+    and App DB (or other databases) of a running switch and writes every
+    change of a hash, with its new value, to an event log. The replayer
+    writes the changes of an event log into another Redis, e.g. a scratch
+    redis-server on a development machine, at the original pace or faster,
+    so that daemons subscribed to it see the same sequence of events.
+
+    The event log is a text file of JSON objects, one per line. The first
+    line is a header giving the databases and their ids:
+
+        {"format": "sonic-db-events", "version": 1, "start": <epoch>,
+         "databases": {"CONFIG_DB": 4, "APPL_DB": 0}}
+
+    followed by the initial content of the databases, if recorded, and by
+    the events, in order:
+
+        {"t": 0, "op": "init", "db": "CONFIG_DB", "key": "PORT|Ethernet0", "fields": {...}}
+        {"t": 1.25, "op": "set", "db": "CONFIG_DB", "key": "PORT|Ethernet0", "fields": {...}}
+        {"t": 1.31, "op": "del", "db": "CONFIG_DB", "key": "PORT|Ethernet0"}
+
+    where t is the number of seconds since the recording started. Only
+    hashes are recorded; keys of other types and the internal keys of
+    producer/consumer tables (starting with '_') are ignored. The value of
+    a key is read when its notification is received, so a burst of changes
+    of a key may be recorded as fewer events.
+
+    Usage:
+        python -m sonic_daemon_base.db_events record -o reload.events --init -t 120
+        python -m sonic_daemon_base.db_events replay reload.events --speed 10
+"""
+
+try:
+    import argparse
+    import json
+    import Queue
+    import threading
+    import time
+    import redis
+    from sonic_daemon_base.daemon_base import get_database_config, get_db_instance
+except ImportError, e:
+    raise ImportError (str(e) + " - required module not found")
+
+#
+# Constants ====================================================================
+#
+
+EVENT_LOG_FORMAT = 'sonic-db-events'
+EVENT_LOG_VERSION = 1
+
+OP_INIT = 'init'
+OP_SET = 'set'
+OP_DEL = 'del'
+
+# Databases recorded by default, and their ids if the database
+# configuration is not available
+DEFAULT_DATABASES = ['CONFIG_DB', 'APPL_DB']
+DEFAULT_DB_IDS = {
+    'APPL_DB': 0,
+    'CONFIG_DB': 4,
+    'STATE_DB': 6,
+}
+
+# Key which the config DB clients wait for before reading the Config DB
+CONFIG_DB_INITIALIZED_KEY = 'CONFIG_DB_INITIALIZED'
+
+# Keyspace events after which a key is read again, and after which it is
+# gone
+KEY_UPDATE_EVENTS = set(['hset', 'hmset', 'hdel', 'hincrby', 'hincrbyfloat', 'rename_to', 'restore'])
+KEY_DELETE_EVENTS = set(['del', 'expired', 'evicted', 'rename_from'])
+
+# Timeout of a wait for a notification, so that the recording duration is
+# checked
+RECORD_POLL_TIMEOUT_SECS = 1
+
+#
+# Helper functions =============================================================
+#
+
+def get_db_id(db_name):
+    database = get_database_config().get('DATABASES', {}).get(db_name)
+    if database is not None:
+        return int(database['id'])
+    if db_name not in DEFAULT_DB_IDS:
+        raise ValueError("Unknown database {}".format(db_name))
+    return DEFAULT_DB_IDS[db_name]
+
+
+def is_internal_key(key):
+    return key.startswith('_')
+
+#
+# Event log ====================================================================
+#
+
+class Event(object):
+    def __init__(self, t, op, db, key, fields=None):
+        self.t = t
+        self.op = op
+        self.db = db
+        self.key = key
+        self.fields = fields
+
+    def to_json(self):
+        entry = {'t': round(self.t, 6), 'op': self.op, 'db': self.db, 'key': self.key}
+        if self.fields is not None:
+            entry['fields'] = self.fields
+        return json.dumps(entry, sort_keys=True)
+
+    @staticmethod
+    def from_json(line):
+        entry = json.loads(line)
+        return Event(float(entry['t']), entry['op'], entry['db'], entry['key'], entry.get('fields'))
+
+
+class EventLog(object):
+    """
+    Event log read in memory
+
+    Attributes:
+        databases: Dictionary of database name to id
+        start: Time at which the recording started, in seconds since epoch
+        init: List of OP_INIT events, the initial content of the databases
+        events: List of the other events, in order
+    """
+    def __init__(self, databases, start, init, events):
+        self.databases = databases
+        self.start = start
+        self.init = init
+        self.events = events
+
+    @staticmethod
+    def load(path):
+        with open(path) as f:
+            header = json.loads(f.readline())
+            if header.get('format') != EVENT_LOG_FORMAT or header.get('version') != EVENT_LOG_VERSION:
+                raise ValueError("{} is not an event log of version {}".format(path, EVENT_LOG_VERSION))
+
+            init = []
+            events = []
+            for line in f:
+                if not line.strip():
+                    continue
+                event = Event.from_json(line)
+                if event.op == OP_INIT:
+                    init.append(event)
+                else:
+                    events.append(event)
+
+        return EventLog(header['databases'], header['start'], init, events)
+
+
+class EventLogWriter(object):
+    def __init__(self, f, databases, start):
+        self.f = f
+        header = {
+            'format': EVENT_LOG_FORMAT,
+            'version': EVENT_LOG_VERSION,
+            'start': start,
+            'databases': databases,
+        }
+        self.f.write(json.dumps(header, sort_keys=True) + '\n')
+
+    def write(self, event):
+        self.f.write(event.to_json() + '\n')
+
+#
+# Recorder =====================================================================
+#
+
+class Recorder(object):
+    """
+    Records the changes of hashes in some databases, from their keyspace
+    notifications. The databases must have keyspace notifications enabled,
+    as they are on a switch.
+
+    The databases may be placed on several Redis instances. The
+    notifications of each instance are received by a thread of its own,
+    and recorded in the order they are received.
+    """
+    def __init__(self, clients, writer, start):
+        """
+        Args:
+            clients: Dictionary of database name to (id, Redis client)
+            writer: EventLogWriter
+            start: Time of the beginning of the recording
+        """
+        self.clients = clients
+        self.writer = writer
+        self.start = start
+        # Last recorded value of each key, to skip the notifications which
+        # did not change it
+        self.values = {}
+        self.count = 0
+
+    def record(self, op, db, key, fields=None):
+        t = 0 if op == OP_INIT else time.time() - self.start
+        self.writer.write(Event(t, op, db, key, fields))
+        self.count += 1
+
+    def record_init(self):
+        """
+        Records the current content of the databases
+        """
+        for (db, (_, client)) in sorted(self.clients.items()):
+            for key in sorted(client.keys('*')):
+                if is_internal_key(key) or client.type(key) != 'hash':
+                    continue
+                fields = client.hgetall(key)
+                self.values[(db, key)] = fields
+                self.record(OP_INIT, db, key, fields)
+
+    def handle_notification(self, db, key, event):
+        if is_internal_key(key):
+            return
+
+        if event in KEY_DELETE_EVENTS:
+            fields = None
+        elif event in KEY_UPDATE_EVENTS:
+            try:
+                fields = self.clients[db][1].hgetall(key) or None
+            except redis.ResponseError:
+                # Not a hash
+                return
+        else:
+            return
+
+        if fields == self.values.get((db, key)):
+            return
+
+        if fields is None:
+            del self.values[(db, key)]
+            self.record(OP_DEL, db, key)
+        else:
+            self.values[(db, key)] = fields
+            self.record(OP_SET, db, key, fields)
+
+    def get_instances(self):
+        """
+        Returns:
+            A list of (Redis client, dictionary of keyspace channel to
+            database name), one per distinct Redis instance of the databases
+        """
+        instances = {}
+        for (db, (db_id, client)) in sorted(self.clients.items()):
+            kwargs = client.connection_pool.connection_kwargs
+            instance = (kwargs.get('path'), kwargs.get('host'), kwargs.get('port'))
+            (_, channels) = instances.setdefault(instance, (client, {}))
+            channels['__keyspace@{}__:'.format(db_id)] = db
+        return [instances[key] for key in sorted(instances)]
+
+    def listen(self, pubsub, channels, notifications, stop):
+        # Forwards the notifications of an instance to the recording thread,
+        # or the error which ended them
+        try:
+            while not stop.is_set():
+                item = pubsub.get_message(timeout=RECORD_POLL_TIMEOUT_SECS)
+                if item is not None and item['type'] == 'pmessage':
+                    (channel, key) = item['channel'].split(':', 1)
+                    notifications.put((channels[channel + ':'], key, item['data']))
+        except Exception, e:
+            notifications.put(e)
+
+    def run(self, duration=None):
+        """
+        Records the changes until the duration elapses, or forever
+        """
+        notifications = Queue.Queue()
+        stop = threading.Event()
+        pubsubs = []
+        listeners = []
+        try:
+            for (client, channels) in self.get_instances():
+                pubsub = client.pubsub()
+                pubsubs.append(pubsub)
+                for channel in sorted(channels):
+                    pubsub.psubscribe(channel + '*')
+
+                listener = threading.Thread(target=self.listen, args=(pubsub, channels, notifications, stop),
+                                            name='recorder-{}'.format(len(listeners)))
+                listener.daemon = True
+                listener.start()
+                listeners.append(listener)
+
+            deadline = self.start + duration if duration else None
+            while deadline is None or time.time() < deadline:
+                timeout = RECORD_POLL_TIMEOUT_SECS
+                if deadline is not None:
+                    timeout = max(0, min(timeout, deadline - time.time()))
+                try:
+                    notification = notifications.get(timeout=timeout)
+                except Queue.Empty:
+                    continue
+                if isinstance(notification, Exception):
+                    raise notification
+                self.handle_notification(*notification)
+        finally:
+            stop.set()
+            for listener in listeners:
+                listener.join()
+            for pubsub in pubsubs:
+                pubsub.close()
+
+#
+# Replayer =====================================================================
+#
+
+class Replayer(object):
+    """
+    Writes the events of an event log into Redis databases
+
+    A change of a hash is written as an update of its fields followed by
+    the deletion of its removed fields, never by a deletion of the key,
+    so that subscribers are not notified of a deletion.
+    """
+    def __init__(self, clients):
+        """
+        Args:
+            clients: Dictionary of database name to Redis client
+        """
+        self.clients = clients
+        # Current value of each key, as written
+        self.values = {}
+
+    def load_init(self, events):
+        """
+        Replaces the content of the databases with the initial content of
+        an event log, and marks the Config DB as initialized
+        """
+        for client in self.clients.values():
+            client.flushdb()
+        self.values = {}
+        self.write(events)
+        if 'CONFIG_DB' in self.clients:
+            self.clients['CONFIG_DB'].set(CONFIG_DB_INITIALIZED_KEY, '1')
+
+    def write(self, events):
+        """
+        Writes events in a single round trip per database
+        """
+        pipes = {}
+        for event in events:
+            if event.db not in pipes:
+                pipes[event.db] = self.clients[event.db].pipeline(transaction=False)
+            pipe = pipes[event.db]
+
+            old_fields = self.values.get((event.db, event.key), {})
+            if event.op == OP_DEL or not event.fields:
+                if (event.db, event.key) in self.values:
+                    pipe.delete(event.key)
+                    del self.values[(event.db, event.key)]
+                continue
+
+            pipe.hmset(event.key, event.fields)
+            removed = [field for field in old_fields if field not in event.fields]
+            if removed:
+                pipe.hdel(event.key, *removed)
+            self.values[(event.db, event.key)] = event.fields
+
+        for pipe in pipes.values():
+            pipe.execute()
+
+    def replay(self, events, speed=1.0):
+        """
+        Writes events at the pace they were recorded, divided by speed. With
+        a speed of 0, events are written as fast as possible. Events which
+        are due at the same time are written together.
+
+        Returns:
+            The list of the times at which each event was written
+        """
+        times = []
+        start = time.time()
+        i = 0
+        while i < len(events):
+            now = time.time()
+            if speed:
+                due = start + events[i].t / speed
+                if due > now:
+                    time.sleep(due - now)
+                    continue
+
+            # Write all the events which are due
+            j = i + 1
+            while j < len(events) and (not speed or start + events[j].t / speed <= now):
+                j += 1
+            self.write(events[i:j])
+            times += [time.time()] * (j - i)
+            i = j
+
+        return times
+
+#
+# Main =========================================================================
+#
+
+def connect(db_name, unix_socket=None, host=None, port=None, db_id=None):
+    if db_id is None:
+        db_id = get_db_id(db_name)
+    if unix_socket:
+        return redis.StrictRedis(unix_socket_path=unix_socket, db=db_id)
+    if host is None:
+        (host, port) = get_db_instance(db_name)
+    return redis.StrictRedis(host=host, port=port, db=db_id)
+
+
+def record_main(args):
+    clients = {}
+    for db in args.db or DEFAULT_DATABASES:
+        db_id = get_db_id(db)
+        clients[db] = (db_id, connect(db, db_id=db_id))
+
+    start = time.time()
+    with open(args.output, 'w') as f:
+        writer = EventLogWriter(f, dict((db, db_id) for (db, (db_id, _)) in clients.items()), start)
+        recorder = Recorder(clients, writer, start)
+        if args.init:
+            recorder.record_init()
+        print "Recording {} into {}, ^C to stop...".format(', '.join(sorted(clients)), args.output)
+        try:
+            recorder.run(args.time)
+        except KeyboardInterrupt:
+            pass
+
+    print "Recorded {} event(s) in {:.1f}s".format(recorder.count, time.time() - start)
+
+
+def replay_main(args):
+    log = EventLog.load(args.file)
+    clients = {}
+    for (db, db_id) in log.databases.items():
+        clients[db] = connect(db, args.unix_socket, args.host, args.port, db_id)
+
+    replayer = Replayer(clients)
+    if not args.no_init:
+        replayer.load_init(log.init)
+
+    times = replayer.replay(log.events, args.speed)
+    if times:
+        duration = times[-1] - times[0]
+        print "Replayed {} event(s) in {:.2f}s, {:.1f} events/s".format(
+            len(times), duration, len(times) / duration if duration else float('inf'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record and replay Redis database events')
+    subparsers = parser.add_subparsers()
+
+    record_parser = subparsers.add_parser('record', help='record the changes of the databases of this switch')
+    record_parser.add_argument('-o', '--output', required=True, help='event log to write')
+    record_parser.add_argument('-d', '--db', action='append',
+                               help='database to record, may be repeated (default: {})'.format(', '.join(DEFAULT_DATABASES)))
+    record_parser.add_argument('-i', '--init', action='store_true', help='record the initial content of the databases')
+    record_parser.add_argument('-t', '--time', type=float, help='seconds to record (default: until interrupted)')
+    record_parser.set_defaults(func=record_main)
+
+    replay_parser = subparsers.add_parser('replay', help='write the events of an event log into redis')
+    replay_parser.add_argument('file', help='event log to replay')
+    replay_parser.add_argument('-s', '--unix-socket', help='unix socket of the redis to write to')
+    replay_parser.add_argument('-H', '--host', help='host of the redis to write to')
+    replay_parser.add_argument('-p', '--port', type=int, default=6379, help='port of the redis to write to')
+    replay_parser.add_argument('--speed', type=float, default=1.0,
+                               help='speed up factor, 0 to write as fast as possible (default: %(default)s)')
+    replay_parser.add_argument('--no-init', action='store_true',
+                               help='do not replace the content of the databases with the initial content of the log')
+    replay_parser.set_defaults(func=replay_main)
+
+    args = parser.parse_args()
+    if args.func == replay_main and not args.unix_socket and not args.host:
+        # Never write into the databases of a running switch by accident
+        parser.error('the redis to write to must be given with --unix-socket or --host')
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python2
+
+"""
+    Subprocess executor for SONiC daemons
+
+    Commands are run from an argument vector, without a shell, each in its
+    own process group so that a command which exceeds its timeout is
+    killed along with the processes it spawned. Commands for tools which
+    read a script on stdin (e.g. iptables-restore, ipset restore, lldpcli)
+    may be batched into a single invocation. Independent commands may be
+    run in parallel by a bounded pool of persistent worker threads.
+
+    When given a ProcessStats registry, the executor records the number of
+    executions, failures and timeouts and a latency histogram per tool,
+    e.g. exec_iptables_restore, exec_iptables_restore_failures,
+    exec_iptables_restore_timeouts and exec_iptables_restore_latency.
+"""
+
+try:
+    import atexit
+    import os
+    import Queue
+    import shlex
+    import signal
+    import subprocess
+    import threading
+    import time
+except ImportError, e:
+    raise ImportError (str(e) + " - required module not found")
+
+#
+# Constants ====================================================================
+#
+
+# Timeout of a command, in seconds. None waits forever.
+DEFAULT_TIMEOUT_SECS = 60
+
+# Maximum number of commands run in parallel
+DEFAULT_MAX_WORKERS = 4
+
+# Time given to idle workers to exit at exit
+WORKER_STOP_TIMEOUT_SECS = 1
+
+#
+# Results ======================================================================
+#
+
+class ExecResult(object):
+    """
+    Outcome of a command. stderr is None if it was merged into stdout.
+    """
+    def __init__(self, argv, returncode, stdout, stderr, timed_out, duration):
+        self.argv = argv
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.timed_out = timed_out
+        self.duration = duration
+
+    @property
+    def ok(self):
+        return self.returncode == 0 and not self.timed_out
+
+    @property
+    def cmd(self):
+        return ' '.join(self.argv)
+
+    def error(self):
+        """
+        Returns:
+            A description of the failure, for logging
+        """
+        if self.timed_out:
+            return "'{}' timed out after {:.1f}s".format(self.cmd, self.duration)
+        output = self.stderr if self.stderr is not None else self.stdout
+        return "'{}' returned {}: {}".format(self.cmd, self.returncode, (output or '').strip())
+
+
+class PendingExec(object):
+    """
+    Command submitted to the worker pool, whose result is available once
+    it has run
+    """
+    def __init__(self, args):
+        self.args = args
+        self.done = threading.Event()
+        self.value = None
+
+    def set_result(self, value):
+        self.value = value
+        self.done.set()
+
+    def result(self):
+        self.done.wait()
+        return self.value
+
+#
+# Executor =====================================================================
+#
+
+class Executor(object):
+    def __init__(self, stats=None, timeout=DEFAULT_TIMEOUT_SECS, max_workers=DEFAULT_MAX_WORKERS):
+        self.stats = stats
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.queue = Queue.Queue()
+        self.workers = []
+        self.workers_lock = threading.Lock()
+
+    def run(self, argv, input=None, timeout=None, merge_stderr=False):
+        """
+        Runs a command and waits for it to complete
+
+        Args:
+            argv: List of arguments; a string is split as by a shell, but
+                  is not interpreted by one
+            input: String written to the command's stdin, if any
+            timeout: Seconds after which the command is killed, the
+                     executor's timeout if None
+            merge_stderr: Whether stderr is merged into stdout
+
+        Returns:
+            An ExecResult
+        """
+        if isinstance(argv, basestring):
+            argv = shlex.split(argv)
+        if timeout is None:
+            timeout = self.timeout
+
+        start = time.time()
+        try:
+            # Run the command in its own process group, so that the
+            # commands it spawns are killed along with it
+            proc = subprocess.Popen(argv,
+                                    stdin=subprocess.PIPE if input is not None else None,
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT if merge_stderr else subprocess.PIPE,
+                                    preexec_fn=os.setsid,
+                                    close_fds=True)
+        except OSError, e:
+            result = ExecResult(argv, -1, '', str(e), False, time.time() - start)
+            self.record(result)
+            return result
+
+        timed_out = []
+
+        def kill():
+            timed_out.append(True)
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+        timer = None
+        if timeout is not None:
+            timer = threading.Timer(timeout, kill)
+            timer.daemon = True
+            timer.start()
+        try:
+            (stdout, stderr) = proc.communicate(input)
+        finally:
+            if timer is not None:
+                timer.cancel()
+                timer.join()
+
+        result = ExecResult(argv, proc.returncode, stdout, stderr, bool(timed_out), time.time() - start)
+        self.record(result)
+        return result
+
+    def run_batch(self, argv, commands, timeout=None, merge_stderr=False):
+        """
+        Runs a batch of commands in a single invocation of a tool which
+        reads them on stdin, one per line
+
+        Args:
+            argv: Arguments of the tool, e.g. ['iptables-restore', '--noflush']
+            commands: List of strings, each string is a command of the tool
+
+        Returns:
+            An ExecResult
+        """
+        return self.run(argv, input='\n'.join(commands) + '\n', timeout=timeout, merge_stderr=merge_stderr)
+
+    def submit(self, argv, input=None, timeout=None, merge_stderr=False):
+        """
+        Queues a command for the worker pool
+
+        Returns:
+            A PendingExec, whose result() waits for the ExecResult
+        """
+        pending = PendingExec((argv, input, timeout, merge_stderr))
+        self.start_workers()
+        self.queue.put(pending)
+        return pending
+
+    def run_all(self, argvs, timeout=None, merge_stderr=False):
+        """
+        Runs independent commands in parallel, at most max_workers at once
+
+        Returns:
+            The list of ExecResult, in the order of the commands
+        """
+        if len(argvs) <= 1:
+            return [self.run(argv, timeout=timeout, merge_stderr=merge_stderr) for argv in argvs]
+
+        pendings = [self.submit(argv, timeout=timeout, merge_stderr=merge_stderr) for argv in argvs]
+        return [pending.result() for pending in pendings]
+
+    def start_workers(self):
+        # Workers are started on first use and persist for the lifetime of
+        # the process
+        with self.workers_lock:
+            if not self.workers:
+                atexit.register(self.stop_workers)
+            while len(self.workers) < self.max_workers:
+                worker = threading.Thread(target=self.worker_loop, name='executor-{}'.format(len(self.workers)))
+                worker.daemon = True
+                worker.start()
+                self.workers.append(worker)
+
+    def stop_workers(self):
+        with self.workers_lock:
+            workers = self.workers
+            self.workers = []
+        # Also called at exit, possibly once the workers were stopped
+        if not workers:
+            return
+        for worker in workers:
+            self.queue.put(None)
+        deadline = time.time() + WORKER_STOP_TIMEOUT_SECS
+        for worker in workers:
+            worker.join(max(0, deadline - time.time()))
+
+    def worker_loop(self):
+        while True:
+            pending = self.queue.get()
+            if pending is None:
+                return
+            (argv, input, timeout, merge_stderr) = pending.args
+            try:
+                result = self.run(argv, input=input, timeout=timeout, merge_stderr=merge_stderr)
+            except Exception, e:
+                result = ExecResult(argv, -1, '', str(e), False, 0)
+            pending.set_result(result)
+
+    def record(self, result):
+        if self.stats is None:
+            return
+
+        name = 'exec_' + os.path.basename(result.argv[0]).replace('-', '_').replace('.', '_')
+        self.stats.counter(name).inc()
+        if result.timed_out:
+            self.stats.counter(name + '_timeouts').inc()
+        elif result.returncode != 0:
+            self.stats.counter(name + '_failures').inc()
+        self.stats.histogram(name + '_latency').observe(result.duration)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python2
+
+"""
+    Syslog logger for SONiC daemons
+
+    The log is opened once per process. Messages may be passed as a format
+    string and arguments, which are only formatted if the message is
+    actually written. Identical messages repeated more than a burst within
+    a rate limiting interval are suppressed, and a summary of the number of
+    suppressed messages is written once the interval ends. Optionally,
+    messages are written to syslog by a background thread through a
+    bounded queue, so that logging never blocks the caller.
+"""
+
+try:
+    import atexit
+    import Queue
+    import syslog
+    import threading
+    import time
+except ImportError, e:
+    raise ImportError (str(e) + " - required module not found")
+
+#
+# Constants ====================================================================
+#
+
+# Identical messages beyond RATE_LIMIT_BURST within RATE_LIMIT_INTERVAL_SECS
+# are suppressed. An interval of 0 disables rate limiting.
+RATE_LIMIT_INTERVAL_SECS = 10
+RATE_LIMIT_BURST = 10
+
+# Maximum number of distinct messages tracked by the rate limiter
+RATE_LIMIT_MAX_MESSAGES = 1024
+
+# Maximum number of messages waiting to be written by the background thread
+LOG_QUEUE_SIZE = 1024
+
+# Time given to the background thread to write out queued messages at exit
+LOG_QUEUE_FLUSH_TIMEOUT_SECS = 2
+
+#
+# Helper classes ===============================================================
+#
+
+class RateLimiter(object):
+    """
+    Tracks the number of occurrences of each message within the current
+    interval of the message. Not thread safe, the caller serializes calls.
+    """
+    def __init__(self, interval=RATE_LIMIT_INTERVAL_SECS, burst=RATE_LIMIT_BURST,
+                 max_messages=RATE_LIMIT_MAX_MESSAGES):
+        self.interval = interval
+        self.burst = burst
+        self.max_messages = max_messages
+        # Message key => [interval start, occurrences, priority, text]
+        self.messages = {}
+        self.last_sweep = time.time()
+
+    def check(self, key, now):
+        """
+        Counts an occurrence of the message identified by key
+
+        Returns:
+            A tuple (allowed, summary) where allowed tells whether the
+            message may be written, and summary is (priority, text) of the
+            suppression summary of the previous interval of the message to
+            be written first, or None
+        """
+        summary = None
+
+        state = self.messages.get(key)
+        if state is not None and now - state[0] >= self.interval:
+            summary = self.get_summary(state)
+            state = None
+
+        if state is None:
+            if len(self.messages) >= self.max_messages:
+                return (True, summary)
+            state = [now, 0, None, None]
+            self.messages[key] = state
+
+        state[1] += 1
+        return (state[1] <= self.burst, summary)
+
+    def remember(self, key, priority, text):
+        """
+        Remembers the formatted text of an allowed message, for its summary
+        """
+        state = self.messages.get(key)
+        if state is not None:
+            state[2] = priority
+            state[3] = text
+
+    def get_summary(self, state):
+        suppressed = state[1] - self.burst
+        if suppressed <= 0 or state[3] is None:
+            return None
+
+        return (state[2], "Suppressed %d identical message(s) in %d seconds: %s" %
+                          (suppressed, self.interval, state[3]))
+
+    def sweep(self, now, force=False):
+        """
+        Forgets messages whose interval ended
+
+        Returns:
+            A list of (priority, text) suppression summaries to be written
+        """
+        if not force and now - self.last_sweep < self.interval:
+            return []
+        self.last_sweep = now
+
+        summaries = []
+        for (key, state) in self.messages.items():
+            if force or now - state[0] >= self.interval:
+                summary = self.get_summary(state)
+                if summary is not None:
+                    summaries.append(summary)
+                del self.messages[key]
+
+        return summaries
+
+
+class SyslogWriter(object):
+    """
+    Writes messages to syslog from a background thread. When the queue is
+    full, messages are dropped and the number of dropped messages is
+    written once the queue drains.
+    """
+    def __init__(self, queue_size=LOG_QUEUE_SIZE):
+        self.queue = Queue.Queue(queue_size)
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, name='syslog-writer')
+        self.thread.daemon = True
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def write(self, priority, text):
+        try:
+            self.queue.put_nowait((priority, text))
+        except Queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+
+            with self.lock:
+                dropped = self.dropped
+                self.dropped = 0
+            if dropped:
+                syslog.syslog(syslog.LOG_WARNING, "Dropped %d message(s), log queue full" % dropped)
+
+            syslog.syslog(*item)
+
+    def stop(self, timeout=LOG_QUEUE_FLUSH_TIMEOUT_SECS):
+        if not self.thread.is_alive():
+            return
+
+        # Block for the sentinel, so messages queued until now are written
+        try:
+            self.queue.put(None, timeout=timeout)
+        except Queue.Full:
+            return
+        self.thread.join(timeout)
+
+#
+# Logger =======================================================================
+#
+
+class SyslogLogger(object):
+    """
+    Syslog logger of a daemon
+
+    The log functions take a message, optionally followed by arguments; the
+    message is then formatted as msg % args, only if it is written.
+    Messages less important than the minimum priority are discarded before
+    being formatted. The keyword argument also_print_to_console=True prints
+    the message to stdout as well.
+
+    Args:
+        syslog_identifier: Identifier prepended to every message
+        facility: Syslog facility
+        rate_limit_interval: Rate limiting interval of identical messages,
+                             0 to disable rate limiting
+        rate_limit_burst: Number of identical messages written per interval
+        queue_size: If not 0, messages are written by a background thread
+                    through a queue of that size
+    """
+    def __init__(self, syslog_identifier, facility=syslog.LOG_USER,
+                 rate_limit_interval=RATE_LIMIT_INTERVAL_SECS, rate_limit_burst=RATE_LIMIT_BURST,
+                 queue_size=0):
+        syslog.openlog(ident=syslog_identifier, logoption=syslog.LOG_NDELAY, facility=facility)
+
+        self.min_priority = syslog.LOG_DEBUG
+        self.lock = threading.Lock()
+        self.rate_limiter = None
+        if rate_limit_interval > 0:
+            self.rate_limiter = RateLimiter(rate_limit_interval, rate_limit_burst)
+        self.writer = None
+        if queue_size > 0:
+            self.writer = SyslogWriter(queue_size)
+
+        # Registered after the writer, so that summaries are written before
+        # the writer stops
+        atexit.register(self.flush)
+
+    def set_min_priority(self, priority):
+        """
+        Discards messages less important than priority, e.g. LOG_INFO
+        discards debug messages
+        """
+        self.min_priority = priority
+
+    def is_enabled_for(self, priority):
+        return priority <= self.min_priority
+
+    def write(self, priority, text):
+        if self.writer is not None:
+            self.writer.write(priority, text)
+        else:
+            syslog.syslog(priority, text)
+
+    def format(self, msg, args):
+        if not args:
+            return msg
+        try:
+            return msg % args
+        except (TypeError, ValueError):
+            return "%s %s" % (msg, args)
+
+    def log(self, priority, msg, *args, **kwargs):
+        if priority > self.min_priority:
+            return
+
+        if self.rate_limiter is None:
+            text = self.format(msg, args)
+            self.write(priority, text)
+        else:
+            try:
+                key = (priority, msg, args)
+                hash(key)
+            except TypeError:
+                key = (priority, self.format(msg, args))
+
+            now = time.time()
+            with self.lock:
+                summaries = self.rate_limiter.sweep(now)
+                (allowed, summary) = self.rate_limiter.check(key, now)
+                if summary is not None:
+                    summaries.append(summary)
+                text = None
+                if allowed:
+                    text = self.format(msg, args)
+                    self.rate_limiter.remember(key, priority, text)
+
+            for (summary_priority, summary_text) in summaries:
+                self.write(summary_priority, summary_text)
+            if text is None:
+                return
+            self.write(priority, text)
+
+        if kwargs.get('also_print_to_console', False):
+            print text
+
+    def flush(self):
+        """
+        Writes the summaries of all currently suppressed messages
+        """
+        if self.rate_limiter is None:
+            return
+
+        with self.lock:
+            summaries = self.rate_limiter.sweep(time.time(), force=True)
+        for (priority, text) in summaries:
+            self.write(priority, text)
+
+    def log_error(self, msg, *args, **kwargs):
+        self.log(syslog.LOG_ERR, msg, *args, **kwargs)
+
+    def log_warning(self, msg, *args, **kwargs):
+        self.log(syslog.LOG_WARNING, msg, *args, **kwargs)
+
+    def log_notice(self, msg, *args, **kwargs):
+        self.log(syslog.LOG_NOTICE, msg, *args, **kwargs)
+
+    def log_info(self, msg, *args, **kwargs):
+        self.log(syslog.LOG_INFO, msg, *args, **kwargs)
+
+    def log_debug(self, msg, *args, **kwargs):
+        self.log(syslog.LOG_DEBUG, msg, *args, **kwargs)
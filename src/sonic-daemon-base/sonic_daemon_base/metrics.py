@@ -0,0 +1,198 @@
+#!/usr/bin/env python2
+
+"""
+    Process statistics for SONiC daemons
+
+    Daemons record counters, gauges (e.g. queue depths) and latency
+    histograms with fixed buckets in memory. The statistics are flushed
+    periodically to the PROCESS_STATS|<daemon> table of the State DB, in a
+    single pipelined write which replaces the whole entry.
+"""
+
+try:
+    import threading
+    import time
+    from sonic_daemon_base.daemon_base import get_db_instance
+except ImportError, e:
+    raise ImportError (str(e) + " - required module not found")
+
+#
+# Constants ====================================================================
+#
+
+PROCESS_STATS_TABLE = 'PROCESS_STATS'
+
+# Minimum interval between two writes to the State DB
+FLUSH_INTERVAL_SECS = 10
+
+# Upper bounds of the latency histogram buckets, in milliseconds. Latencies
+# above the last bound are counted in the 'inf' bucket.
+LATENCY_BUCKETS_MSECS = [1, 5, 10, 50, 100, 500, 1000, 5000]
+
+#
+# Metrics ======================================================================
+#
+
+class Counter(object):
+    def __init__(self, lock):
+        self.lock = lock
+        self.value = 0
+
+    def inc(self, count=1):
+        with self.lock:
+            self.value += count
+
+    def fields(self, name):
+        return {name: self.value}
+
+
+class Gauge(object):
+    def __init__(self, lock):
+        self.lock = lock
+        self.value = 0
+
+    def set(self, value):
+        with self.lock:
+            self.value = value
+
+    def fields(self, name):
+        return {name: self.value}
+
+
+class Histogram(object):
+    """
+    Latency histogram. Bucket counts are cumulative: the field
+    <name>_le_<bound>ms counts all latencies up to and including bound.
+    """
+    def __init__(self, lock, buckets=LATENCY_BUCKETS_MSECS):
+        self.lock = lock
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        msecs = seconds * 1000
+        index = len(self.buckets)
+        for (i, bound) in enumerate(self.buckets):
+            if msecs <= bound:
+                index = i
+                break
+
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += msecs
+            self.max = max(self.max, msecs)
+
+    def fields(self, name):
+        fields = {}
+        cumulative = 0
+        for (bound, count) in zip(self.buckets, self.counts):
+            cumulative += count
+            fields['%s_le_%dms' % (name, bound)] = cumulative
+        fields['%s_le_inf' % name] = self.count
+        fields['%s_count' % name] = self.count
+        fields['%s_sum_ms' % name] = int(self.total)
+        fields['%s_max_ms' % name] = int(self.max)
+        return fields
+
+
+class Timer(object):
+    """
+    Context manager which records the time spent in its block in a histogram
+    """
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.histogram.observe(time.time() - self.start)
+
+#
+# Registry =====================================================================
+#
+
+class ProcessStats(object):
+    """
+    Registry of the statistics of a daemon
+
+    Metrics are created on first use and may be updated from any thread.
+    The daemon calls maybe_flush() from its event loop; the statistics are
+    written to the State DB at most once per flush interval.
+    """
+    def __init__(self, daemon_name, flush_interval=FLUSH_INTERVAL_SECS, state_db=None):
+        self.key = PROCESS_STATS_TABLE + '|' + daemon_name
+        self.flush_interval = flush_interval
+        self.state_db = state_db
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.last_flush = 0
+
+    def get_metric(self, name, metric_class, *args):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = metric_class(self.lock, *args)
+                self.metrics[name] = metric
+        return metric
+
+    def counter(self, name):
+        return self.get_metric(name, Counter)
+
+    def gauge(self, name):
+        return self.get_metric(name, Gauge)
+
+    def histogram(self, name, buckets=LATENCY_BUCKETS_MSECS):
+        return self.get_metric(name, Histogram, buckets)
+
+    def timer(self, name):
+        return Timer(self.histogram(name))
+
+    def to_dict(self):
+        fields = {}
+        with self.lock:
+            for (name, metric) in self.metrics.iteritems():
+                fields.update(metric.fields(name))
+        return fields
+
+    def get_redis_client(self):
+        if self.state_db is None:
+            from swsssdk import SonicV2Connector
+            (hostname, port) = get_db_instance('STATE_DB')
+            self.state_db = SonicV2Connector(host=hostname, port=port)
+            self.state_db.connect(self.state_db.STATE_DB)
+        return self.state_db.get_redis_client(self.state_db.STATE_DB)
+
+    def flush(self):
+        """
+        Writes the statistics to the State DB
+        """
+        fields = self.to_dict()
+        fields['last_update'] = int(time.time())
+
+        pipe = self.get_redis_client().pipeline()
+        pipe.delete(self.key)
+        pipe.hmset(self.key, fields)
+        pipe.execute()
+
+        self.last_flush = time.time()
+
+    def maybe_flush(self):
+        """
+        Writes the statistics to the State DB if the flush interval has
+        passed since the last write
+
+        Returns:
+            True if the statistics were written, False otherwise
+        """
+        if time.time() - self.last_flush < self.flush_interval:
+            return False
+
+        self.flush()
+        return True
@@ -0,0 +1,172 @@
+#!/usr/bin/env python2
+
+"""
+    Transceiver module EEPROM access through the ethtool ioctl
+
+    Reads the EEPROM of the module plugged in the port of a network
+    interface with the ETHTOOL_GMODULEINFO and ETHTOOL_GMODULEEEPROM
+    commands of the SIOCETHTOOL ioctl, i.e. what 'ethtool -m' does, in
+    process. If the driver of the interface does not support the ioctl,
+    'ethtool -m' is run instead.
+"""
+
+try:
+    import array
+    import errno
+    import fcntl
+    import os
+    import socket
+    import struct
+    import subprocess
+except ImportError, e:
+    raise ImportError (str(e) + " - required module not found")
+
+#
+# Constants ====================================================================
+#
+
+SIOCETHTOOL = 0x8946
+
+ETHTOOL_GMODULEINFO = 0x42
+ETHTOOL_GMODULEEEPROM = 0x43
+
+IFNAMSIZ = 16
+
+# struct ifreq: the interface name followed by a union, whose largest
+# member is a struct ifmap
+IFREQ_SIZE = 40
+
+# struct ethtool_modinfo: cmd, type, eeprom_len and 8 reserved words
+MODINFO_FORMAT = '=11I'
+
+# struct ethtool_eeprom header: cmd, magic, offset and len, followed by
+# the data
+EEPROM_HEADER_FORMAT = '=4I'
+EEPROM_HEADER_SIZE = struct.calcsize(EEPROM_HEADER_FORMAT)
+
+# Errors returned by a driver which does not support module EEPROM
+# access, rather than failing to read it, e.g. for an absent module
+UNSUPPORTED_ERRNOS = set([errno.EOPNOTSUPP, errno.ENOTTY, errno.ENOSYS])
+
+ETHTOOL_CMD = 'ethtool'
+
+#
+# Per-process state ============================================================
+#
+
+# Socket the ioctls are issued on, once opened
+_socket = None
+
+# Whether the ioctl is supported, cleared on the first unsupported error
+_ioctl_supported = True
+
+#
+# Helper functions =============================================================
+#
+
+def _ethtool_ioctl(ifname, buf):
+    """
+    Issues an ethtool command, whose struct is in buf and is updated in
+    place
+
+    Raises:
+        IOError on failure
+    """
+    global _socket
+
+    if _socket is None:
+        _socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    (addr, _) = buf.buffer_info()
+    ifreq = struct.pack('{}sP'.format(IFNAMSIZ), ifname, addr)
+    ifreq += '\0' * (IFREQ_SIZE - len(ifreq))
+    fcntl.ioctl(_socket.fileno(), SIOCETHTOOL, ifreq)
+
+
+def get_module_info(ifname):
+    """
+    Returns:
+        (type, eeprom_len): the SFF standard of the module EEPROM layout,
+        one of the ETH_MODULE_SFF_* values, and its size in bytes
+
+    Raises:
+        IOError on failure
+    """
+    buf = array.array('B', struct.pack(MODINFO_FORMAT, ETHTOOL_GMODULEINFO, *([0] * 10)))
+    _ethtool_ioctl(ifname, buf)
+    fields = struct.unpack(MODINFO_FORMAT, buf.tostring())
+    return (fields[1], fields[2])
+
+
+def read_module_eeprom(ifname, offset, num_bytes):
+    """
+    Reads bytes of the module EEPROM. As with 'ethtool -m', bytes beyond
+    the end of the EEPROM are not read.
+
+    Returns:
+        The bytes read, as a string
+
+    Raises:
+        IOError on failure, e.g. if no module is plugged
+    """
+    (_, eeprom_len) = get_module_info(ifname)
+    if offset >= eeprom_len:
+        raise IOError(errno.EINVAL, "Offset {} is out of the EEPROM of {}".format(offset, ifname))
+    num_bytes = min(num_bytes, eeprom_len - offset)
+
+    buf = array.array('B', struct.pack(EEPROM_HEADER_FORMAT, ETHTOOL_GMODULEEEPROM, 0, offset, num_bytes))
+    buf.extend([0] * num_bytes)
+    _ethtool_ioctl(ifname, buf)
+    return buf[EEPROM_HEADER_SIZE:].tostring()
+
+
+def _read_module_eeprom_via_ethtool(ifname, offset, num_bytes):
+    """
+    Returns:
+        The bytes read as a list of hex strings, parsed from the hex dump
+        of 'ethtool -m', or None on failure
+    """
+    cmd = [ETHTOOL_CMD, '-m', ifname, 'hex', 'on', 'offset', str(offset), 'length', str(num_bytes)]
+    with open(os.devnull, 'w') as devnull:
+        try:
+            output = subprocess.check_output(cmd, stderr=devnull)
+        except (subprocess.CalledProcessError, OSError):
+            return None
+
+    eeprom_raw = []
+    output_lines = output.splitlines()
+    if output_lines and "Offset" in output_lines[0]:
+        for line in output_lines[2:]:
+            eeprom_raw += line.split()[1:]
+    return eeprom_raw
+
+
+def read_module_eeprom_hex(ifname, offset, num_bytes):
+    """
+    Reads bytes of the module EEPROM, through the ioctl if supported, else
+    through 'ethtool -m'
+
+    Returns:
+        The bytes read as a list of two digit hex strings, as in the hex
+        dump of 'ethtool -m', or None on failure
+    """
+    global _ioctl_supported
+
+    if _ioctl_supported:
+        try:
+            return ['{:02x}'.format(ord(byte)) for byte in read_module_eeprom(ifname, offset, num_bytes)]
+        except IOError, e:
+            if e.errno not in UNSUPPORTED_ERRNOS:
+                return None
+            _ioctl_supported = False
+
+    return _read_module_eeprom_via_ethtool(ifname, offset, num_bytes)
+
+
+def is_module_present(ifname):
+    """
+    Returns:
+        True if the first bytes of the module EEPROM can be read
+    """
+    eeprom_raw = read_module_eeprom_hex(ifname, 0, 4)
+    return bool(eeprom_raw)
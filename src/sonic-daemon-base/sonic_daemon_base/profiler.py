@@ -0,0 +1,134 @@
+#!/usr/bin/env python2
+
+"""
+    On-demand profiling of SONiC daemons
+
+    Once enabled for a daemon, each delivery of the profiling signal
+    (SIGUSR2 by default) toggles a cProfile profiler. Every toggle writes
+    the stacks of all threads and, when the profiler is stopped, its
+    cumulative statistics to /var/log/<daemon>.prof. While the profiler is
+    off, the only overhead is the installed signal handler.
+"""
+
+try:
+    import cProfile
+    import os
+    import pstats
+    import signal
+    import StringIO
+    import sys
+    import syslog
+    import tempfile
+    import threading
+    import time
+    import traceback
+except ImportError, e:
+    raise ImportError (str(e) + " - required module not found")
+
+#
+# Constants ====================================================================
+#
+
+PROFILE_SIGNAL = signal.SIGUSR2
+PROFILE_OUTPUT_DIR = '/var/log'
+
+# Number of functions listed in the profiler statistics
+PROFILE_STATS_LIMIT = 100
+
+#
+# Helper classes ===============================================================
+#
+
+class SignalProfiler(object):
+    """
+    Signal-toggled profiler of the current process
+
+    cProfile only profiles the thread which enabled it. Since signal
+    handlers always run in the main thread, that is the main thread of the
+    daemon; the stacks of all threads are included in every dump.
+    """
+    def __init__(self, daemon_name, output_dir=PROFILE_OUTPUT_DIR):
+        self.daemon_name = daemon_name
+        self.output_file = os.path.join(output_dir, daemon_name + '.prof')
+        self.profile = None
+        self.start_time = None
+
+    def install(self, sig=PROFILE_SIGNAL):
+        signal.signal(sig, self.signal_handler)
+        # Restart the system calls interrupted by the signal where possible.
+        # select() is never restarted, see get_pubsub_message().
+        signal.siginterrupt(sig, False)
+
+    def signal_handler(self, sig, frame):
+        try:
+            self.toggle()
+        except Exception, e:
+            syslog.syslog(syslog.LOG_ERR, "Failed to toggle profiler of %s: %s" % (self.daemon_name, str(e)))
+
+    def toggle(self):
+        if self.profile is None:
+            self.profile = cProfile.Profile()
+            self.start_time = time.time()
+            self.profile.enable()
+            self.dump("Profiler started")
+            syslog.syslog(syslog.LOG_NOTICE, "Profiler of %s started" % self.daemon_name)
+        else:
+            self.profile.disable()
+            self.dump("Profiler stopped after %.3f seconds" % (time.time() - self.start_time),
+                      self.profile)
+            self.profile = None
+            syslog.syslog(syslog.LOG_NOTICE, "Profiler of %s stopped, written to %s" %
+                          (self.daemon_name, self.output_file))
+
+    def format_thread_stacks(self):
+        names = dict((thread.ident, thread.name) for thread in threading.enumerate())
+
+        lines = []
+        for (ident, frame) in sys._current_frames().items():
+            lines.append("Thread %s (%d):\n" % (names.get(ident, 'unknown'), ident))
+            lines.extend(traceback.format_stack(frame))
+            lines.append("\n")
+
+        return "".join(lines)
+
+    def format_profile_stats(self, profile):
+        stream = StringIO.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats('cumulative').print_stats(PROFILE_STATS_LIMIT)
+
+        return stream.getvalue()
+
+    def dump(self, title, profile=None):
+        data = "%s: %s at %s (pid %d)\n\n" % (self.daemon_name, title,
+                                              time.strftime('%Y-%m-%d %H:%M:%S'), os.getpid())
+        data += self.format_thread_stacks()
+        if profile is not None:
+            data += self.format_profile_stats(profile)
+
+        # Replace the output file atomically, so it is never seen half written
+        (fd, tmp_file) = tempfile.mkstemp(dir=os.path.dirname(self.output_file))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+            os.chmod(tmp_file, 0644)
+            os.rename(tmp_file, self.output_file)
+        except:
+            os.unlink(tmp_file)
+            raise
+
+#
+# Helper functions =============================================================
+#
+
+def enable_signal_profiling(daemon_name, sig=PROFILE_SIGNAL, output_dir=PROFILE_OUTPUT_DIR):
+    """
+    Installs a handler for sig which toggles profiling of the calling
+    process. Must be called from the main thread.
+
+    Returns:
+        The installed SignalProfiler
+    """
+    profiler = SignalProfiler(daemon_name, output_dir)
+    profiler.install(sig)
+
+    return profiler
@@ -0,0 +1,266 @@
+#!/usr/bin/env python2
+
+"""
+    Event-driven subscription framework for SONiC daemons
+
+    Daemons register a handler per Redis table and let a single
+    Select-driven dispatcher run the event loop. On each wakeup, all
+    notifications available for all subscribed tables are drained,
+    coalesced per key (only the latest operation and values of a key are
+    delivered) and handed to the table handlers in batches. An exception
+    raised by a handler is logged and doesn't stop the event loop.
+"""
+
+try:
+    import collections
+    import syslog
+    import time
+    import traceback
+except ImportError, e:
+    raise ImportError (str(e) + " - required module not found")
+
+#
+# Constants ====================================================================
+#
+
+SELECT_TIMEOUT_MSECS = 1000
+
+# Maximum number of notifications drained from a single table per wakeup.
+# Notifications beyond this are left in the table and drained on the next
+# wakeup, so a busy table can't starve the others.
+MAX_PENDING_EVENTS = 1024
+
+#
+# Helper classes ===============================================================
+#
+
+class HandlerStats(object):
+    """
+    Processing statistics of a table handler
+    """
+    def __init__(self):
+        self.events = 0
+        self.coalesced_events = 0
+        self.errors = 0
+        self.batches = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, num_events, latency):
+        self.events += num_events
+        self.batches += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def to_dict(self):
+        return {
+            'events': self.events,
+            'coalesced_events': self.coalesced_events,
+            'errors': self.errors,
+            'batches': self.batches,
+            'total_latency_ms': int(self.total_latency * 1000),
+            'max_latency_ms': int(self.max_latency * 1000),
+        }
+
+
+class TableSubscription(object):
+    """
+    Subscription to the notifications of a single table
+
+    Attributes:
+        table_name: Name of the subscribed table
+        handler: Called as handler(key, op, fvs) for each event, where op is
+                 'SET' or 'DEL' and fvs is a dictionary of field-values
+        snapshot_handler: If given, called once as snapshot_handler(entries)
+                          with a dictionary of the initial contents of the
+                          table, before any event is delivered to handler
+        pending: Events waiting to be delivered, keyed by key
+        stats: Processing statistics of handler
+    """
+    def __init__(self, db, table_name, handler, snapshot_handler=None, max_pending=MAX_PENDING_EVENTS):
+        from swsscommon import swsscommon
+
+        self.table_name = table_name
+        self.handler = handler
+        self.snapshot_handler = snapshot_handler
+        self.max_pending = max_pending
+        self.pending = collections.OrderedDict()
+        self.stats = HandlerStats()
+
+        # The subscriber table scans the existing contents of the table once
+        # subscribed, so no notification can be missed between the initial
+        # snapshot and the subsequent events
+        self.table = swsscommon.SubscriberStateTable(db, table_name)
+
+    def drain(self, max_events=None):
+        """
+        Moves notifications from the subscriber table to the pending events,
+        coalescing them per key
+
+        Returns:
+            Number of notifications drained
+        """
+        num_events = 0
+
+        while max_events is None or len(self.pending) < max_events:
+            (key, op, fvs) = self.table.pop()
+            if not key:
+                break
+
+            num_events += 1
+            if key in self.pending:
+                # Move the key to the end, so that events are delivered in
+                # the order of their latest update
+                del self.pending[key]
+                self.stats.coalesced_events += 1
+            self.pending[key] = (op, dict(fvs))
+
+        return num_events
+
+    def log_handler_error(self, handler_name, key=None):
+        self.stats.errors += 1
+        if key is None:
+            syslog.syslog(syslog.LOG_ERR, "Table {} {} failed: {}".format(
+                self.table_name, handler_name, traceback.format_exc()))
+        else:
+            syslog.syslog(syslog.LOG_ERR, "Table {} {} failed on key {}: {}".format(
+                self.table_name, handler_name, key, traceback.format_exc()))
+
+    def take_snapshot(self):
+        """
+        Delivers the initial contents of the table, either to
+        snapshot_handler at once or as individual events to handler
+        """
+        self.drain()
+
+        if self.snapshot_handler is None:
+            self.dispatch()
+            return
+
+        entries = dict((key, fvs) for (key, (op, fvs)) in self.pending.iteritems() if op == 'SET')
+        num_events = len(self.pending)
+        self.pending.clear()
+
+        start = time.time()
+        try:
+            self.snapshot_handler(entries)
+        except Exception:
+            self.log_handler_error('snapshot handler')
+        self.stats.record(num_events, time.time() - start)
+
+    def dispatch(self):
+        """
+        Delivers all pending events to handler
+        """
+        if not self.pending:
+            return
+
+        events = self.pending
+        self.pending = collections.OrderedDict()
+
+        start = time.time()
+        for (key, (op, fvs)) in events.iteritems():
+            try:
+                self.handler(key, op, fvs)
+            except Exception:
+                self.log_handler_error('handler', key)
+        self.stats.record(len(events), time.time() - start)
+
+#
+# Dispatcher ===================================================================
+#
+
+class SubscriptionDispatcher(object):
+    """
+    Select-driven event loop which delivers table notifications to the
+    handlers registered by a daemon
+    """
+    def __init__(self, select_timeout_ms=SELECT_TIMEOUT_MSECS, max_pending=MAX_PENDING_EVENTS):
+        from swsscommon import swsscommon
+
+        self.select_timeout_ms = select_timeout_ms
+        self.max_pending = max_pending
+        self.select = swsscommon.Select()
+        self.subscriptions = []
+        self.cycle_handlers = []
+        self.running = False
+
+    def subscribe(self, db, table_name, handler, snapshot_handler=None):
+        """
+        Subscribes handler to the notifications of a table. The initial
+        contents of the table are delivered right away, see
+        TableSubscription.
+
+        Args:
+            db: swsscommon.DBConnector of the database of the table
+            table_name: Name of the table
+            handler: Called as handler(key, op, fvs) for each event
+            snapshot_handler: Optionally called once with the initial
+                              contents of the table
+        """
+        subscription = TableSubscription(db, table_name, handler, snapshot_handler, self.max_pending)
+        self.select.addSelectable(subscription.table)
+        self.subscriptions.append(subscription)
+
+        subscription.take_snapshot()
+
+        return subscription
+
+    def add_cycle_handler(self, handler):
+        """
+        Registers handler to be called without arguments after each wakeup
+        of the event loop, including select timeouts
+        """
+        self.cycle_handlers.append(handler)
+
+    def run_once(self, timeout_ms=None):
+        """
+        Waits for notifications once and delivers all available events
+
+        Returns:
+            True if any event was delivered, False on timeout
+        """
+        from swsscommon import swsscommon
+
+        if timeout_ms is None:
+            timeout_ms = self.select_timeout_ms
+
+        (state, selectable) = self.select.select(timeout_ms)
+
+        num_events = 0
+        if state == swsscommon.Select.OBJECT:
+            # Drain all tables, not just the one which woke us up, so that
+            # all notifications which are available are handled as a batch
+            for subscription in self.subscriptions:
+                num_events += subscription.drain(self.max_pending)
+
+            for subscription in self.subscriptions:
+                subscription.dispatch()
+
+        for handler in self.cycle_handlers:
+            try:
+                handler()
+            except Exception:
+                syslog.syslog(syslog.LOG_ERR, "Cycle handler failed: {}".format(traceback.format_exc()))
+
+        return num_events > 0
+
+    def run(self):
+        """
+        Runs the event loop until stop() is called
+        """
+        self.running = True
+        while self.running:
+            self.run_once()
+
+    def stop(self):
+        self.running = False
+
+    def get_stats(self):
+        """
+        Returns:
+            A dictionary where key is table name and value is a dictionary
+            of processing statistics of the table's handler
+        """
+        return dict((subscription.table_name, subscription.stats.to_dict())
+                    for subscription in self.subscriptions)
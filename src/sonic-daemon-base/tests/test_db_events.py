@@ -0,0 +1,261 @@
+import imp
+import os
+import shutil
+import sys
+import tempfile
+import time
+from unittest import TestCase
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(test_dir, '..'))
+
+from sonic_daemon_base import db_events
+from sonic_daemon_base.db_events import EventLog, EventLogWriter, Recorder, Replayer
+
+daemon_bench = imp.load_source('daemon_bench', os.path.join(test_dir, '..', 'bench', 'daemon_bench.py'))
+
+
+class FakeConnectionPool(object):
+    def __init__(self, **connection_kwargs):
+        self.connection_kwargs = connection_kwargs
+
+
+class FakePubSub(object):
+    """
+    Delivers the notifications queued on its instance
+    """
+    def __init__(self, instance):
+        self.instance = instance
+        self.patterns = []
+        self.closed = False
+
+    def psubscribe(self, pattern):
+        self.patterns.append(pattern)
+
+    def get_message(self, timeout=0):
+        if self.instance.notifications:
+            (db_id, key, event) = self.instance.notifications.pop(0)
+            channel = '__keyspace@{}__:{}'.format(db_id, key)
+            if any(channel.startswith(pattern[:-1]) for pattern in self.patterns):
+                return {'type': 'pmessage', 'channel': channel, 'data': event}
+            return None
+        time.sleep(min(timeout, 0.01))
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class FakeInstance(object):
+    """
+    Redis instance, holding the hashes of its databases
+    """
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.dbs = {}
+        self.notifications = []
+        self.pubsubs = []
+
+    def client(self, db_id):
+        return FakeRedis(self, db_id)
+
+
+class FakeRedis(object):
+    """
+    Client of a database of a FakeInstance, implementing the commands used
+    by the recorder and the replayer. Writes queue keyspace notifications.
+    """
+    def __init__(self, instance, db_id):
+        self.instance = instance
+        self.db_id = db_id
+        self.connection_pool = FakeConnectionPool(host=instance.host, port=instance.port, db=db_id)
+
+    @property
+    def data(self):
+        return self.instance.dbs.setdefault(self.db_id, {})
+
+    def notify(self, key, event):
+        self.instance.notifications.append((self.db_id, key, event))
+
+    def keys(self, pattern):
+        return self.data.keys()
+
+    def type(self, key):
+        return 'hash' if isinstance(self.data.get(key), dict) else 'string'
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hmset(self, key, fields):
+        self.data.setdefault(key, {}).update(fields)
+        self.notify(key, 'hset')
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.data[key].pop(field, None)
+        if not self.data[key]:
+            del self.data[key]
+        self.notify(key, 'hdel')
+
+    def delete(self, key):
+        self.data.pop(key, None)
+        self.notify(key, 'del')
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def flushdb(self):
+        self.data.clear()
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def pubsub(self):
+        pubsub = FakePubSub(self.instance)
+        self.instance.pubsubs.append(pubsub)
+        return pubsub
+
+
+class FakePipeline(object):
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append((name, args))
+        return queue
+
+    def execute(self):
+        for (name, args) in self.commands:
+            getattr(self.client, name)(*args)
+        self.commands = []
+
+
+class TestDbEvents(TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.work_dir, 'test.events')
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def record(self, clients, changes, duration=0.5):
+        """
+        Records the initial content of the databases, then the changes
+        made by the function changes, for duration seconds
+
+        Returns:
+            The EventLog recorded
+        """
+        start = time.time()
+        with open(self.log_path, 'w') as f:
+            writer = EventLogWriter(f, dict((db, db_id) for (db, (db_id, _)) in clients.items()), start)
+            recorder = Recorder(clients, writer, start)
+            recorder.record_init()
+            changes()
+            recorder.run(duration)
+        return EventLog.load(self.log_path)
+
+    def test_record_and_replay(self):
+        instance = FakeInstance('127.0.0.1', 6379)
+        config_db = instance.client(4)
+        appl_db = instance.client(0)
+        config_db.hmset('PORT|Ethernet0', {'mtu': '9100', 'admin_status': 'up'})
+        config_db.hmset('PORT|Ethernet8', {'mtu': '9100'})
+        config_db.set('CONFIG_DB_INITIALIZED', '1')
+        appl_db.hmset('_PORT_TABLE:Ethernet0', {'mtu': '9100'})
+        del instance.notifications[:]
+
+        def changes():
+            config_db.hmset('PORT|Ethernet4', {'mtu': '1500'})
+            config_db.hdel('PORT|Ethernet0', 'admin_status')
+            # Not changed, not recorded
+            config_db.hmset('PORT|Ethernet4', {'mtu': '1500'})
+            appl_db.hmset('PORT_TABLE:Ethernet4', {'oper_status': 'up'})
+            config_db.delete('PORT|Ethernet8')
+
+        log = self.record({'CONFIG_DB': (4, config_db), 'APPL_DB': (0, appl_db)}, changes)
+        self.assertEqual(log.databases, {'CONFIG_DB': 4, 'APPL_DB': 0})
+        self.assertEqual([(event.db, event.key) for event in log.init], [('CONFIG_DB', 'PORT|Ethernet0'),
+                                                                          ('CONFIG_DB', 'PORT|Ethernet8')])
+        self.assertEqual([(event.op, event.db, event.key) for event in log.events], [
+            ('set', 'CONFIG_DB', 'PORT|Ethernet4'),
+            ('set', 'CONFIG_DB', 'PORT|Ethernet0'),
+            ('set', 'APPL_DB', 'PORT_TABLE:Ethernet4'),
+            ('del', 'CONFIG_DB', 'PORT|Ethernet8')])
+        self.assertEqual(sorted(event.t for event in log.events), [event.t for event in log.events])
+
+        # Replay into another instance
+        target = FakeInstance('127.0.0.2', 6379)
+        replayer = Replayer({'CONFIG_DB': target.client(4), 'APPL_DB': target.client(0)})
+        replayer.load_init(log.init)
+        self.assertEqual(target.dbs[4], {'PORT|Ethernet0': {'mtu': '9100', 'admin_status': 'up'},
+                                         'PORT|Ethernet8': {'mtu': '9100'},
+                                         'CONFIG_DB_INITIALIZED': '1'})
+        del target.notifications[:]
+
+        times = replayer.replay(log.events, speed=0)
+        self.assertEqual(len(times), len(log.events))
+        self.assertEqual(target.dbs[4], {'PORT|Ethernet0': {'mtu': '9100'},
+                                         'PORT|Ethernet4': {'mtu': '1500'},
+                                         'CONFIG_DB_INITIALIZED': '1'})
+        self.assertEqual(target.dbs[0], {'PORT_TABLE:Ethernet4': {'oper_status': 'up'}})
+        # A change of a hash is not written as a deletion of the key. The
+        # events of a database are written in order.
+        self.assertEqual([(key, event) for (db_id, key, event) in target.notifications if db_id == 4], [
+            ('PORT|Ethernet4', 'hset'),
+            ('PORT|Ethernet0', 'hset'),
+            ('PORT|Ethernet0', 'hdel'),
+            ('PORT|Ethernet8', 'del')])
+
+    def test_record_databases_on_several_instances(self):
+        instance = FakeInstance('127.0.0.1', 6379)
+        other_instance = FakeInstance('127.0.0.1', 6380)
+        config_db = instance.client(4)
+        state_db = instance.client(6)
+        appl_db = other_instance.client(0)
+
+        def changes():
+            config_db.hmset('PORT|Ethernet0', {'mtu': '9100'})
+            appl_db.hmset('PORT_TABLE:Ethernet0', {'mtu': '9100'})
+            state_db.hmset('PORT_TABLE|Ethernet0', {'state': 'ok'})
+
+        log = self.record({'CONFIG_DB': (4, config_db), 'STATE_DB': (6, state_db), 'APPL_DB': (0, appl_db)}, changes)
+        self.assertEqual(sorted((event.db, event.key) for event in log.events), [
+            ('APPL_DB', 'PORT_TABLE:Ethernet0'),
+            ('CONFIG_DB', 'PORT|Ethernet0'),
+            ('STATE_DB', 'PORT_TABLE|Ethernet0')])
+
+        # One subscription per instance, closed after the recording
+        self.assertEqual(len(instance.pubsubs), 1)
+        self.assertEqual(sorted(instance.pubsubs[0].patterns), ['__keyspace@4__:*', '__keyspace@6__:*'])
+        self.assertEqual(len(other_instance.pubsubs), 1)
+        self.assertEqual(other_instance.pubsubs[0].patterns, ['__keyspace@0__:*'])
+        self.assertTrue(all(pubsub.closed for pubsub in instance.pubsubs + other_instance.pubsubs))
+
+    def test_replay_pace(self):
+        target = FakeInstance('127.0.0.1', 6379)
+        replayer = Replayer({'CONFIG_DB': target.client(4)})
+        events = [db_events.Event(t, db_events.OP_SET, 'CONFIG_DB', 'KEY|{}'.format(t), {'f': 'v'})
+                  for t in [0, 0, 0.2, 0.4]]
+        times = replayer.replay(events, speed=2.0)
+        self.assertEqual(times[0], times[1])
+        self.assertAlmostEqual(times[2] - times[0], 0.1, delta=0.05)
+        self.assertAlmostEqual(times[3] - times[0], 0.2, delta=0.05)
+
+
+class TestDaemonBench(TestCase):
+
+    def test_get_lags(self):
+        write_times = [1.0, 2.0, 2.5, 6.0]
+        execs = [(0.5, 'vtysh', 10), (1.2, 'vtysh', 10), (3.0, 'vtysh', 20), (3.5, 'vtysh', 20)]
+        (lags, unanswered) = daemon_bench.get_lags(write_times, execs)
+        # Events written before the same command share it
+        self.assertEqual([round(lag, 6) for lag in lags], [0.2, 1.0, 0.5])
+        self.assertEqual(unanswered, 1)
+
+    def test_get_lags_no_execs(self):
+        self.assertEqual(daemon_bench.get_lags([1.0, 2.0], []), ([], 2))
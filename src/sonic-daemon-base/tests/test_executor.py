@@ -0,0 +1,168 @@
+import imp
+import os
+import shutil
+import sys
+import tempfile
+import time
+from unittest import TestCase
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(test_dir, '..'))
+
+from sonic_daemon_base.executor import ExecResult, Executor
+
+
+class FakeCounter(object):
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, n=1):
+        self.value += n
+
+
+class FakeHistogram(object):
+    def __init__(self):
+        self.values = []
+
+    def observe(self, value):
+        self.values.append(value)
+
+
+class FakeStats(object):
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+    def counter(self, name):
+        return self.counters.setdefault(name, FakeCounter())
+
+    def histogram(self, name):
+        return self.histograms.setdefault(name, FakeHistogram())
+
+
+def run_in_workers(func):
+    """
+    Under 'setup.py test' the tests run while setup.py is imported, and
+    os.fork() waits for the import lock, which the worker threads would never
+    get. Release it while the workers run.
+    """
+    def wrapper(*args, **kwargs):
+        released = 0
+        while imp.lock_held():
+            imp.release_lock()
+            released += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            for _ in range(released):
+                imp.acquire_lock()
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    # A zombie has exited, and is only waiting for its parent
+    try:
+        with open('/proc/{}/stat'.format(pid)) as f:
+            return f.read().split(')')[-1].split()[0] != 'Z'
+    except IOError:
+        return False
+
+
+class TestExecutor(TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.stats = FakeStats()
+        self.executor = Executor(self.stats, timeout=10, max_workers=3)
+
+    def tearDown(self):
+        self.executor.stop_workers()
+        shutil.rmtree(self.work_dir)
+
+    def test_run(self):
+        result = self.executor.run(['sh', '-c', 'echo out; echo err >&2; exit 3'])
+        self.assertEqual((result.returncode, result.stdout, result.stderr), (3, 'out\n', 'err\n'))
+        self.assertFalse(result.ok)
+        self.assertFalse(result.timed_out)
+        self.assertIn("returned 3: err", result.error())
+
+        result = self.executor.run("sh -c 'echo out; echo err >&2'", merge_stderr=True)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.stdout, 'out\nerr\n')
+        self.assertIsNone(result.stderr)
+
+    def test_run_missing_command(self):
+        result = self.executor.run(['/nonexistent/tool'])
+        self.assertEqual(result.returncode, -1)
+        self.assertFalse(result.ok)
+
+    def test_timeout_kills_children(self):
+        pid_file = os.path.join(self.work_dir, 'child.pid')
+        start = time.time()
+        # The shell spawns a child which would outlive it if only the shell
+        # were killed
+        result = self.executor.run(['sh', '-c', 'sleep 30 & echo $! > {}; wait'.format(pid_file)], timeout=0.5)
+        self.assertLess(time.time() - start, 10)
+        self.assertTrue(result.timed_out)
+        self.assertFalse(result.ok)
+        self.assertIn("timed out", result.error())
+
+        with open(pid_file) as f:
+            child_pid = int(f.read())
+        deadline = time.time() + 5
+        while is_running(child_pid) and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(is_running(child_pid))
+
+    def test_run_batch(self):
+        result = self.executor.run_batch(['cat'], ['-A INPUT -j ACCEPT', 'COMMIT'])
+        self.assertEqual(result.stdout, '-A INPUT -j ACCEPT\nCOMMIT\n')
+
+    @run_in_workers
+    def test_run_all_order(self):
+        # Later commands complete first
+        argvs = [['sh', '-c', 'sleep {}; echo {}'.format(0.6 - 0.2 * i, i)] for i in range(3)]
+        argvs.append(['echo', '3'])
+        start = time.time()
+        results = self.executor.run_all(argvs)
+        self.assertEqual([result.stdout for result in results], ['0\n', '1\n', '2\n', '3\n'])
+        # Run in parallel
+        self.assertLess(time.time() - start, 1.0)
+
+    @run_in_workers
+    def test_run_all_bounded(self):
+        marker_dir = os.path.join(self.work_dir, 'running')
+        os.mkdir(marker_dir)
+        # Each command records how many commands run along with it
+        script = 'touch {dir}/$$; sleep 0.2; ls {dir} | wc -l; rm {dir}/$$'.format(dir=marker_dir)
+        results = self.executor.run_all([['sh', '-c', script]] * 6)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertLessEqual(max(int(result.stdout) for result in results), 3)
+
+    def test_stats(self):
+        self.executor.run(['true'])
+        self.executor.run(['false'])
+        self.executor.run(['sleep', '5'], timeout=0.1)
+        self.executor.run_batch(['/bin/cat'], ['x'])
+
+        counters = dict((name, counter.value) for (name, counter) in self.stats.counters.items())
+        self.assertEqual(counters, {
+            'exec_true': 1,
+            'exec_false': 1,
+            'exec_false_failures': 1,
+            'exec_sleep': 1,
+            'exec_sleep_timeouts': 1,
+            'exec_cat': 1,
+        })
+        self.assertEqual(sorted(self.stats.histograms), ['exec_cat_latency', 'exec_false_latency',
+                                                         'exec_sleep_latency', 'exec_true_latency'])
+
+    def test_stats_name_of_tool(self):
+        self.executor.record(ExecResult(['/sbin/iptables-restore', '--noflush'], 0, '', '', False, 0))
+        self.executor.record(ExecResult(['lldpcli.py'], 0, '', '', False, 0))
+        self.assertEqual(sorted(self.stats.counters), ['exec_iptables_restore', 'exec_lldpcli_py'])
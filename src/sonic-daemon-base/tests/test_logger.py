@@ -0,0 +1,211 @@
+import os
+import sys
+import threading
+from unittest import TestCase
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(test_dir, '..'))
+
+from sonic_daemon_base import logger
+from sonic_daemon_base.logger import RateLimiter, SyslogLogger, SyslogWriter
+
+
+class FakeSyslog(object):
+    """
+    Records the messages written; once blocked, a write waits until
+    unblocked
+    """
+    LOG_USER = 8
+    LOG_ERR = 3
+    LOG_WARNING = 4
+    LOG_NOTICE = 5
+    LOG_INFO = 6
+    LOG_DEBUG = 7
+    LOG_NDELAY = 8
+
+    def __init__(self):
+        self.messages = []
+        self.writing = threading.Event()
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+
+    def openlog(self, **kwargs):
+        pass
+
+    def syslog(self, priority, text):
+        self.writing.set()
+        self.unblocked.wait()
+        self.messages.append((priority, text))
+
+
+class FakeAtexit(object):
+    def __init__(self):
+        self.funcs = []
+
+    def register(self, func):
+        self.funcs.append(func)
+
+    def run_exitfuncs(self):
+        # Last registered, first run
+        for func in reversed(self.funcs):
+            func()
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class FormatCount(object):
+    """
+    Argument counting how many times it is formatted
+    """
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self):
+        self.count += 1
+        return 'formatted'
+
+
+class LoggerTestCase(TestCase):
+
+    def setUp(self):
+        self.saved = (logger.syslog, logger.atexit, logger.time)
+        self.syslog = FakeSyslog()
+        self.atexit = FakeAtexit()
+        self.clock = FakeClock()
+        (logger.syslog, logger.atexit, logger.time) = (self.syslog, self.atexit, self.clock)
+        self.writers = []
+
+    def tearDown(self):
+        self.syslog.unblocked.set()
+        for writer in self.writers:
+            writer.stop()
+        (logger.syslog, logger.atexit, logger.time) = self.saved
+
+    def texts(self):
+        return [text for (_, text) in self.syslog.messages]
+
+
+class TestRateLimiter(LoggerTestCase):
+
+    def test_window(self):
+        limiter = RateLimiter(interval=10, burst=2)
+        key = (logger.syslog.LOG_INFO, 'msg', ())
+
+        allowed = []
+        for now in [0, 1, 2, 3]:
+            (ok, summary) = limiter.check(key, now)
+            self.assertIsNone(summary)
+            if ok:
+                limiter.remember(key, logger.syslog.LOG_INFO, 'msg')
+            allowed.append(ok)
+        self.assertEqual(allowed, [True, True, False, False])
+
+        # The next interval begins with the summary of the previous one
+        self.assertEqual(limiter.check(key, 10), (True, (logger.syslog.LOG_INFO,
+                                                         'Suppressed 2 identical message(s) in 10 seconds: msg')))
+
+    def test_no_summary_without_suppression(self):
+        limiter = RateLimiter(interval=10, burst=2)
+        limiter.check('key', 0)
+        limiter.remember('key', logger.syslog.LOG_INFO, 'msg')
+        self.assertEqual(limiter.check('key', 10), (True, None))
+        self.assertEqual(limiter.sweep(30), [])
+
+    def test_max_messages(self):
+        limiter = RateLimiter(interval=10, burst=1, max_messages=2)
+        for key in ['a', 'b']:
+            limiter.check(key, 0)
+        # Messages beyond those tracked are never suppressed
+        for _ in range(3):
+            self.assertEqual(limiter.check('c', 0), (True, None))
+        self.assertNotIn('c', limiter.messages)
+
+
+class TestSyslogLogger(LoggerTestCase):
+
+    def test_rate_limit(self):
+        log = SyslogLogger('test', rate_limit_interval=10, rate_limit_burst=2)
+        for _ in range(5):
+            log.log_error("Port %s down", 'Ethernet0')
+        log.log_error("Port %s down", 'Ethernet4')
+        self.assertEqual(self.texts(), ['Port Ethernet0 down', 'Port Ethernet0 down', 'Port Ethernet4 down'])
+
+        # Written once the interval ends, when another message is logged
+        self.clock.now += 10
+        log.log_info("Other message")
+        self.assertEqual(self.texts()[3:], ['Suppressed 3 identical message(s) in 10 seconds: Port Ethernet0 down',
+                                            'Other message'])
+        self.assertEqual(self.syslog.messages[3][0], logger.syslog.LOG_ERR)
+
+    def test_lazy_formatting(self):
+        log = SyslogLogger('test', rate_limit_interval=0)
+        log.set_min_priority(logger.syslog.LOG_INFO)
+        arg = FormatCount()
+
+        log.log_debug("Not written: %s", arg)
+        self.assertEqual(arg.count, 0)
+        self.assertEqual(self.texts(), [])
+
+        log.log_info("Written: %s", arg)
+        self.assertEqual(arg.count, 1)
+        log.log_info("Load at %d%%", 50)
+        # Arguments are not themselves formatted
+        log.log_info("%s - failed", "'df' returned 1: 100% used")
+        # Without arguments, a message is not formatted
+        log.log_info("Load at 100%")
+        # Arguments not matching the message are appended to it
+        log.log_info("Missing argument %s %s", 'a')
+        self.assertEqual(self.texts(), ['Written: formatted', 'Load at 50%', "'df' returned 1: 100% used - failed",
+                                        'Load at 100%', "Missing argument %s %s ('a',)"])
+
+    def test_lazy_formatting_rate_limited(self):
+        log = SyslogLogger('test', rate_limit_interval=10, rate_limit_burst=1)
+        arg = FormatCount()
+        for _ in range(3):
+            log.log_info("Message %s", arg)
+        # Suppressed messages are not formatted
+        self.assertEqual(arg.count, 1)
+        self.assertEqual(self.texts(), ['Message formatted'])
+
+    def test_flush_on_exit(self):
+        log = SyslogLogger('test', rate_limit_interval=10, rate_limit_burst=1, queue_size=16)
+        self.writers.append(log.writer)
+        self.syslog.unblocked.clear()
+        for _ in range(3):
+            log.log_warning("Fan %d failed", 1)
+        log.log_info("Last message")
+
+        # The summaries of the suppressed messages are queued, then the
+        # writer stops once it has written out the queue
+        self.syslog.unblocked.set()
+        self.atexit.run_exitfuncs()
+        self.assertFalse(log.writer.thread.is_alive())
+        self.assertEqual(self.texts(), ['Fan 1 failed', 'Last message',
+                                        'Suppressed 2 identical message(s) in 10 seconds: Fan 1 failed'])
+
+
+class TestSyslogWriter(LoggerTestCase):
+
+    def test_queue_overflow(self):
+        writer = SyslogWriter(queue_size=2)
+        self.writers.append(writer)
+
+        # The first message is taken off the queue and blocks the thread
+        self.syslog.unblocked.clear()
+        writer.write(logger.syslog.LOG_INFO, 'message 0')
+        self.assertTrue(self.syslog.writing.wait(5))
+        for index in range(1, 6):
+            writer.write(logger.syslog.LOG_INFO, 'message {}'.format(index))
+        self.assertEqual(writer.dropped, 3)
+
+        self.syslog.unblocked.set()
+        writer.stop()
+        self.assertEqual(self.texts(), ['message 0', 'Dropped 3 message(s), log queue full',
+                                        'message 1', 'message 2'])
+        self.assertEqual(self.syslog.messages[1][0], logger.syslog.LOG_WARNING)
@@ -0,0 +1,94 @@
+import os
+import sys
+import types
+from unittest import TestCase
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(test_dir, '..'))
+
+from sonic_daemon_base import daemon_base
+from sonic_daemon_base.metrics import ProcessStats
+
+DATABASE_CONFIG = {
+    'INSTANCES': {
+        'redis': {'hostname': '127.0.0.1', 'port': 6379},
+        'redis1': {'hostname': '127.0.0.1', 'port': 6380},
+    },
+    'DATABASES': {
+        'APPL_DB': {'id': 0, 'instance': 'redis'},
+        'STATE_DB': {'id': 6, 'instance': 'redis1'},
+    },
+}
+
+
+class FakePipeline(object):
+    def __init__(self, data):
+        self.data = data
+        self.commands = []
+
+    def delete(self, key):
+        self.commands.append(lambda: self.data.pop(key, None))
+
+    def hmset(self, key, fields):
+        self.commands.append(lambda: self.data.setdefault(key, {}).update(fields))
+
+    def execute(self):
+        for command in self.commands:
+            command()
+
+
+class FakeSonicV2Connector(object):
+    STATE_DB = 'STATE_DB'
+    connectors = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.data = {}
+        FakeSonicV2Connector.connectors.append(self)
+
+    def connect(self, db):
+        pass
+
+    def get_redis_client(self, db):
+        return self
+
+    def pipeline(self):
+        return FakePipeline(self.data)
+
+
+class TestProcessStats(TestCase):
+
+    def setUp(self):
+        # The SwSS SDK is not available at build time
+        swsssdk = types.ModuleType('swsssdk')
+        swsssdk.SonicV2Connector = FakeSonicV2Connector
+        self.saved_swsssdk = sys.modules.get('swsssdk')
+        sys.modules['swsssdk'] = swsssdk
+        self.saved_database_config = daemon_base._database_config
+        daemon_base._database_config = DATABASE_CONFIG
+        FakeSonicV2Connector.connectors = []
+
+    def tearDown(self):
+        daemon_base._database_config = self.saved_database_config
+        if self.saved_swsssdk is None:
+            del sys.modules['swsssdk']
+        else:
+            sys.modules['swsssdk'] = self.saved_swsssdk
+
+    def test_flush_to_state_db_instance(self):
+        stats = ProcessStats('caclmgrd')
+        stats.counter('updates').inc(2)
+        stats.gauge('queue_depth').set(5)
+        stats.flush()
+
+        self.assertEqual(len(FakeSonicV2Connector.connectors), 1)
+        connector = FakeSonicV2Connector.connectors[0]
+        self.assertEqual(connector.kwargs, {'host': '127.0.0.1', 'port': 6380})
+        fields = connector.data['PROCESS_STATS|caclmgrd']
+        self.assertEqual((fields['updates'], fields['queue_depth']), (2, 5))
+        self.assertIn('last_update', fields)
+
+        # The connection is kept
+        self.assertFalse(stats.maybe_flush())
+        stats.flush()
+        self.assertEqual(len(FakeSonicV2Connector.connectors), 1)
@@ -0,0 +1,75 @@
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+import redis
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(test_dir, '..'))
+
+from sonic_daemon_base.daemon_base import get_pubsub_message
+from sonic_daemon_base.profiler import enable_signal_profiling
+
+PMESSAGE = '*4\r\n$8\r\npmessage\r\n$2\r\nk*\r\n$2\r\nk1\r\n$4\r\nhset\r\n'
+
+
+class TestSignalProfiling(TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.profiler = enable_signal_profiling('test', output_dir=self.output_dir)
+
+        # Redis server which accepts the connection of the pubsub, and never
+        # answers unless told to
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(1)
+        self.pubsub = redis.StrictRedis(port=self.server.getsockname()[1]).pubsub()
+        self.pubsub.psubscribe('k*')
+        (self.connection, _) = self.server.accept()
+
+    def tearDown(self):
+        signal.signal(signal.SIGUSR2, signal.SIG_DFL)
+        if self.profiler.profile is not None:
+            self.profiler.profile.disable()
+        self.pubsub.close()
+        self.connection.close()
+        self.server.close()
+        shutil.rmtree(self.output_dir)
+
+    def signal_after(self, delay):
+        # Signaled from another process, which the kernel delivers to the
+        # main thread, blocked in select()
+        return subprocess.Popen(['sh', '-c', 'sleep {}; kill -USR2 {}'.format(delay, os.getpid())])
+
+    def test_signal_during_get_message(self):
+        signaler = self.signal_after(0.2)
+
+        def publish():
+            time.sleep(0.6)
+            self.connection.sendall(PMESSAGE)
+        publisher = threading.Thread(target=publish)
+        publisher.start()
+
+        message = get_pubsub_message(self.pubsub, 5)
+        publisher.join()
+        signaler.wait()
+
+        self.assertEqual((message['type'], message['channel'], message['data']), ('pmessage', 'k1', 'hset'))
+        self.assertIsNotNone(self.profiler.profile)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'test.prof')))
+
+    def test_signal_during_get_message_timeout(self):
+        signaler = self.signal_after(0.2)
+        start = time.time()
+        self.assertIsNone(get_pubsub_message(self.pubsub, 0.8))
+        self.assertGreaterEqual(time.time() - start, 0.75)
+        signaler.wait()
+        self.assertIsNotNone(self.profiler.profile)
@@ -0,0 +1,186 @@
+import os
+import sys
+import types
+from unittest import TestCase
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(test_dir, '..'))
+
+from sonic_daemon_base import subscriber
+from sonic_daemon_base.subscriber import SubscriptionDispatcher
+
+
+class FakeSubscriberStateTable(object):
+    """
+    Pops the notifications queued on its table, then an empty key
+    """
+    tables = {}
+
+    def __init__(self, db, table_name):
+        self.notifications = FakeSubscriberStateTable.tables.setdefault(table_name, [])
+
+    def pop(self):
+        if not self.notifications:
+            return ('', '', ())
+        return self.notifications.pop(0)
+
+
+class FakeSelect(object):
+    OBJECT = 0
+    TIMEOUT = 2
+
+    def addSelectable(self, selectable):
+        pass
+
+    def select(self, timeout_ms):
+        if any(FakeSubscriberStateTable.tables.values()):
+            return (FakeSelect.OBJECT, None)
+        return (FakeSelect.TIMEOUT, None)
+
+
+class FakeSyslog(object):
+    LOG_ERR = 3
+
+    def __init__(self):
+        self.messages = []
+
+    def syslog(self, priority, text):
+        self.messages.append((priority, text))
+
+
+class TestSubscriber(TestCase):
+
+    def setUp(self):
+        # The SwSS common library is not available at build time
+        swsscommon = types.ModuleType('swsscommon')
+        swsscommon.swsscommon = types.ModuleType('swsscommon.swsscommon')
+        swsscommon.swsscommon.SubscriberStateTable = FakeSubscriberStateTable
+        swsscommon.swsscommon.Select = FakeSelect
+        self.saved_modules = dict((name, sys.modules.get(name)) for name in ['swsscommon', 'swsscommon.swsscommon'])
+        sys.modules['swsscommon'] = swsscommon
+        sys.modules['swsscommon.swsscommon'] = swsscommon.swsscommon
+
+        self.syslog = FakeSyslog()
+        self.saved_syslog = subscriber.syslog
+        subscriber.syslog = self.syslog
+
+        FakeSubscriberStateTable.tables = {}
+        self.events = []
+
+    def tearDown(self):
+        subscriber.syslog = self.saved_syslog
+        for (name, module) in self.saved_modules.items():
+            if module is None:
+                del sys.modules[name]
+            else:
+                sys.modules[name] = module
+
+    def notify(self, table_name, key, op, **fvs):
+        FakeSubscriberStateTable.tables.setdefault(table_name, []).append((key, op, tuple(fvs.items())))
+
+    def handler(self, table_name):
+        def handle(key, op, fvs):
+            self.events.append((table_name, key, op, fvs))
+        return handle
+
+    def test_snapshot(self):
+        self.notify('PORT', 'Ethernet0', 'SET', mtu='9100')
+        self.notify('PORT', 'Ethernet4', 'SET', mtu='9100')
+        self.notify('PORT', 'Ethernet0', 'SET', mtu='1500')
+        snapshots = []
+
+        dispatcher = SubscriptionDispatcher(max_pending=1)
+        dispatcher.subscribe(None, 'PORT', self.handler('PORT'), snapshots.append)
+        # The whole table is delivered at once, regardless of the bound on
+        # pending events
+        self.assertEqual(snapshots, [{'Ethernet0': {'mtu': '1500'}, 'Ethernet4': {'mtu': '9100'}}])
+        self.assertEqual(self.events, [])
+
+        # Without a snapshot handler, the contents are delivered as events
+        self.notify('VLAN', 'Vlan1000', 'SET', vlanid='1000')
+        dispatcher.subscribe(None, 'VLAN', self.handler('VLAN'))
+        self.assertEqual(self.events, [('VLAN', 'Vlan1000', 'SET', {'vlanid': '1000'})])
+
+    def test_coalescing(self):
+        dispatcher = SubscriptionDispatcher()
+        dispatcher.subscribe(None, 'PORT', self.handler('PORT'))
+        dispatcher.subscribe(None, 'VLAN', self.handler('VLAN'))
+
+        self.notify('PORT', 'Ethernet0', 'SET', mtu='9100')
+        self.notify('PORT', 'Ethernet4', 'SET', mtu='9100')
+        self.notify('VLAN', 'Vlan1000', 'SET', vlanid='1000')
+        self.notify('PORT', 'Ethernet0', 'SET', mtu='1500')
+        self.notify('PORT', 'Ethernet8', 'SET', mtu='9100')
+        self.notify('PORT', 'Ethernet8', 'DEL')
+        self.assertTrue(dispatcher.run_once())
+
+        # Only the latest update of a key is delivered, in the order of the
+        # latest updates, table by table
+        self.assertEqual(self.events, [('PORT', 'Ethernet4', 'SET', {'mtu': '9100'}),
+                                       ('PORT', 'Ethernet0', 'SET', {'mtu': '1500'}),
+                                       ('PORT', 'Ethernet8', 'DEL', {}),
+                                       ('VLAN', 'Vlan1000', 'SET', {'vlanid': '1000'})])
+        stats = dispatcher.get_stats()
+        self.assertEqual((stats['PORT']['events'], stats['PORT']['coalesced_events'], stats['PORT']['batches']),
+                         (3, 2, 1))
+
+        self.assertFalse(dispatcher.run_once())
+
+    def test_overflow_left_for_next_wakeup(self):
+        dispatcher = SubscriptionDispatcher(max_pending=2)
+        dispatcher.subscribe(None, 'PORT', self.handler('PORT'))
+        dispatcher.subscribe(None, 'VLAN', self.handler('VLAN'))
+        for index in range(5):
+            self.notify('PORT', 'Ethernet{}'.format(index * 4), 'SET', mtu='9100')
+        self.notify('VLAN', 'Vlan1000', 'SET', vlanid='1000')
+
+        # A busy table doesn't hold back the others
+        dispatcher.run_once()
+        self.assertEqual([(table, key) for (table, key, _, _) in self.events],
+                         [('PORT', 'Ethernet0'), ('PORT', 'Ethernet4'), ('VLAN', 'Vlan1000')])
+
+        # The rest is delivered in order on the next wakeups
+        del self.events[:]
+        dispatcher.run_once()
+        dispatcher.run_once()
+        self.assertEqual([key for (_, key, _, _) in self.events], ['Ethernet8', 'Ethernet12', 'Ethernet16'])
+        self.assertFalse(dispatcher.run_once())
+
+    def test_handler_error(self):
+        def handle(key, op, fvs):
+            if key == 'Ethernet0':
+                raise ValueError('bad port')
+            self.events.append(key)
+
+        def fail_snapshot(entries):
+            raise KeyError('mtu')
+
+        self.notify('PORT', 'Ethernet0', 'SET', mtu='9100')
+        dispatcher = SubscriptionDispatcher()
+        dispatcher.subscribe(None, 'PORT', handle, fail_snapshot)
+        cycles = []
+
+        def cycle():
+            cycles.append(None)
+            if len(cycles) == 1:
+                raise ZeroDivisionError()
+
+        dispatcher.add_cycle_handler(cycle)
+
+        self.notify('PORT', 'Ethernet0', 'SET', mtu='1500')
+        self.notify('PORT', 'Ethernet4', 'SET', mtu='1500')
+        dispatcher.run_once()
+        # The events after the failed one are delivered, and the loop goes on
+        self.assertEqual(self.events, ['Ethernet4'])
+        self.notify('PORT', 'Ethernet8', 'SET', mtu='1500')
+        dispatcher.run_once()
+        self.assertEqual(self.events, ['Ethernet4', 'Ethernet8'])
+        self.assertEqual(len(cycles), 2)
+
+        self.assertEqual(dispatcher.get_stats()['PORT']['errors'], 2)
+        messages = [text for (_, text) in self.syslog.messages]
+        self.assertEqual(len(messages), 3)
+        self.assertIn('KeyError', messages[0])
+        self.assertIn('on key Ethernet0', messages[1])
+        self.assertIn('ValueError: bad port', messages[1])
+        self.assertIn('ZeroDivisionError', messages[2])